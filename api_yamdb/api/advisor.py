@@ -0,0 +1,461 @@
+import json
+import re
+
+from api import views
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, models
+from django.db.models.expressions import Col, OrderBy
+from django.db.models.lookups import Lookup
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from reviews.leaderboards import top_titles
+from reviews.models import Category, Comment, Genre, Title
+from reviews.synthetic import WORDS
+
+EQUALITY_LOOKUPS = ('exact', 'in', 'isnull')
+# Условия «не удалён» и «не скрыт» отбирают почти все строки: в индексе
+# они не нужны.
+VISIBILITY_COLUMNS = ('deleted_at', 'is_hidden')
+SORT_NODES = ('Sort', 'Incremental Sort')
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)')
+
+
+class Case:
+    """Запрос, который выполняет API, и имя, под которым он показывается."""
+
+    def __init__(self, name, queryset):
+        self.name = name
+        self.queryset = queryset
+        self.problems = []
+        self.proposal = None
+        self.covered_by = None
+
+
+def view_queryset(viewset, action, params=None, **kwargs):
+    """
+    Queryset, который viewset строит для действия: get_queryset() и все
+    фильтры из параметров запроса.
+    """
+    request = Request(APIRequestFactory().get('/', params or {}))
+    view = viewset(action=action, request=request, kwargs=kwargs,
+                   args=(), format_kwarg=None)
+    return view.filter_queryset(view.get_queryset())
+
+
+def page(queryset):
+    return queryset[:settings.REST_FRAMEWORK['PAGE_SIZE']]
+
+
+def samples():
+    """
+    Значения параметров из базы: произведение с наибольшим числом
+    оценок, отзыв с последним комментарием, первые категория и жанры.
+    """
+    comment = Comment.objects.order_by('-id').select_related(
+        'review'
+    ).only('review__id', 'review__title_id').first()
+    review = comment.review if comment else None
+    title = Title.objects.order_by('-rating_count').only('id').first()
+    category = Category.objects.order_by('id').first()
+    genres = list(Genre.objects.order_by('id')[:2])
+    return {
+        'title_id': title.pk if title else None,
+        'review': review,
+        'category': category,
+        'genres': genres,
+    }
+
+
+def title_cases(values):
+    slug = values['category'].slug if values['category'] else ''
+    genres = [genre.slug for genre in values['genres']]
+    params = {
+        '': {},
+        'category': {'category': slug},
+        'category+ordering=-rating': {'category': slug, 'ordering': '-rating'},
+        'genre': {'genre': ','.join(genres[:1])},
+        'genre_match=all': {'genre': ','.join(genres), 'genre_match': 'all'},
+        'year': {'year': 2000},
+        'year_min+year_max': {'year_min': 1990, 'year_max': 2000},
+        'rating_min': {'rating_min': 8},
+        'name': {'name': 'Ветер'},
+        'search': {'search': WORDS[0]},
+        'ordering=-rating': {'ordering': '-rating'},
+        'ordering=rating': {'ordering': 'rating'},
+        'ordering=year': {'ordering': 'year'},
+        'ordering=name': {'ordering': 'name'},
+    }
+    for name, query in params.items():
+        label = f'titles.list?{name}' if name else 'titles.list'
+        yield Case(label, page(view_queryset(views.TitleViewSet, 'list',
+                                             query)))
+    yield Case('titles.retrieve', view_queryset(
+        views.TitleViewSet, 'retrieve'
+    ).filter(pk=values['title_id'] or 0))
+
+
+def nested_cases(values):
+    title_id = values['title_id']
+    # Вложенные представления отвечают 404 без произведения и отзыва.
+    if title_id is None:
+        return
+    reviews = view_queryset(views.ReviewViewSet, 'list', title_id=title_id)
+    yield Case('reviews.list', page(reviews))
+    yield Case('reviews.list?cursor', page(reviews.filter(id__gt=0)))
+    yield Case('reviews.retrieve', reviews.filter(pk=0))
+    review = values['review']
+    if review is None:
+        return
+    comments = view_queryset(views.CommentViewSet, 'list',
+                             title_id=review.title_id, review_id=review.pk)
+    yield Case('comments.list', page(comments))
+    yield Case('comments.list?cursor', page(comments.filter(id__gt=0)))
+    yield Case('comments.retrieve', comments.filter(pk=0))
+
+
+def catalog_cases(values):
+    for name, viewset in (('categories', views.CategoryViewSet),
+                          ('genres', views.GenreViewSet)):
+        yield Case(f'{name}.list', page(view_queryset(viewset, 'list')))
+        yield Case(f'{name}.list?search', page(view_queryset(
+            viewset, 'list', {'search': 'др'}
+        )))
+    yield Case('users.list', page(view_queryset(views.UsersViewSet, 'list')))
+    if values['category'] is not None:
+        yield Case('leaderboards.categories', top_titles(
+            settings.LEADERBOARD_SIZE, category=values['category']
+        ))
+    for genre in values['genres'][:1]:
+        yield Case('leaderboards.genres', top_titles(
+            settings.LEADERBOARD_SIZE, genre=genre
+        ))
+
+
+def api_cases():
+    """Все проверяемые запросы API с параметрами из базы."""
+    values = samples()
+    return [
+        *title_cases(values), *nested_cases(values), *catalog_cases(values)
+    ]
+
+
+def walk(plan, limited=False):
+    """Узлы плана и признак того, что над узлом есть Limit."""
+    yield plan, limited
+    limited = limited or plan['Node Type'] == 'Limit'
+    for child in plan.get('Plans', ()):
+        yield from walk(child, limited)
+
+
+def postgres_plan(queryset, analyze):
+    # explain() в Django 3.2 отдаёт JSON-план строкой repr, поэтому
+    # EXPLAIN выполняется напрямую.
+    sql, params = queryset.query.sql_with_params()
+    options = 'FORMAT JSON, ANALYZE' if analyze else 'FORMAT JSON'
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN ({options}) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def estimated_rows(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [table],
+        )
+        return max(0, int(cursor.fetchone()[0]))
+
+
+def read_rows(node, analyze):
+    """
+    Сколько строк узел прочитал. Под ANALYZE — фактически, вместе
+    с отброшенными фильтром; без него — оценка: сортировке достаются
+    все строки из дочернего узла, полное чтение проходит всю таблицу.
+    """
+    if analyze:
+        rows = node['Actual Rows'] + node.get('Rows Removed by Filter', 0)
+        return rows * node['Actual Loops']
+    if node['Node Type'] in SORT_NODES:
+        return node['Plans'][0]['Plan Rows']
+    return estimated_rows(node['Relation Name'])
+
+
+def postgres_problems(queryset, threshold, analyze):
+    """Последовательные чтения и сортировки больше threshold строк."""
+    problems = []
+    for node, limited in walk(postgres_plan(queryset, analyze)):
+        kind = node['Node Type']
+        if kind in SORT_NODES:
+            # Досортировка уже упорядоченного потока под Limit читает
+            # лишь первые строки, хотя в оценке у неё вся таблица.
+            if limited and kind == 'Incremental Sort' and not analyze:
+                continue
+            if analyze:
+                node = dict(node, **{
+                    'Actual Rows': node['Plans'][0]['Actual Rows'],
+                    'Actual Loops': node['Plans'][0]['Actual Loops'],
+                })
+            rows = read_rows(node, analyze)
+            if rows > threshold:
+                keys = ', '.join(node['Sort Key'])
+                problems.append(f'Sort ({keys}): {rows} строк')
+        elif kind == 'Seq Scan':
+            # Чтение без условия под Limit останавливается на первых
+            # строках и проблемой не считается.
+            if limited and 'Filter' not in node and not analyze:
+                continue
+            rows = read_rows(node, analyze)
+            if rows > threshold:
+                problems.append(
+                    f'Seq Scan {node["Relation Name"]}: {rows} строк'
+                )
+    return problems
+
+
+def table_rows(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}'
+        )
+        return cursor.fetchone()[0]
+
+
+def sqlite_problems(queryset, threshold, analyze):
+    """
+    В плане SQLite нет оценок числа строк, поэтому полное чтение
+    и сортировка оцениваются по размеру таблицы.
+    """
+    base = queryset.model._meta.db_table
+    # Чтение без условий под LIMIT останавливается на первых строках.
+    limited = queryset.query.high_mark is not None and not base_lookups(
+        queryset.query
+    )
+    problems = []
+    for line in queryset.explain().splitlines():
+        detail = line.split(' ', 3)[-1]
+        scan = SQLITE_SCAN.match(detail)
+        if scan:
+            if limited and scan.group(1) == base:
+                continue
+            rows = table_rows(scan.group(1))
+            if rows > threshold:
+                problems.append(f'SCAN {scan.group(1)}: {rows} строк')
+        elif SQLITE_SORT.search(detail):
+            rows = table_rows(base)
+            if rows > threshold:
+                problems.append(f'{detail}: до {rows} строк')
+    return problems
+
+
+def order_columns(query, meta):
+    ordering = query.order_by or (
+        meta.ordering if query.default_ordering else ()
+    )
+    for item in ordering:
+        if isinstance(item, OrderBy):
+            item = getattr(item.expression, 'name', None)
+        if not isinstance(item, str) or '__' in item or '?' in item:
+            return
+        name = item.lstrip('-')
+        if name in query.extra_select or name in query.annotations:
+            # Сортировка по вычисляемому значению индексом не ускоряется.
+            return
+        yield meta.pk.column if name == 'pk' else meta.get_field(name).column
+
+
+def base_lookups(query):
+    """Условия запроса на столбцы основной таблицы."""
+    return [
+        child for child in query.where.children
+        if isinstance(child, Lookup) and isinstance(child.lhs, Col)
+        and child.lhs.alias == query.base_table
+    ]
+
+
+def single_row(queryset):
+    """Выборка по первичному ключу: читать и сортировать нечего."""
+    pk = queryset.model._meta.pk.column
+    return any(
+        lookup.lookup_name == 'exact' and lookup.lhs.target.column == pk
+        for lookup in base_lookups(queryset.query)
+    )
+
+
+def joined_columns(query):
+    """
+    Внешние ключи основной таблицы, по которым она соединена с таблицей
+    из условия на равенство, например category_id для category__slug.
+    """
+    for child in query.where.children:
+        if not isinstance(child, Lookup) or not isinstance(child.lhs, Col):
+            continue
+        join = query.alias_map.get(child.lhs.alias)
+        if (child.lookup_name in EQUALITY_LOOKUPS
+                and getattr(join, 'parent_alias', None) == query.base_table):
+            yield from (parent for parent, _ in join.join_cols)
+
+
+def filter_columns(query):
+    """Столбцы основной таблицы из условий: сначала равенства."""
+    equal, ranges = list(joined_columns(query)), []
+    for child in base_lookups(query):
+        column = child.lhs.target.column
+        if column in VISIBILITY_COLUMNS:
+            continue
+        if child.lookup_name in EQUALITY_LOOKUPS:
+            equal.append(column)
+        else:
+            ranges.append(column)
+    return equal, ranges
+
+
+def index_columns(queryset):
+    """
+    Столбцы составного индекса под запрос: равенства, столбец диапазона,
+    затем порядок сортировки. После первичного ключа столбцы не нужны:
+    он и так уникален.
+    """
+    query = queryset.query
+    meta = queryset.model._meta
+    equal, ranges = filter_columns(query)
+    if meta.pk.column in equal:
+        return []
+    columns = list(dict.fromkeys(
+        equal + ranges[:1] + list(order_columns(query, meta))
+    ))
+    if meta.pk.column not in columns:
+        return columns
+    return columns[:columns.index(meta.pk.column) + 1]
+
+
+def table_constraints(table):
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(cursor, table)
+
+
+def existing_indexes(table):
+    return {
+        name: constraint['columns']
+        for name, constraint in table_constraints(table).items()
+        if constraint['index'] or constraint['unique']
+        or constraint['primary_key']
+    }
+
+
+def redundant_indexes(tables):
+    """
+    Неуникальные индексы, столбцы которых — начало другого индекса той же
+    таблицы: выборки обслуживает более длинный индекс, а каждый лишний
+    индекс замедляет вставку.
+    """
+    result = []
+    for table in tables:
+        constraints = table_constraints(table)
+        # Индексы *_like в PostgreSQL — для LIKE по префиксу, обычный
+        # индекс их не заменяет, и наоборот.
+        indexes = {
+            name: columns
+            for name, columns in existing_indexes(table).items()
+            if not name.endswith('_like')
+        }
+        for name, columns in indexes.items():
+            constraint = constraints[name]
+            if constraint['unique'] or constraint['primary_key']:
+                continue
+            if constraint.get('type') not in (None, 'btree', 'idx'):
+                continue
+            wider = [
+                other for other, longer in indexes.items()
+                if other != name and longer[:len(columns)] == columns
+                and len(longer) >= len(columns)
+            ]
+            if columns and wider:
+                result.append((table, name, wider[0]))
+    return result
+
+
+def app_tables(*app_labels):
+    return [
+        model._meta.db_table
+        for app_label in app_labels
+        for model in apps.get_app_config(app_label).get_models()
+    ]
+
+
+def covering_index(table, columns):
+    for name, existing in existing_indexes(table).items():
+        if existing[:len(columns)] == columns:
+            return name
+    return None
+
+
+def advise(threshold=1000, analyze=False, cases=None):
+    """
+    Выполняет EXPLAIN каждого запроса и для запросов с полным чтением
+    таблицы или большой сортировкой подбирает составной индекс.
+    """
+    explain = (
+        postgres_problems if connection.vendor == 'postgresql'
+        else sqlite_problems
+    )
+    cases = api_cases() if cases is None else cases
+    for case in cases:
+        if single_row(case.queryset):
+            continue
+        case.problems = explain(case.queryset, threshold, analyze)
+        if not case.problems:
+            continue
+        columns = index_columns(case.queryset)
+        if not columns:
+            continue
+        table = case.queryset.model._meta.db_table
+        case.covered_by = covering_index(table, columns)
+        if case.covered_by is None:
+            case.proposal = (case.queryset.model, columns)
+    return cases
+
+
+def index_for(model, columns):
+    by_column = {
+        field.column: field.name for field in model._meta.concrete_fields
+    }
+    fields = [by_column[column] for column in columns]
+    name = '_'.join([model._meta.model_name, *fields])[:26] + '_idx'
+    return models.Index(fields=fields, name=name)
+
+
+def proposed_indexes(cases):
+    """
+    Недостающие индексы по моделям. Миграции не создаются: индекс
+    добавляется в Meta.indexes модели, и makemigrations строит миграцию
+    сам — иначе состояние моделей разошлось бы с миграциями.
+    """
+    indexes = {}
+    for case in cases:
+        if case.proposal is None:
+            continue
+        model, columns = case.proposal
+        index = index_for(model, columns)
+        indexes.setdefault(model, {})[index.name] = index
+    return [
+        (model, [index for _, index in sorted(by_name.items())])
+        for model, by_name in sorted(
+            indexes.items(), key=lambda item: item[0]._meta.label
+        )
+    ]
+
+
+def meta_indexes(model, indexes):
+    """Текст для Meta.indexes модели."""
+    lines = [f'# {model._meta.label}', 'indexes = [']
+    for index in indexes:
+        lines.append(
+            f'    models.Index(fields={index.fields!r}, name={index.name!r}),'
+        )
+    lines.append(']')
+    return '\n'.join(lines)
@@ -0,0 +1,113 @@
+from itertools import islice
+
+from api.cache import bump_version
+from api.serializers import TitleBulkSerializer
+from django.db import DatabaseError, connection, transaction
+from rest_framework.exceptions import ValidationError
+from reviews import changes
+from reviews.models import Category, Genre, Title
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _insert_titles(titles, genre_ids, batch_size):
+    changes.bulk_create(Title, titles, batch_size=batch_size)
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # SQLite до Django 4 не возвращает id из bulk_create. До конца
+        # транзакции база заблокирована на запись, поэтому вставленные
+        # строки — последние по id, в порядке списка.
+        ids = Title.all_objects.order_by('-pk').values_list(
+            'pk', flat=True
+        )[:len(titles)]
+        for title, pk in zip(titles, reversed(list(ids))):
+            title.pk = pk
+    title_genre = Title.genre.through
+    changes.bulk_create(
+        title_genre,
+        (
+            title_genre(title_id=title.pk, genre_id=genre_id)
+            for title, ids in zip(titles, genre_ids) for genre_id in ids
+        ),
+        batch_size=batch_size,
+    )
+
+
+def referenced_slugs(chunk):
+    """Slug'и жанров и категорий, на которые ссылаются элементы пачки."""
+    genres, categories = set(), set()
+    for item in chunk:
+        if not isinstance(item, dict):
+            continue
+        if isinstance(item.get('genre'), list):
+            genres.update(
+                slug for slug in item['genre'] if isinstance(slug, str)
+            )
+        if isinstance(item.get('category'), str):
+            categories.add(item['category'])
+    return genres, categories
+
+
+def load_slugs(known, model, slugs):
+    """Дополняет словарь slug -> id slug'ами, которых в нём ещё нет."""
+    missing = slugs - known.keys()
+    if missing:
+        known.update(
+            model.objects.filter(slug__in=missing).values_list('slug', 'id')
+        )
+
+
+def import_titles(items, batch_size=1000):
+    """
+    Массово создаёт произведения. Для каждой пачки одним запросом на
+    модель загружаются только упомянутые в ней slug'и жанров и категорий,
+    произведения и связи с жанрами вставляются пачками. Ошибки валидации
+    возвращаются по каждому элементу отдельно.
+
+    Каждая пачка — отдельная транзакция. Если пачка не записалась,
+    загрузка останавливается: уже созданные произведения остаются,
+    а failed описывает пачку и ошибку базы.
+    """
+    context = {'genres': {}, 'categories': {}}
+    serializer = TitleBulkSerializer(context=context)
+    created, errors, failed = [], [], None
+    total = 0
+    for offset, chunk in enumerate(chunked(items, batch_size)):
+        total += len(chunk)
+        genres, categories = referenced_slugs(chunk)
+        load_slugs(context['genres'], Genre, genres)
+        load_slugs(context['categories'], Category, categories)
+        titles, genre_ids = [], []
+        for index, item in enumerate(chunk, start=offset * batch_size):
+            try:
+                data = serializer.run_validation(item)
+            except ValidationError as error:
+                errors.append({'index': index, 'errors': error.detail})
+                continue
+            genre_ids.append(data.pop('genre'))
+            titles.append(Title(**data))
+        try:
+            with transaction.atomic():
+                _insert_titles(titles, genre_ids, batch_size)
+        except DatabaseError as error:
+            failed = {
+                'from': offset * batch_size,
+                'to': offset * batch_size + len(chunk) - 1,
+                'error': str(error),
+            }
+            break
+        created.extend(title.pk for title in titles)
+    if not total:
+        raise ValidationError(
+            'Нет произведений для загрузки: ожидается непустой JSON-массив '
+            'или NDJSON.'
+        )
+    if created:
+        bump_version('titles')
+    return created, errors, failed
@@ -0,0 +1,88 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+RESOURCES = ('titles', 'genres', 'categories')
+HIT = 'hits'
+MISS = 'misses'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(resource):
+    return f'api:version:{resource}'
+
+
+def _stats_key(resource, outcome):
+    return f'api:stats:{resource}:{outcome}'
+
+
+def _incr(cache, key, initial):
+    """Увеличивает счётчик, заводя его при отсутствии в кэше."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, initial, timeout=None):
+            return initial
+        return cache.incr(key)
+
+
+def _fresh_version():
+    # Версия, вытесненная из кэша, не должна совпасть с прежними значениями,
+    # поэтому отсчёт начинается с текущего времени в миллисекундах.
+    return time.time_ns() // 1_000_000
+
+
+def get_version(resource):
+    cache = get_cache()
+    key = _version_key(resource)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), timeout=None)
+        return cache.get(key)
+    return version
+
+
+def bump_version(*resources):
+    """Инвалидирует все закэшированные ответы перечисленных ресурсов."""
+    cache = get_cache()
+    for resource in resources:
+        _incr(cache, _version_key(resource), _fresh_version())
+
+
+def auth_state(request):
+    """Часть ключа кэша, зависящая от пользователя: только его роль."""
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return 'superuser'
+    return user.role
+
+
+def response_key(resource, request):
+    digest = hashlib.sha1(
+        f'{auth_state(request)}|{request.build_absolute_uri()}'.encode()
+    ).hexdigest()
+    return f'api:response:{resource}:{get_version(resource)}:{digest}'
+
+
+def record(resource, outcome):
+    _incr(get_cache(), _stats_key(resource, outcome), 1)
+
+
+def get_stats():
+    """Счётчики попаданий и промахов по каждому ресурсу."""
+    keys = {
+        (resource, outcome): _stats_key(resource, outcome)
+        for resource in RESOURCES for outcome in (HIT, MISS)
+    }
+    values = get_cache().get_many(keys.values())
+    stats = {resource: {HIT: 0, MISS: 0} for resource in RESOURCES}
+    for (resource, outcome), key in keys.items():
+        stats[resource][outcome] = values.get(key, 0)
+    return stats
@@ -0,0 +1,80 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from reviews.models import Change
+
+# Поле журнала -> имя в ответе.
+FIELDS = {
+    'seq': 'seq', 'resource': 'resource', 'action': 'action',
+    'object_id': 'id', 'slug': 'slug', 'title_id': 'title',
+    'review_id': 'review', 'changed_at': 'changed_at',
+}
+
+
+def changes_params(query_params):
+    """Разбирает since, limit и wait из параметров запроса."""
+    params = {}
+    for name, default, maximum in (
+        ('since', 0, None),
+        ('limit', settings.CHANGES_PAGE_SIZE, settings.CHANGES_PAGE_SIZE),
+        ('wait', 0, settings.CHANGES_MAX_WAIT),
+    ):
+        value = query_params.get(name, default)
+        try:
+            params[name] = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: 'Ожидается целое число.'})
+        if params[name] < 0:
+            raise ValidationError({name: 'Ожидается неотрицательное число.'})
+        if maximum is not None:
+            params[name] = min(params[name], maximum)
+    params['limit'] = max(params['limit'], 1)
+    return params
+
+
+def settled(rows, since, now):
+    """
+    Записи подряд после since. Номер, пропущенный недавно, может
+    принадлежать ещё не завершённой транзакции: выдача на нём
+    останавливается, иначе потребитель прошёл бы мимо этой записи.
+    Пропуск старше CHANGES_SETTLE_SECONDS — откат, его не ждут: запись
+    транзакции, которая шла дольше, будет пропущена. since=0 — начало
+    журнала, первый номер может быть любым, и пропуск перед ним не
+    проверяется.
+    """
+    horizon = now - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+    result, expected = [], since + 1 if since else None
+    for row in rows:
+        if expected not in (None, row['seq']) and (
+            row['changed_at'] > horizon
+        ):
+            break
+        result.append(row)
+        expected = row['seq'] + 1
+    return result
+
+
+def read_changes(since, limit):
+    """До limit записей журнала после since по первичному ключу."""
+    rows = Change.objects.filter(seq__gt=since).values(*FIELDS)[:limit]
+    return [
+        {FIELDS[name]: value for name, value in row.items()}
+        for row in settled(rows, since, timezone.now())
+    ]
+
+
+def wait_changes(since, limit, wait):
+    """
+    Записи журнала после since. Если их нет, ждёт до wait секунд,
+    перечитывая журнал раз в CHANGES_POLL_INTERVAL секунд.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        rows = read_changes(since, limit)
+        left = deadline - time.monotonic()
+        if rows or left <= 0:
+            return rows
+        time.sleep(min(settings.CHANGES_POLL_INTERVAL, left))
@@ -0,0 +1,134 @@
+import csv
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from reviews.models import Comment, Review
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+MODELS = {'reviews': Review, 'comments': Comment}
+
+# Поля выгрузки: имя в выгрузке -> поле для values_list().
+EXPORT_FIELDS = {
+    'reviews': {
+        'id': 'id', 'title': 'title_id', 'author': 'author__username',
+        'text': 'text', 'score': 'score', 'pub_date': 'pub_date',
+    },
+    'comments': {
+        'id': 'id', 'review': 'review_id', 'title': 'review__title_id',
+        'author': 'author__username', 'text': 'text', 'pub_date': 'pub_date',
+    },
+}
+
+# Условия видимости, как в API: без скрытых модератором отзывов и
+# комментариев и без содержимого удалённых произведений и пользователей,
+# которое ещё не очищено.
+VISIBLE = {
+    'reviews': {
+        'is_hidden': False,
+        'title__deleted_at__isnull': True,
+        'author__deleted_at__isnull': True,
+    },
+    'comments': {
+        'is_hidden': False,
+        'review__is_hidden': False,
+        'review__title__deleted_at__isnull': True,
+        'review__author__deleted_at__isnull': True,
+        'author__deleted_at__isnull': True,
+    },
+}
+
+
+def parse_moment(value):
+    """Дата или дата со временем; без часового пояса — в TIME_ZONE."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        return timezone.make_aware(moment)
+    return moment
+
+
+# Параметр запроса -> (lookup, функция разбора значения).
+COMMON_FILTERS = {
+    'after_id': ('id__gt', int),
+    'author': ('author__username', str),
+    'since': ('pub_date__gte', parse_moment),
+    'until': ('pub_date__lt', parse_moment),
+}
+FILTERS = {
+    'reviews': {**COMMON_FILTERS, 'title': ('title_id', int)},
+    'comments': {
+        **COMMON_FILTERS,
+        'title': ('review__title_id', int),
+        'review': ('review_id', int),
+    },
+}
+
+
+def filter_lookups(resource, params):
+    """Условия выборки по параметрам FILTERS; ошибка разбора — 400."""
+    lookups = {}
+    for param, (lookup, parse) in FILTERS[resource].items():
+        value = params.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            parsed = parse(value)
+        except (TypeError, ValueError):
+            parsed = None
+        if parsed is None:
+            raise ValidationError({param: 'Некорректное значение.'})
+        lookups[lookup] = parsed
+    return lookups
+
+
+def export_rows(resource, params):
+    """
+    Строки выгрузки по возрастанию id, читаемые через серверный курсор,
+    только видимые в API. Параметр after_id продолжает прерванную
+    выгрузку.
+    """
+    queryset = MODELS[resource].objects.filter(
+        **VISIBLE[resource], **filter_lookups(resource, params)
+    )
+    return queryset.order_by('id').values_list(
+        *EXPORT_FIELDS[resource].values()
+    ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(resource, rows):
+    names = list(EXPORT_FIELDS[resource])
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def csv_lines(resource, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS[resource])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_lines(resource, fmt, params):
+    rows = export_rows(resource, params)
+    if fmt == 'csv':
+        return csv_lines(resource, rows)
+    return ndjson_lines(resource, rows)
@@ -1,12 +1,85 @@
 import django_filters
+from django.db.models import Count, F
 from reviews.models import Title
+from reviews.search import search_titles
+
+ANY = 'any'
+ALL = 'all'
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Несколько значений через запятую."""
+
+
+class TitleOrderingFilter(django_filters.OrderingFilter):
+    """
+    Сортировка с id в конце для устойчивого порядка страниц.
+    Произведения без оценок считаются худшими: первыми по возрастанию
+    рейтинга и последними по убыванию, как в индексе по rating.
+    """
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        descending = ordering[0].startswith('-')
+        expressions = [
+            self.expression(field) for field in ordering
+        ]
+        return qs.order_by(*expressions, '-id' if descending else 'id')
+
+    @staticmethod
+    def expression(field):
+        name = field.lstrip('-')
+        if name != 'rating':
+            return field
+        if field.startswith('-'):
+            return F(name).desc(nulls_last=True)
+        return F(name).asc(nulls_first=True)
 
 
 class TitleFilter(django_filters.FilterSet):
     """Фильтр по полям объекта модели произведения"""
-    genre = django_filters.CharFilter(lookup_expr='slug')
-    category = django_filters.CharFilter(lookup_expr='slug')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = django_filters.ChoiceFilter(
+        choices=((ANY, ANY), (ALL, ALL)), method='filter_genre_match'
+    )
+    category = django_filters.CharFilter(method='filter_category')
+    year_min = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='gte')
+    year_max = django_filters.NumberFilter(field_name='year',
+                                           lookup_expr='lte')
+    rating_min = django_filters.NumberFilter(field_name='rating',
+                                             lookup_expr='gte')
+    search = django_filters.CharFilter(method='filter_search')
+    ordering = TitleOrderingFilter(fields=('rating', 'year', 'name'))
 
     class Meta:
         model = Title
         fields = ['year', 'name']
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Произведения с любым (genre_match=any) или со всеми
+        (genre_match=all) жанрами из списка slug'ов.
+        """
+        slugs = set(value)
+        links = Title.genre.through.objects.filter(
+            genre__slug__in=slugs, genre__deleted_at__isnull=True
+        )
+        if self.form.cleaned_data.get('genre_match') == ALL:
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs))
+        return queryset.filter(pk__in=links.values('title_id'))
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category__slug=value, category__deleted_at__isnull=True
+        )
+
+    def filter_genre_match(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,226 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Genre, Review, Title
+from reviews.synthetic import WORDS
+from users.models import User
+
+# Сколько строк каждого вида берётся из базы для построения запросов.
+SAMPLE_SIZE = 1000
+POSTERS = 20
+
+# Сценарий: вес в смеси и метод Scenarios, строящий запрос.
+MIX = {
+    'titles_list': 20,
+    'title_detail': 15,
+    'reviews_list': 15,
+    'comments_list': 10,
+    'title_search': 10,
+    'title_filter': 10,
+    'leaderboard': 5,
+    'review_post': 5,
+    'comment_post': 10,
+}
+
+
+def percentile(ordered, share):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, round(share * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class Scenarios:
+    """
+    Запросы сценариев к настоящим адресам API. Произведения, отзывы,
+    жанры и авторы выбираются из базы случайно, но воспроизводимо.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.anonymous = APIClient()
+        self.title_ids = self.sample(Title.objects.values_list('id'))
+        # Страницы дальше последней отвечают 404, а не замеряются.
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        self.pages = max(1, -(-Title.objects.count() // page_size))
+        self.reviews = self.sample(
+            Review.objects.values_list('title_id', 'id')
+        )
+        self.genres = self.sample(Genre.objects.values_list('slug'))
+        self.clients = [
+            self.client_for(user) for user in User.objects.order_by('id')[
+                :POSTERS
+            ]
+        ]
+        self.posted = set(Review.objects.filter(
+            author_id__in=[client.user_id for client in self.clients]
+        ).values_list('author_id', 'title_id'))
+
+    def sample(self, queryset):
+        rows = list(queryset.order_by('id')[:SAMPLE_SIZE])
+        if not rows:
+            return []
+        if len(rows[0]) == 1:
+            return [row[0] for row in rows]
+        return rows
+
+    @staticmethod
+    def client_for(user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        client.user_id = user.pk
+        return client
+
+    def choice(self, items):
+        return self.rng.choice(items) if items else None
+
+    def titles_list(self):
+        page = self.rng.randint(1, min(5, self.pages))
+        return self.anonymous, 'get', '/api/v1/titles/', {'page': page}
+
+    def title_detail(self):
+        title_id = self.choice(self.title_ids)
+        return self.anonymous, 'get', f'/api/v1/titles/{title_id}/', None
+
+    def reviews_list(self):
+        title_id = self.choice(self.title_ids)
+        return (self.anonymous, 'get', f'/api/v1/titles/{title_id}/reviews/',
+                None)
+
+    def comments_list(self):
+        title_id, review_id = self.choice(self.reviews) or (0, 0)
+        path = f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        return self.anonymous, 'get', path, None
+
+    def title_search(self):
+        query = f'{self.rng.choice(WORDS)} {self.rng.choice(WORDS)}'
+        return self.anonymous, 'get', '/api/v1/titles/', {'search': query}
+
+    def title_filter(self):
+        year = self.rng.randint(1950, 2012)
+        params = {
+            'genre': self.choice(self.genres),
+            'year_min': year,
+            'year_max': year + 10,
+            'ordering': '-rating',
+        }
+        return self.anonymous, 'get', '/api/v1/titles/', params
+
+    def leaderboard(self):
+        genre = self.choice(self.genres)
+        return (self.anonymous, 'get', f'/api/v1/leaderboards/genres/{genre}/',
+                None)
+
+    def review_post(self):
+        client = self.choice(self.clients)
+        title_id = self.choice(self.title_ids)
+        # Повторный отзыв того же автора — ошибка, поэтому ищется пара,
+        # которой ещё нет.
+        for _ in range(10):
+            if (client.user_id, title_id) not in self.posted:
+                break
+            title_id = self.choice(self.title_ids)
+        self.posted.add((client.user_id, title_id))
+        return (
+            client, 'post', f'/api/v1/titles/{title_id}/reviews/',
+            {'text': 'Отзыв из нагрузочного теста',
+             'score': self.rng.randint(1, 10)},
+        )
+
+    def comment_post(self):
+        client = self.choice(self.clients)
+        title_id, review_id = self.choice(self.reviews) or (0, 0)
+        return (
+            client, 'post',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            {'text': 'Комментарий из нагрузочного теста'},
+        )
+
+
+def run(requests, warmup=0, seed=0, mix=None):
+    """
+    Выполняет смесь сценариев и возвращает статистику по каждому:
+    перцентили времени ответа, пропускную способность и число
+    SQL-запросов на HTTP-запрос.
+    """
+    mix = mix or MIX
+    rng = random.Random(seed)
+    scenarios = Scenarios(rng)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = {name: [] for name in names}
+    for number in range(warmup + requests):
+        name = rng.choices(names, weights)[0]
+        client, method, path, data = getattr(scenarios, name)()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            if method == 'post':
+                response = client.post(path, data, format='json')
+            else:
+                response = client.get(path, data)
+            duration = time.perf_counter() - started
+        if number >= warmup:
+            samples[name].append(
+                (duration, len(queries), response.status_code < 400)
+            )
+    return summarize(samples)
+
+
+def describe(samples):
+    durations = sorted(duration for duration, _, _ in samples)
+    queries = [count for _, count, _ in samples]
+    total = sum(durations)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'p50_ms': round(percentile(durations, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(durations, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(durations, 0.99) * 1000, 2),
+        'mean_ms': round(total / len(samples) * 1000, 2),
+        'throughput_rps': round(len(samples) / total, 1) if total else None,
+        'queries_per_request': round(sum(queries) / len(samples), 2),
+        'max_queries': max(queries),
+    }
+
+
+def summarize(samples):
+    report = {
+        name: describe(rows) for name, rows in samples.items() if rows
+    }
+    everything = [row for rows in samples.values() for row in rows]
+    if everything:
+        report['total'] = describe(everything)
+    return report
+
+
+def compare(baseline, current, tolerance, query_tolerance=0.05):
+    """
+    Регрессии относительно прошлого отчёта: рост p95 больше чем на долю
+    tolerance или рост числа SQL-запросов на запрос больше чем на долю
+    query_tolerance.
+    """
+    problems = []
+    for name, was in baseline.get('scenarios', {}).items():
+        now = current['scenarios'].get(name)
+        if now is None:
+            continue
+        if now['p95_ms'] > was['p95_ms'] * (1 + tolerance):
+            problems.append(
+                f'{name}: p95 {was["p95_ms"]} -> {now["p95_ms"]} мс'
+            )
+        if now['queries_per_request'] > (
+            was['queries_per_request'] * (1 + query_tolerance)
+        ):
+            problems.append(
+                f'{name}: SQL на запрос {was["queries_per_request"]} -> '
+                f'{now["queries_per_request"]}'
+            )
+    return problems
@@ -0,0 +1,68 @@
+from api.advisor import (advise, app_tables, meta_indexes, proposed_indexes,
+                         redundant_indexes)
+from django.core.management.base import BaseCommand
+
+# Приложения, чьи таблицы проверяются на лишние индексы.
+APPS = ('reviews', 'users')
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN запросов, которые строят представления API '
+        'со всеми фильтрами, находит полные чтения таблиц и сортировки '
+        'больших выборок и предлагает составные индексы для Meta.indexes '
+        'моделей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Сколько строк в чтении или сортировке считать проблемой.',
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='EXPLAIN ANALYZE в PostgreSQL: настоящее число строк '
+                 'вместо оценки планировщика. Запросы выполняются.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Показать и запросы без проблем.',
+        )
+
+    def handle(self, *args, **options):
+        cases = advise(options['rows'], options['analyze'])
+        for case in cases:
+            if case.problems or options['all']:
+                self.show(case)
+        flagged = sum(1 for case in cases if case.problems)
+        self.stdout.write(f'Запросов: {len(cases)}, с проблемами: {flagged}')
+        for table, name, wider in redundant_indexes(app_tables(*APPS)):
+            self.stdout.write(self.style.WARNING(
+                f'Лишний индекс {table}.{name}: его заменяет {wider}'
+            ))
+        # Индексы добавляются в модели, миграцию строит makemigrations.
+        for model, indexes in proposed_indexes(cases):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'Добавьте в Meta модели {model.__name__}:'
+            ))
+            self.stdout.write(meta_indexes(model, indexes))
+
+    def show(self, case):
+        style = self.style.WARNING if case.problems else self.style.SUCCESS
+        self.stdout.write(style(case.name))
+        for problem in case.problems:
+            self.stdout.write(f'    {problem}')
+        if case.proposal is not None:
+            model, columns = case.proposal
+            self.stdout.write(
+                f'    нужен индекс {model._meta.db_table} '
+                f'({", ".join(columns)})'
+            )
+        elif case.covered_by is not None:
+            self.stdout.write(
+                f'    подходящий индекс {case.covered_by} уже есть'
+            )
+        elif case.problems:
+            self.stdout.write(
+                '    составной индекс по условиям и сортировке не поможет'
+            )
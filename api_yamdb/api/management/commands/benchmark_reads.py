@@ -0,0 +1,106 @@
+import json
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from reviews.models import Comment, Review
+
+# Режим чтения -> значение FAST_READ_SERIALIZERS.
+MODES = {
+    'ModelSerializer + json': False,
+    'values() + orjson': True,
+}
+
+
+@contextmanager
+def read_mode(fast):
+    """
+    Переключает режим чтения настройкой FAST_READ_SERIALIZERS. Кэш
+    ответов на время замера отключён, чтобы каждый запрос доходил до
+    базы и сериализации.
+    """
+    caches = {
+        **settings.CACHES,
+        'benchmark': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        },
+    }
+    with override_settings(FAST_READ_SERIALIZERS=fast, CACHES=caches,
+                           RESPONSE_CACHE_ALIAS='benchmark'):
+        yield
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность одного процесса на списках '
+        'произведений, отзывов и комментариев в обычном и быстром '
+        'режиме чтения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько запросов выполнять на каждый адрес и режим.',
+        )
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Адрес списка; по умолчанию произведения и самые '
+                 'длинные списки отзывов и комментариев.',
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_ACCEPT='application/json')
+        for path in options['paths'] or self.default_paths():
+            self.stdout.write(path)
+            rates, bodies = {}, {}
+            for mode, fast in MODES.items():
+                with read_mode(fast):
+                    bodies[mode] = self.fetch(client, path)
+                    rates[mode] = self.measure(
+                        client, path, options['requests']
+                    )
+                self.stdout.write(
+                    f'  {mode}: {rates[mode]:.0f} запр./с '
+                    f'({1000 / rates[mode]:.2f} мс)'
+                )
+            baseline, fast = rates.values()
+            self.stdout.write(self.style.SUCCESS(
+                f'  ускорение: x{fast / baseline:.2f}'
+            ))
+            if len({json.dumps(body) for body in bodies.values()}) > 1:
+                self.stdout.write(self.style.WARNING(
+                    '  ответы в режимах отличаются'
+                ))
+
+    def default_paths(self):
+        paths = ['/api/v1/titles/']
+        review = Review.objects.order_by().values('title_id').annotate(
+            amount=Count('id')
+        ).order_by('-amount').first()
+        if review is not None:
+            paths.append(f'/api/v1/titles/{review["title_id"]}/reviews/')
+        comment = Comment.objects.order_by().values(
+            'review_id', 'review__title_id'
+        ).annotate(amount=Count('id')).order_by('-amount').first()
+        if comment is not None:
+            paths.append(
+                f'/api/v1/titles/{comment["review__title_id"]}/reviews/'
+                f'{comment["review_id"]}/comments/'
+            )
+        return paths
+
+    def fetch(self, client, path):
+        response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f'{path}: ответ {response.status_code}')
+        return response.json()
+
+    def measure(self, client, path, count):
+        started = time.perf_counter()
+        for _ in range(count):
+            client.get(path)
+        return count / (time.perf_counter() - started)
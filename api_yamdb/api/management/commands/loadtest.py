@@ -0,0 +1,111 @@
+import json
+
+from api import loadtest
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from reviews.synthetic import Generator
+
+LOCAL_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест API: при необходимости заполняет базу '
+        'синтетическими данными, выполняет смесь сценариев и выводит '
+        'перцентили времени ответа, пропускную способность и число '
+        'SQL-запросов в JSON. Данные и записи сценариев откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (('users', 1000), ('titles', 1000),
+                              ('reviews', 20000), ('comments', 20000)):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько создать: {name}.',
+            )
+        parser.add_argument(
+            '--skip-seed', action='store_true',
+            help='Не заполнять базу, а взять уже имеющиеся данные.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Сколько запросов выполнить в замере.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=100,
+            help='Сколько запросов выполнить до замера.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора данных и выбора сценариев.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для отчёта; по умолчанию отчёт выводится на экран.',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Прошлый отчёт: найденные регрессии завершают команду '
+                 'с ошибкой.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост p95 при сравнении, доля.',
+        )
+
+    def handle(self, *args, **options):
+        # Заполнение и запросы сценариев выполняются в транзакции, которая
+        # откатывается: база не меняется, и повторный запуск с тем же seed
+        # видит те же данные. Реплики не видят незавершённой транзакции,
+        # поэтому чтения идут в основную базу; кэш — в памяти процесса,
+        # чтобы ответы по откатанным данным не попали в общий кэш.
+        caches = {
+            alias: {'BACKEND': LOCAL_CACHE, 'LOCATION': f'loadtest-{alias}'}
+            for alias in settings.CACHES
+        }
+        with override_settings(DATABASE_REPLICAS={}, CACHES=caches):
+            with transaction.atomic():
+                report = self.measure(options)
+                transaction.set_rollback(True)
+        self.write_report(report, options)
+
+    def measure(self, options):
+        dataset = None
+        if not options['skip_seed']:
+            dataset = Generator(
+                seed=options['seed'], stdout=self.stderr
+            ).generate(
+                options['users'], options['titles'],
+                options['reviews'], options['comments'],
+            )
+        return {
+            'database': connection.vendor,
+            'dataset': dataset,
+            'requests': options['requests'],
+            'seed': options['seed'],
+            'scenarios': loadtest.run(
+                options['requests'], options['warmup'], options['seed']
+            ),
+        }
+
+    def write_report(self, report, options):
+        text = json.dumps(report, indent=2, sort_keys=True,
+                          ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(text + '\n')
+        else:
+            self.stdout.write(text)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+            problems = loadtest.compare(
+                baseline, report, options['tolerance']
+            )
+            if problems:
+                raise CommandError(
+                    'Регрессии:\n' + '\n'.join(problems)
+                )
+            self.stderr.write('Регрессий не найдено.')
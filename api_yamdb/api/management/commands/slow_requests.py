@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from api.profiling import CaptureStore
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает записи о медленных и профилированных запросах: '
+        'список, сводку по представлениям или одну запись целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'name', nargs='?',
+            help='Имя записи, которую нужно показать подробно.',
+        )
+        parser.add_argument(
+            '--summary', action='store_true',
+            help='Сводка по представлениям: число, среднее и максимум.',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Сколько строк профиля и запросов показывать.',
+        )
+
+    def handle(self, *args, **options):
+        store = CaptureStore()
+        if options['name']:
+            try:
+                capture = store.load(options['name'])
+            except FileNotFoundError:
+                raise CommandError(f'Запись {options["name"]} не найдена.')
+            self.show(capture, options['limit'])
+            return
+        captures = [(name, store.load(name)) for name in store.names()]
+        if options['summary']:
+            self.summary(captures)
+            return
+        for name, capture in captures:
+            started = datetime.fromtimestamp(capture['time'])
+            self.stdout.write(
+                f'{name}  {started:%Y-%m-%d %H:%M:%S}  '
+                f'{capture["duration"] * 1000:8.1f} мс  '
+                f'{capture["status"]}  {capture["method"]} '
+                f'{capture["path"]}  SQL: {len(capture["queries"])}'
+            )
+        self.stdout.write(f'Записей: {len(captures)}')
+
+    def summary(self, captures):
+        groups = {}
+        for _, capture in captures:
+            key = (capture['method'], capture['view'] or capture['path'])
+            groups.setdefault(key, []).append(capture)
+        rows = sorted(
+            groups.items(),
+            key=lambda item: -max(c['duration'] for c in item[1]),
+        )
+        for (method, view), items in rows:
+            durations = [capture['duration'] for capture in items]
+            queries = [len(capture['queries']) for capture in items]
+            self.stdout.write(
+                f'{method} {view}: {len(items)} зап., '
+                f'среднее {sum(durations) / len(items) * 1000:.1f} мс, '
+                f'максимум {max(durations) * 1000:.1f} мс, '
+                f'SQL в среднем {sum(queries) / len(items):.1f}'
+            )
+
+    def show(self, capture, limit):
+        self.stdout.write(
+            f'{capture["method"]} {capture["path"]} -> {capture["status"]} '
+            f'за {capture["duration"] * 1000:.1f} мс'
+        )
+        self.stdout.write(
+            f'Представление: {capture["view"]}, '
+            f'сериализатор: {capture["serializer"]}'
+        )
+        self.stdout.write(
+            f'SQL: {len(capture["queries"])} запросов, '
+            f'{capture["db_time"] * 1000:.1f} мс'
+        )
+        slowest = sorted(capture['queries'], key=lambda q: -q['duration'])
+        for query in slowest[:limit]:
+            self.stdout.write(
+                f'  {query["duration"] * 1000:.2f} мс  {query["sql"]}'
+            )
+            if query.get('explain'):
+                for line in query['explain'].splitlines():
+                    self.stdout.write(f'      {line}')
+        self.stdout.write('Профиль (по суммарному времени):')
+        for row in capture['profile'][:limit]:
+            self.stdout.write(
+                f'  {row["cumtime"] * 1000:9.2f} мс '
+                f'{row["tottime"] * 1000:9.2f} мс '
+                f'{row["calls"]:7d}  {row["function"]}'
+            )
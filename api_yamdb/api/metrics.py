@@ -0,0 +1,94 @@
+import os
+import time
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+LABELS = ('route', 'method')
+# Запросы, не дошедшие до представления (404 на этапе разбора адреса),
+# собираются под одним именем, чтобы не плодить метки.
+UNRESOLVED = 'unresolved'
+
+REQUEST_LATENCY = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки запроса.',
+    LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'yamdb_http_requests',
+    'Ответы по статусам.',
+    LABELS + ('status',),
+)
+DB_QUERIES = Histogram(
+    'yamdb_http_db_queries',
+    'Запросов к базе за один HTTP-запрос.',
+    LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_TIME = Histogram(
+    'yamdb_http_db_duration_seconds',
+    'Время запросов к базе за один HTTP-запрос.',
+    LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+RESPONSE_SIZE = Histogram(
+    'yamdb_http_response_size_bytes',
+    'Размер тела ответа.',
+    LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576),
+)
+
+
+class QueryTimer:
+    """execute_wrapper, считающий запросы к базе и их суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED
+    return match.view_name or match.route
+
+
+def response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+def observe(request, response, duration, queries):
+    labels = (route_name(request), request.method)
+    REQUEST_LATENCY.labels(*labels).observe(duration)
+    REQUESTS.labels(*labels, str(response.status_code)).inc()
+    DB_QUERIES.labels(*labels).observe(queries.count)
+    DB_TIME.labels(*labels).observe(queries.duration)
+    size = response_size(response)
+    if size is not None:
+        RESPONSE_SIZE.labels(*labels).observe(size)
+
+
+def render():
+    """
+    Метрики в текстовом формате Prometheus. Если задан
+    PROMETHEUS_MULTIPROC_DIR, значения всех процессов gunicorn лежат
+    в файлах этого каталога и складываются при чтении.
+    """
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
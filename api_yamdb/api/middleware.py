@@ -0,0 +1,101 @@
+import cProfile
+import time
+from contextlib import ExitStack
+
+from api import metrics, profiling, replicas
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+class MetricsMiddleware:
+    """
+    Записывает для каждого маршрута и метода время ответа, статус,
+    число и время запросов к базе и размер ответа.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = metrics.QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        metrics.observe(
+            request, response, time.perf_counter() - started, queries
+        )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует долю PROFILE_SAMPLE_RATE запросов и запросы
+    администраторов с заголовком PROFILE_HEADER. Запросы дольше
+    PROFILE_SLOW_THRESHOLD секунд и все запросы с заголовком
+    записываются в кольцевой буфер на диске вместе с SQL и планами.
+    Включается настройкой REQUEST_PROFILING.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.store = profiling.CaptureStore()
+
+    def __call__(self, request):
+        forced = profiling.is_admin_request(request)
+        if not forced and not profiling.is_sampled():
+            return self.get_response(request)
+        logs = [profiling.QueryLog(alias) for alias in connections]
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for log in logs:
+                stack.enter_context(
+                    connections[log.alias].execute_wrapper(log)
+                )
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+        if forced or duration >= settings.PROFILE_SLOW_THRESHOLD:
+            queries = [query for log in logs for query in log.queries]
+            name = self.store.save(profiling.build_capture(
+                request, response, duration, profiler, queries
+            ))
+            response['X-Profile-Capture'] = name
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Безопасные запросы читают с реплик из DATABASE_REPLICAS, остальные
+    работают с основной базой. После успешной записи клиент ещё
+    REPLICA_STICKY_SECONDS секунд читает с основной базы и видит свои
+    изменения, даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = replicas.token_user_id(request)
+        writes = request.method not in SAFE_METHODS
+        token = replicas.enter(
+            primary=writes or replicas.is_sticky(request, user_id)
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            replicas.leave(token)
+        if writes and response.status_code < 400:
+            replicas.stick(response, user_id)
+        return response
@@ -1,9 +1,207 @@
-from rest_framework import mixins, viewsets
+import hashlib
 
+from api import cache, replicas
+from api.renderers import ORJSONRenderer
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 
-class BaseListCreateDestroyView(mixins.DestroyModelMixin,
+
+class SoftDestroyMixin:
+    """
+    DELETE помечает объект удалённым и сразу скрывает его; зависимые
+    строки пачками удаляет команда purge_deleted.
+    """
+
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+
+class BaseListCreateDestroyView(SoftDestroyMixin, mixins.DestroyModelMixin,
                                 mixins.ListModelMixin,
                                 mixins.CreateModelMixin,
                                 viewsets.GenericViewSet
                                 ):
     lookup_field = 'slug'
+
+
+class ResponseCacheMixin:
+    """
+    Кэширует успешные ответы на чтение до ближайшего изменения ресурса.
+    Ключ учитывает адрес запроса и роль пользователя. У ответа, собранного
+    по реплике, в том числе из кэша, from_replica=True.
+    """
+    cache_resource = None
+
+    def cached(self, handler, request, *args, **kwargs):
+        key = cache.response_key(self.cache_resource, request)
+        # Клиент, который только что писал, не должен получить ответ,
+        # собранный по отстающей реплике.
+        entry = None if replicas.is_pinned() else cache.get_cache().get(key)
+        if entry is not None:
+            cache.record(self.cache_resource, cache.HIT)
+            data, from_replica = entry
+            response = Response(data, headers={'X-Cache': 'HIT'})
+            response.from_replica = from_replica
+            return response
+        cache.record(self.cache_resource, cache.MISS)
+        response = handler(request, *args, **kwargs)
+        response.from_replica = replicas.current_replica() is not None
+        if response.status_code == status.HTTP_200_OK:
+            timeout = settings.RESPONSE_CACHE_TIMEOUT
+            if response.from_replica:
+                # Ответ по реплике устаревает не дольше её отставания.
+                timeout = min(timeout, settings.REPLICA_MAX_LAG)
+            cache.get_cache().set(
+                key, (response.data, response.from_replica), timeout
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(ResponseCacheMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(ResponseCacheMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    В режиме FAST_READ_SERIALIZERS список выбирается через .values()
+    и превращается в ответ values_serializer_class, минуя ModelSerializer,
+    а JSON списка рендерится через orjson. Остальные действия и режим по
+    умолчанию рендерятся стандартным JSONRenderer.
+    """
+    values_serializer_class = None
+
+    def use_values(self):
+        return (
+            settings.FAST_READ_SERIALIZERS
+            and self.values_serializer_class is not None
+        )
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action != 'list' or not self.use_values():
+            return renderers
+        return [
+            ORJSONRenderer() if type(renderer) is JSONRenderer else renderer
+            for renderer in renderers
+        ]
+
+    def get_list_rows(self, queryset):
+        if self.use_values():
+            return self.values_serializer_class.select(
+                queryset.prefetch_related(None)
+            )
+        return queryset
+
+    def get_list_data(self, rows):
+        if self.use_values():
+            return self.values_serializer_class(rows).data
+        return self.get_serializer(rows, many=True).data
+
+    @staticmethod
+    def get_row_version(row):
+        if isinstance(row, dict):
+            return row['id'], row['updated_at']
+        return row.pk, row.updated_at
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_list_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(self.get_list_data(rows))
+        return self.get_paginated_response(self.get_list_data(page))
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+class ConditionalRetrieveMixin:
+    """
+    Отвечает 304 на повторный запрос объекта, если его updated_at
+    не изменился. Сам объект при этом не загружается и не сериализуется.
+    """
+
+    def get_etag_parts(self):
+        """Версии связанных данных, которые тоже попадают в ответ."""
+        return ()
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = self.get_queryset().prefetch_related(None).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).values_list('pk', 'updated_at').first()
+        if row is None:
+            return super().retrieve(request, *args, **kwargs)
+        pk, updated_at = row
+        etag = make_etag(pk, updated_at, *self.get_etag_parts())
+        last_modified = int(updated_at.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalVersionListMixin:
+    """
+    ETag списка строится по версии ресурса из кэша ответов,
+    поэтому 304 отдаётся без единого запроса к базе. Ответ по реплике
+    уходит без ETag: отстающая реплика может отдать данные старше версии,
+    и клиент получал бы 304 на устаревший список до следующего изменения.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag = make_etag(cache.response_key(self.cache_resource, request))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+            if getattr(response, 'from_replica', False) or (
+                replicas.current_replica() is not None
+            ):
+                return response
+        response['ETag'] = etag
+        return response
+
+
+class ConditionalPageListMixin(ValuesListMixin):
+    """
+    ETag списка строится по id и updated_at строк страницы и по ссылкам
+    пагинации: 304 отдаётся до сериализации.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_list_rows(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        etag = make_etag(
+            request.get_full_path(),
+            None if page is None else self.paginator.get_page_state(),
+            [self.get_row_version(row) for row in rows],
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data = self.get_list_data(rows)
+            if page is None:
+                response = Response(data)
+            else:
+                response = self.get_paginated_response(data)
+        response['ETag'] = etag
+        return response
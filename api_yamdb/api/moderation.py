@@ -0,0 +1,66 @@
+from api.export import MODELS, filter_lookups
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from reviews import moderation
+
+
+def moderate_reviews(action, queryset):
+    """Действие над отзывами; число отзывов, комментариев, произведений."""
+    if action == 'delete':
+        reviews, comments, titles = moderation.delete_reviews(queryset)
+        return {'reviews': reviews, 'comments': comments, 'titles': titles}
+    reviews, titles = moderation.set_reviews_hidden(
+        queryset, action == 'hide'
+    )
+    return {'reviews': reviews, 'titles': titles}
+
+
+def moderate_comments(action, queryset):
+    """Действие над комментариями; число изменённых комментариев."""
+    if action == 'delete':
+        return {'comments': moderation.delete_comments(queryset)}
+    return {
+        'comments': moderation.set_comments_hidden(queryset, action == 'hide')
+    }
+
+
+ACTIONS = {'reviews': moderate_reviews, 'comments': moderate_comments}
+
+
+def selection(resource, ids, params):
+    """
+    Отзывы или комментарии по списку id и фильтрам выгрузки (author,
+    title, review, since, until). Без условий запрос отклоняется:
+    действие над всей таблицей — скорее ошибка, чем намерение.
+    """
+    lookups = filter_lookups(resource, params)
+    if ids:
+        lookups['pk__in'] = ids
+    if not lookups:
+        raise ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Укажите ids или хотя бы один фильтр.'
+            ]
+        })
+    return MODELS[resource].objects.filter(**lookups)
+
+
+def moderate(resource, action, params, ids=None):
+    """
+    Скрывает, показывает или удаляет выборку запросами над множеством
+    строк в одной транзакции. Выборки больше MODERATION_LIMIT строк
+    отклоняются. Возвращает число затронутых строк по таблицам.
+    """
+    queryset = selection(resource, ids, params)
+    limit = settings.MODERATION_LIMIT
+    with transaction.atomic():
+        if queryset.order_by()[:limit + 1].count() > limit:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Под условия попадает больше {limit} объектов: '
+                    'сузьте выборку.'
+                ]
+            })
+        return {'action': action, **ACTIONS[resource](action, queryset)}
@@ -0,0 +1,50 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Постраничный вывод по ключу id без COUNT и OFFSET."""
+    ordering = ('id',)
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Постраничный вывод по номеру страницы или, по запросу, по курсору.
+    Курсорный режим включается параметром ?cursor= (пустое значение —
+    первая страница) или настройкой NESTED_CURSOR_PAGINATION.
+    """
+    cursor_query_param = 'cursor'
+
+    def use_cursor(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or getattr(settings, 'NESTED_CURSOR_PAGINATION', False)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if not self.use_cursor(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = IdCursorPagination()
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_page_state(self):
+        """Всё, кроме строк, что попадает в ответ: количество и ссылки."""
+        if self.cursor_paginator is not None:
+            return (
+                None,
+                self.cursor_paginator.get_next_link(),
+                self.cursor_paginator.get_previous_link(),
+            )
+        return (
+            self.page.paginator.count,
+            self.get_next_link(),
+            self.get_previous_link(),
+        )
@@ -0,0 +1,26 @@
+import json
+
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Разбирает поток NDJSON лениво, по строке за раз. Строка, которая
+    не является JSON, отдаётся как есть и не проходит валидацию позже.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return self.iter_items(stream, encoding)
+
+    @staticmethod
+    def iter_items(stream, encoding):
+        for line in stream:
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line
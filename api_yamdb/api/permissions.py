@@ -18,6 +18,15 @@ class OwnerOrAdmins(BasePermission):
             or request.user.is_superuser)
 
 
+class IsAdmin(BasePermission):
+    """Доступ только для администраторов."""
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and (request.user.is_admin or request.user.is_superuser)
+        )
+
+
 class IsAdminOrReadOnly(BasePermission):
     """Права для работы с категориями и жанрами."""
     def has_permission(self, request, view):
@@ -39,8 +48,21 @@ class AuthorAndStaffOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.id
             or request.user.is_admin
             or request.user.is_moderator
             or request.user.is_superuser
         )
+
+
+class IsModerator(BasePermission):
+    """Доступ для модераторов и администраторов."""
+    def has_permission(self, request, view):
+        return (
+            request.user.is_authenticated
+            and (
+                request.user.is_moderator
+                or request.user.is_admin
+                or request.user.is_superuser
+            )
+        )
@@ -0,0 +1,174 @@
+import json
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from rest_framework.exceptions import AuthenticationFailed
+from users.authentication import CachedJWTAuthentication
+
+# Сколько функций профиля и самых долгих SQL-запросов попадает в запись.
+TOP_FUNCTIONS = 40
+EXPLAINED_QUERIES = 5
+# Строковые значения в плане PostgreSQL: 'значение'::text.
+PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+class QueryLog:
+    """execute_wrapper, запоминающий каждый SQL-запрос и его время."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': sql,
+                'params': None if many else params,
+                'duration': time.perf_counter() - started,
+            })
+
+
+def is_admin_request(request):
+    """Запрос с заголовком профилирования от администратора."""
+    if settings.PROFILE_HEADER not in request.META:
+        return False
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_admin
+
+
+def is_sampled():
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def top_functions(profiler):
+    stats = pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE)
+    rows = []
+    for function in stats.fcn_list[:TOP_FUNCTIONS]:
+        _, calls, tottime, cumtime, _ = stats.stats[function]
+        filename, line, name = function
+        rows.append({
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        })
+    return rows
+
+
+def explain(query, redact):
+    """
+    План запроса; для изменяющих данные запросов не выполняется.
+    С redact строковые значения в плане и текст ошибки не сохраняются.
+    """
+    if not query['sql'].lstrip().upper().startswith('SELECT'):
+        return None
+    connection = connections[query['alias']]
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {query["sql"]}', query['params'])
+            plan = '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+    except DatabaseError as error:
+        detail = type(error).__name__ if redact else error
+        return f'EXPLAIN не выполнен: {detail}'
+    return PLAN_LITERAL.sub("'?'", plan) if redact else plan
+
+
+def view_names(response):
+    """Имена представления и сериализатора, обработавших запрос."""
+    context = getattr(response, 'renderer_context', None) or {}
+    view = context.get('view')
+    if view is None:
+        return None, None
+    try:
+        serializer = view.get_serializer_class().__name__
+    except (AttributeError, AssertionError):
+        serializer = None
+    action = getattr(view, 'action', None)
+    name = type(view).__name__
+    return f'{name}.{action}' if action else name, serializer
+
+
+def build_capture(request, response, duration, profiler, queries):
+    """
+    Запись о запросе. Параметры SQL — коды подтверждения, почты, хэши
+    паролей — сохраняются только с PROFILE_CAPTURE_PARAMS.
+    """
+    view, serializer = view_names(response)
+    redact = not settings.PROFILE_CAPTURE_PARAMS
+    slowest = sorted(queries, key=lambda query: -query['duration'])
+    for query in slowest[:EXPLAINED_QUERIES]:
+        query['explain'] = explain(query, redact)
+    return {
+        'time': time.time(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'duration': duration,
+        'view': view,
+        'serializer': serializer,
+        'db_time': sum(query['duration'] for query in queries),
+        'queries': [
+            {**query, 'params': None if redact else repr(query['params'])}
+            for query in queries
+        ],
+        'profile': top_functions(profiler),
+    }
+
+
+class CaptureStore:
+    """
+    Кольцевой буфер записей о медленных запросах: по файлу на запись,
+    самые старые удаляются, когда файлов становится больше limit.
+    Имена файлов упорядочены по времени записи.
+    """
+    suffix = '.json'
+
+    def __init__(self, path=None, limit=None):
+        self.path = path or settings.PROFILE_CAPTURE_DIR
+        self.limit = limit or settings.PROFILE_CAPTURE_LIMIT
+
+    def names(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            name[:-len(self.suffix)] for name in os.listdir(self.path)
+            if name.endswith(self.suffix)
+        )
+
+    def file(self, name):
+        return os.path.join(self.path, f'{name}{self.suffix}')
+
+    def save(self, capture):
+        os.makedirs(self.path, exist_ok=True)
+        name = f'{time.time_ns()}-{uuid.uuid4().hex[:8]}'
+        temporary = os.path.join(self.path, f'{name}.tmp')
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(capture, file, ensure_ascii=False, default=str)
+        os.replace(temporary, self.file(name))
+        for old in self.names()[:-self.limit]:
+            try:
+                os.remove(self.file(old))
+            except FileNotFoundError:
+                pass
+        return name
+
+    def load(self, name):
+        with open(self.file(name), encoding='utf-8') as file:
+            return json.load(file)
@@ -0,0 +1,37 @@
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Для представлений, которые сами формируют тело ответа (например,
+    потоковую выгрузку): принимает любой Accept и ничего не рендерит.
+    """
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Типы, которых orjson не знает (ленивые строки
+    переводов, Decimal, даты), кодируются так же, как в DRF. Запрос
+    с отступами (application/json; indent=4) рендерится стандартно.
+    """
+    encoder = JSONRenderer.encoder_class()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return orjson.dumps(
+            data,
+            default=self.encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME,
+        )
@@ -0,0 +1,184 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+STICKY_SALT = 'api.replicas'
+
+# Отставание реплики PostgreSQL в секундах. Реплика, применившая всё
+# полученное, не отстаёт, даже если давно не было транзакций; основная
+# база (не в режиме восстановления) тоже отстающей не считается.
+LAG_SQL = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+'''
+
+
+class ReadState:
+    """Откуда читает текущий запрос: основная база или реплика."""
+
+    def __init__(self, primary):
+        self.primary = primary
+        self.alias = None
+
+
+_state = ContextVar('replica_read_state', default=None)
+
+
+def enter(primary):
+    return _state.set(ReadState(primary))
+
+
+def leave(token):
+    _state.reset(token)
+
+
+def is_pinned():
+    """Читает ли текущий запрос только с основной базы из-за записи."""
+    state = _state.get()
+    return state is not None and state.primary
+
+
+def current_replica():
+    """Реплика, с которой читал текущий запрос, или None."""
+    state = _state.get()
+    if state is None or state.alias in (None, DEFAULT_DB_ALIAS):
+        return None
+    return state.alias
+
+
+class ReplicaHealth:
+    """
+    Доступность реплик в памяти процесса. Каждая реплика проверяется
+    не чаще раза в REPLICA_HEALTH_INTERVAL секунд: запрос к ней должен
+    пройти, а реплика PostgreSQL — отставать не больше REPLICA_MAX_LAG.
+    """
+
+    def __init__(self):
+        self.checked = {}
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        entry = self.checked.get(alias)
+        if entry is None or entry[0] <= now:
+            entry = (now + settings.REPLICA_HEALTH_INTERVAL, check(alias))
+            self.checked[alias] = entry
+        return entry[1]
+
+    def clear(self):
+        self.checked.clear()
+
+
+health = ReplicaHealth()
+
+
+def check(alias):
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor != 'postgresql':
+                # Отставание не измерить: достаточно, что схема на месте.
+                cursor.execute('SELECT COUNT(*) FROM django_migrations')
+                return True
+            cursor.execute(LAG_SQL)
+            lag, = cursor.fetchone()
+    except DatabaseError:
+        connection.close()
+        return False
+    return lag <= settings.REPLICA_MAX_LAG
+
+
+def choose_replica():
+    """Доступная реплика, выбранная случайно по весам, или None."""
+    replicas = [
+        (alias, weight)
+        for alias, weight in settings.DATABASE_REPLICAS.items()
+        if weight > 0 and health.is_healthy(alias)
+    ]
+    if not replicas:
+        return None
+    aliases, weights = zip(*replicas)
+    return random.choices(aliases, weights)[0]
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри ReplicaMiddleware, которым не нужна основная база,
+    идут на одну реплику, выбранную при первом чтении запроса. Запись,
+    а также чтения вне запросов (команды, фоновые задачи) — в основную.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.primary:
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            state.alias = choose_replica() or DEFAULT_DB_ALIAS
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def sticky_key(user_id):
+    return f'replica:primary:{user_id}'
+
+
+def token_user_id(request):
+    """user_id из заголовка с JWT без обращения к базе или None."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def is_sticky(request, user_id):
+    """Писал ли клиент в последние REPLICA_STICKY_SECONDS секунд."""
+    marked = request.get_signed_cookie(
+        settings.REPLICA_STICKY_COOKIE, default=None, salt=STICKY_SALT,
+        max_age=settings.REPLICA_STICKY_SECONDS,
+    )
+    if marked is not None:
+        return True
+    return user_id is not None and bool(cache.get(sticky_key(user_id)))
+
+
+def stick(response, user_id):
+    """
+    Отправляет следующие чтения клиента в основную базу: через cookie
+    и, для клиентов с JWT без cookie, через метку в кэше по user_id.
+    """
+    window = settings.REPLICA_STICKY_SECONDS
+    response.set_signed_cookie(
+        settings.REPLICA_STICKY_COOKIE, '1', salt=STICKY_SALT,
+        max_age=window, httponly=True, samesite='Lax',
+    )
+    if user_id is not None:
+        cache.set(sticky_key(user_id), True, window)
@@ -1,8 +1,12 @@
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title
+from rest_framework.validators import UniqueValidator
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title)
 from users.models import User
 from users.validators import UsernameValidator
 
+SECOND_REVIEW_ERROR = "Писать второе ревью нельзя."
+
 
 class SignUpSerializer(serializers.Serializer):
     email = serializers.EmailField(max_length=254, required=True)
@@ -31,12 +35,29 @@ class TokenSerializer(serializers.Serializer):
         fields = ('username', 'confirmation_code')
 
 
+class ModerationSerializer(serializers.Serializer):
+    """Действие модератора и id отзывов или комментариев."""
+    action = serializers.ChoiceField(choices=('hide', 'show', 'delete'))
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+    )
+
+
 class UsersSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = (
             'username', 'email', 'first_name', 'last_name', 'bio', 'role'
         )
+        # Имя и почта удалённого пользователя заняты до очистки.
+        extra_kwargs = {
+            'username': {'validators': [
+                UsernameValidator(), UniqueValidator(User.all_objects.all())
+            ]},
+            'email': {'validators': [UniqueValidator(User.all_objects.all())]},
+        }
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -44,7 +65,11 @@ class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Category
-        exclude = ('id', )
+        exclude = ('id', 'deleted_at')
+        # slug удалённого объекта занят до очистки.
+        extra_kwargs = {'slug': {'validators': [
+            UniqueValidator(Category.all_objects.all())
+        ]}}
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -52,7 +77,11 @@ class GenreSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Genre
-        exclude = ('id', )
+        exclude = ('id', 'deleted_at')
+        # slug удалённого объекта занят до очистки.
+        extra_kwargs = {'slug': {'validators': [
+            UniqueValidator(Genre.all_objects.all())
+        ]}}
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
@@ -69,6 +98,41 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'description', 'genre', 'category')
 
 
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для массовой загрузки произведений. Slug'и сверяются
+    со словарями slug -> id из контекста, без запросов к базе.
+    """
+    genre = serializers.ListField(child=serializers.SlugField(),
+                                  allow_empty=False)
+    description = serializers.CharField(required=False, default='')
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        fields = ('name', 'year', 'description', 'genre', 'category')
+
+    def _resolve(self, slugs, context_key):
+        known = self.context[context_key]
+        unknown = [slug for slug in slugs if slug not in known]
+        if unknown:
+            raise serializers.ValidationError(
+                f'Не найдены slug: {", ".join(unknown)}'
+            )
+        return [known[slug] for slug in slugs]
+
+    def validate_genre(self, value):
+        return list(dict.fromkeys(self._resolve(value, 'genres')))
+
+    def validate_category(self, value):
+        return self._resolve([value], 'categories')[0]
+
+    def to_internal_value(self, data):
+        data = super().to_internal_value(data)
+        data['category_id'] = data.pop('category')
+        return data
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
     """Сериализатор для чтения модели произведения."""
     rating = serializers.ReadOnlyField()
@@ -80,6 +144,24 @@ class TitleReadSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'rating', 'description', 'genre',
                   'category')
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Удалённая категория остаётся у произведения до очистки.
+        if instance.category is not None and instance.category.deleted_at:
+            data['category'] = None
+        return data
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Произведение в рейтинге категории или жанра."""
+    id = serializers.IntegerField(source='title_id')
+    name = serializers.CharField(source='title.name')
+    year = serializers.IntegerField(source='title.year')
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('id', 'name', 'year', 'rating', 'rating_count', 'score')
+
 
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор для модели ревью."""
@@ -93,21 +175,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ("id", "text", "author", "score", "pub_date")
         model = Review
 
-    def validate(self, data):
-        """Запрещает пользователям писать второе ревью на произведение."""
-        request = self.context.get("request")
-        title_id = self.context.get("view").kwargs.get("title_id")
-        if (
-            request.method == "POST"
-            and Review.objects.filter(
-                author=request.user, title__id=title_id
-            ).exists()
-        ):
-            raise serializers.ValidationError(
-                "Писать второе ревью нельзя."
-            )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     """Сериализатор для модели комментария."""
@@ -122,3 +189,101 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ("id", "author", "review", "text", "pub_date")
         read_only_fields = ("review",)
         model = Comment
+
+
+class ValuesSerializer:
+    """
+    Сериализатор списков для режима FAST_READ_SERIALIZERS: строит те же
+    словари, что и обычный сериализатор, прямо из строк QuerySet.values(),
+    без полей DRF. Только для чтения.
+    """
+    # Поле ответа -> путь в QuerySet.values().
+    fields = {}
+    # Столбцы выборки, которых нет в ответе.
+    extra_values = ()
+    datetime_fields = ()
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def select(cls, queryset):
+        return queryset.values(*cls.fields.values(), *cls.extra_values)
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+    def to_representation(self, row):
+        return {
+            name: (
+                self.datetime(row[path]) if name in self.datetime_fields
+                else row[path]
+            )
+            for name, path in self.fields.items()
+        }
+
+    def datetime(self, value):
+        return self.datetime_field.to_representation(value)
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    """Произведения в форме TitleReadSerializer; жанры — одним запросом."""
+    fields = {
+        'id': 'id', 'name': 'name', 'year': 'year', 'rating': 'rating',
+        'description': 'description',
+    }
+    extra_values = ('category__name', 'category__slug',
+                    'category__deleted_at')
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        self.genres = {}
+        if rows:
+            links = Title.genre.through.objects.filter(
+                title_id__in=[row['id'] for row in rows],
+                genre__deleted_at__isnull=True,
+            ).order_by('genre_id').values_list(
+                'title_id', 'genre__name', 'genre__slug'
+            )
+            for title_id, name, slug in links:
+                self.genres.setdefault(title_id, []).append(
+                    {'name': name, 'slug': slug}
+                )
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        category = None
+        if (row['category__slug'] is not None
+                and row['category__deleted_at'] is None):
+            category = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        return {
+            **super().to_representation(row),
+            'genre': self.genres.get(row['id'], []),
+            'category': category,
+        }
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Отзывы в форме ReviewSerializer."""
+    fields = {
+        'id': 'id', 'text': 'text', 'author': 'author__username',
+        'score': 'score', 'pub_date': 'pub_date',
+    }
+    extra_values = ('updated_at',)
+    datetime_fields = ('pub_date',)
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Комментарии в форме CommentSerializer."""
+    fields = {
+        'id': 'id', 'author': 'author__username', 'review': 'review_id',
+        'text': 'text', 'pub_date': 'pub_date',
+    }
+    extra_values = ('updated_at',)
+    datetime_fields = ('pub_date',)
@@ -0,0 +1,36 @@
+from api.cache import RESOURCES, bump_version
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import bulk_changed
+
+# Какие закэшированные ресурсы устаревают при изменении модели.
+DEPENDENT_RESOURCES = {
+    Title: ('titles',),
+    Genre: ('genres', 'titles'),
+    Category: ('categories', 'titles'),
+    Review: ('titles',),
+}
+
+
+def invalidate_response_cache(sender, **kwargs):
+    bump_version(*DEPENDENT_RESOURCES[sender])
+
+
+for model in DEPENDENT_RESOURCES:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version('titles')
+
+
+@receiver(bulk_changed)
+def invalidate_bulk_changes(sender, resources, **kwargs):
+    """Массовые изменения в reviews обходят post_save и post_delete."""
+    stale = [resource for resource in resources if resource in RESOURCES]
+    if stale:
+        bump_version(*stale)
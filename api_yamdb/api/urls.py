@@ -1,7 +1,8 @@
 from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet, UsersViewSet, signup_post,
+                       ReviewViewSet, TitleViewSet, UsersViewSet, cache_stats,
+                       changes, export, leaderboard, moderation, signup_post,
                        token_post)
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 app_name = 'api'
@@ -25,5 +26,22 @@ router.register(
 urlpatterns = [
     path('v1/auth/token/', token_post, name='token'),
     path('v1/auth/signup/', signup_post, name='signup'),
+    path('v1/cache/stats/', cache_stats, name='cache_stats'),
+    path('v1/changes/', changes, name='changes'),
+    re_path(
+        r'^v1/export/(?P<resource>reviews|comments)\.(?P<fmt>ndjson|csv)$',
+        export,
+        name='export'
+    ),
+    re_path(
+        r'^v1/moderation/(?P<resource>reviews|comments)/$',
+        moderation,
+        name='moderation'
+    ),
+    re_path(
+        r'^v1/leaderboards/(?P<group>categories|genres)/(?P<slug>[-\w]+)/$',
+        leaderboard,
+        name='leaderboard'
+    ),
     path('v1/', include(router.urls)),
 ]
@@ -1,29 +1,51 @@
 import uuid
+from types import GeneratorType
 
+from api.bulk import import_titles
+from api.cache import get_stats, get_version
+from api.changes import changes_params, wait_changes
+from api.export import CONTENT_TYPES, export_lines
 from api.filters import TitleFilter
-from api.mixins import BaseListCreateDestroyView
-from api.permissions import (AuthorAndStaffOrReadOnly, IsAdminOrReadOnly,
-                             OwnerOrAdmins)
-from api.serializers import (CategorySerializer, CommentSerializer,
-                             GenreSerializer, ReviewSerializer,
-                             SignUpSerializer, TitleReadSerializer,
+from api.metrics import render as render_metrics
+from api.mixins import (BaseListCreateDestroyView, CachedListMixin,
+                        CachedRetrieveMixin, ConditionalPageListMixin,
+                        ConditionalRetrieveMixin, ConditionalVersionListMixin,
+                        SoftDestroyMixin, ValuesListMixin)
+from api.moderation import moderate
+from api.pagination import OptionalCursorPagination
+from api.parsers import NDJSONParser
+from api.permissions import (AuthorAndStaffOrReadOnly, IsAdmin,
+                             IsAdminOrReadOnly, IsModerator, OwnerOrAdmins)
+from api.renderers import PassthroughRenderer
+from api.serializers import (SECOND_REVIEW_ERROR, CategorySerializer,
+                             CommentSerializer, CommentValuesSerializer,
+                             GenreSerializer, LeaderboardEntrySerializer,
+                             ModerationSerializer, ReviewSerializer,
+                             ReviewValuesSerializer, SignUpSerializer,
+                             TitleReadSerializer, TitleValuesSerializer,
                              TitleWriteSerializer, TokenSerializer,
                              UsersSerializer)
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       renderer_classes)
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.tokens import AccessToken
+from reviews.leaderboards import top_titles
 from reviews.models import Category, Genre, Review, Title
-from users.models import User
+from users.models import OutboxEmail, User
 
 
 @api_view(['POST'])
@@ -46,11 +68,16 @@ def signup_post(request):
         )
     confirmation_code = str(uuid.uuid4())
     user.confirmation_code = confirmation_code
-    user.save()
-    send_mail(
-        'Код подверждения', confirmation_code,
-        settings.DEFAULT_FROM_EMAIL, (email, ), fail_silently=False
-    )
+    # Новый код и письмо с ним записываются вместе: иначе код сменится,
+    # а письмо с ним не уйдёт.
+    with transaction.atomic():
+        user.save()
+        OutboxEmail.objects.create(
+            subject='Код подверждения',
+            body=confirmation_code,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=email,
+        )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -69,7 +96,109 @@ def token_post(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    """Счётчики попаданий и промахов кэша ответов каталога."""
+    return Response(get_stats(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    """Метрики запросов в текстовом формате Prometheus."""
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+@renderer_classes([PassthroughRenderer])
+def export(request, resource, fmt):
+    """Потоковая выгрузка отзывов или комментариев в NDJSON или CSV."""
+    lines = export_lines(resource, fmt, request.query_params)
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{resource}.{fmt}"'
+    )
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsModerator])
+def moderation(request, resource):
+    """Массово скрывает, показывает или удаляет отзывы или комментарии."""
+    serializer = ModerationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    result = moderate(
+        resource, serializer.validated_data['action'], request.data,
+        ids=serializer.validated_data.get('ids'),
+    )
+    return Response(result, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def changes(request):
+    """
+    Журнал изменений каталога, отзывов и комментариев после since
+    по возрастанию seq. С wait ждёт новых записей до wait секунд.
+    """
+    params = changes_params(request.query_params)
+    results = wait_changes(**params)
+    last_seq = results[-1]['seq'] if results else params['since']
+    return Response({
+        'last_seq': last_seq,
+        'next': replace_query_param(
+            request.build_absolute_uri(), 'since', last_seq
+        ),
+        'results': results,
+    }, status=status.HTTP_200_OK)
+
+
+LEADERBOARD_GROUPS = {'categories': Category, 'genres': Genre}
+
+
+def leaderboard_params(query_params):
+    """Разбирает limit и min_reviews из параметров запроса."""
+    params = {}
+    for name, default in (
+        ('limit', settings.LEADERBOARD_SIZE), ('min_reviews', 0)
+    ):
+        value = query_params.get(name, default)
+        try:
+            params[name] = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({name: 'Ожидается целое число.'})
+        if params[name] < 0:
+            raise ValidationError({name: 'Ожидается неотрицательное число.'})
+    params['limit'] = min(params['limit'], settings.LEADERBOARD_SIZE)
+    # В рейтинге только произведения с LEADERBOARD_MIN_REVIEWS оценками;
+    # порог выше потребовал бы читать рейтинг мимо индекса.
+    if params.pop('min_reviews') > settings.LEADERBOARD_MIN_REVIEWS:
+        raise ValidationError({'min_reviews': (
+            'Рейтинг строится по произведениям не менее чем с '
+            f'{settings.LEADERBOARD_MIN_REVIEWS} оценками; '
+            'больший порог не поддерживается.'
+        )})
+    return params
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def leaderboard(request, group, slug):
+    """Лучшие произведения категории или жанра по взвешенной оценке."""
+    model = LEADERBOARD_GROUPS[group]
+    instance = get_object_or_404(model.objects.only('id'), slug=slug)
+    lookup = 'category' if model is Category else 'genre'
+    entries = top_titles(
+        **leaderboard_params(request.query_params), **{lookup: instance}
+    )
+    serializer = LeaderboardEntrySerializer(entries, many=True)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class UsersViewSet(SoftDestroyMixin, viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('pk')
     serializer_class = UsersSerializer
     pagination_class = PageNumberPagination
@@ -100,7 +229,9 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalVersionListMixin, ConditionalRetrieveMixin,
+                   CachedListMixin, CachedRetrieveMixin, ValuesListMixin,
+                   SoftDestroyMixin, viewsets.ModelViewSet):
     """
     Получить список всех произведений.
     Добавление нового произведения.
@@ -109,40 +240,68 @@ class TitleViewSet(viewsets.ModelViewSet):
     Удаление произведения.
     """
     queryset = Title.objects.all()
+    cache_resource = 'titles'
+    values_serializer_class = TitleValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
 
-    def get_rating(self, title):
-        return title.reviews.all().aggregate(rating=Avg('score'))['rating']
+    def get_queryset(self):
+        if self.action in ('list', 'retrieve'):
+            return self.queryset.select_related(
+                'category'
+            ).prefetch_related('genre')
+        return self.queryset.all()
+
+    def get_etag_parts(self):
+        return get_version('genres'), get_version('categories')
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
-    def retrieve(self, request, *args, **kwargs):
-        response = super().retrieve(request, *args, **kwargs)
-        title = self.get_object()
-        response.data['rating'] = self.get_rating(title)
-        return response
-
-    def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        for title in response.data['results']:
-            obj = get_object_or_404(Title, pk=title['id'])
-            title['rating'] = self.get_rating(obj)
-        return response
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='bulk',
+        permission_classes=(IsAdmin, ),
+        parser_classes=(JSONParser, NDJSONParser),
+    )
+    def bulk(self, request):
+        """
+        Массовая загрузка произведений из JSON-массива или NDJSON.
+        Если пачка не записалась в базу, ответ 500 сообщает, сколько
+        произведений уже создано и какие элементы не загружены.
+        """
+        items = request.data
+        if not isinstance(items, (list, GeneratorType)):
+            items = [items] if items else []
+        created, errors, failed = import_titles(items)
+        data = {'created': len(created), 'ids': created, 'errors': errors}
+        if failed is not None:
+            return Response(
+                dict(data, failed=failed),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return Response(
+            data,
+            status=(
+                status.HTTP_201_CREATED if created
+                else status.HTTP_400_BAD_REQUEST
+            )
+        )
 
 
-class CategoryViewSet(BaseListCreateDestroyView):
+class CategoryViewSet(CachedListMixin, BaseListCreateDestroyView):
     """
     Получить список всех категорий.
     Добавление новой категории.
     Удаление категории по полю slug.
     """
     queryset = Category.objects.all()
+    cache_resource = 'categories'
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
@@ -150,13 +309,14 @@ class CategoryViewSet(BaseListCreateDestroyView):
     search_fields = ('name',)
 
 
-class GenreViewSet(BaseListCreateDestroyView):
+class GenreViewSet(CachedListMixin, BaseListCreateDestroyView):
     """
     Получить список всех жанров.
     Добавление нового жанра.
     Удаление жанра по полю slug.
     """
     queryset = Genre.objects.all()
+    cache_resource = 'genres'
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
@@ -164,7 +324,8 @@ class GenreViewSet(BaseListCreateDestroyView):
     search_fields = ('name',)
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(ConditionalPageListMixin, ConditionalRetrieveMixin,
+                    ModelViewSet):
     """
     Получить список всех отзывов.
     Добавление нового отзыва.
@@ -174,20 +335,37 @@ class ReviewViewSet(ModelViewSet):
     """
 
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = (AuthorAndStaffOrReadOnly,)
+    pagination_class = OptionalCursorPagination
     http_method_names = ("get", "post", "delete", "patch")
 
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get("title_id"))
+    @cached_property
+    def title(self):
+        """Произведение из URL: загружается один раз за запрос."""
+        return get_object_or_404(
+            Title.objects.only("id"), pk=self.kwargs.get("title_id")
+        )
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        # Отзывы удалённых пользователей скрыты до очистки.
+        return self.title.reviews.filter(
+            is_hidden=False, author__deleted_at__isnull=True
+        ).select_related("author")
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        # Повторный отзыв отсекает уникальный индекс, без отдельного SELECT.
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=self.title)
+        except IntegrityError:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [SECOND_REVIEW_ERROR]}
+            )
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(ConditionalPageListMixin, ConditionalRetrieveMixin,
+                     ModelViewSet):
     """
     Получить список всех комментариев.
     Добавление нового комментария к отзыву.
@@ -197,18 +375,31 @@ class CommentViewSet(ModelViewSet):
     """
 
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = (AuthorAndStaffOrReadOnly,)
+    pagination_class = OptionalCursorPagination
     http_method_names = ("get", "post", "delete", "patch")
 
-    def get_review(self):
+    @cached_property
+    def review(self):
+        """
+        Отзыв из URL вместе с проверкой, что он относится к произведению
+        из URL: одна выборка на запрос. Отзывы удалённых произведений и
+        пользователей не видны, как и их комментарии.
+        """
         return get_object_or_404(
-            Review,
+            Review.objects.only("id", "title_id"),
             id=self.kwargs.get("review_id"),
+            is_hidden=False,
             title_id=self.kwargs.get("title_id"),
+            title__deleted_at__isnull=True,
+            author__deleted_at__isnull=True,
         )
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.review.comments.filter(
+            is_hidden=False, author__deleted_at__isnull=True
+        ).select_related("author")
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=self.request.user, review=self.review)
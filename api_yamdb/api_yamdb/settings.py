@@ -31,6 +31,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
+    'api.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +77,49 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: DB_REPLICAS — адреса через запятую, у каждого
+# необязательный вес после «*», например «replica1*3,replica2». Адрес —
+# хост PostgreSQL или файл SQLite, остальные параметры как у default.
+DATABASE_REPLICAS = {}
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(',')), 1
+):
+    address, _, weight = replica.strip().partition('*')
+    address_key = (
+        'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3')
+        else 'HOST'
+    )
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        address_key: address,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS[f'replica{number}'] = int(weight or 1)
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# После записи клиент столько секунд читает с основной базы; метка
+# хранится в cookie и в кэше по user_id из JWT. Реплика, которая не
+# отвечает или отстаёт больше REPLICA_MAX_LAG секунд, исключается
+# до следующей проверки через REPLICA_HEALTH_INTERVAL секунд.
+REPLICA_STICKY_SECONDS = 10
+REPLICA_STICKY_COOKIE = 'primary_reads'
+REPLICA_MAX_LAG = 5
+REPLICA_HEALTH_INTERVAL = 5
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -109,15 +155,49 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
 }
 
+# Курсорная пагинация отзывов и комментариев вместо постраничной по умолчанию.
+NESTED_CURSOR_PAGINATION = False
+
+# Профилирование запросов: доля случайных запросов, заголовок, с которым
+# администратор профилирует свой запрос, порог медленного запроса
+# в секундах и кольцевой буфер записей на диске. Параметры SQL-запросов
+# (коды, почты, хэши паролей) записываются только с PROFILE_CAPTURE_PARAMS.
+REQUEST_PROFILING = False
+PROFILE_SAMPLE_RATE = 0.01
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_SLOW_THRESHOLD = 1.0
+PROFILE_CAPTURE_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILE_CAPTURE_LIMIT = 200
+PROFILE_CAPTURE_PARAMS = False
+
+# Списки произведений, отзывов и комментариев собираются из .values()
+# без ModelSerializer и рендерятся через orjson; форма ответа не меняется.
+FAST_READ_SERIALIZERS = False
+
+# Сколько строк за раз читать из серверного курсора при выгрузке.
+EXPORT_CHUNK_SIZE = 2000
+
+# Рейтинги произведений по категориям и жанрам. Произведения с меньшим
+# числом оценок, чем LEADERBOARD_MIN_REVIEWS, в них не попадают; оценка
+# сглаживается LEADERBOARD_PRIOR_REVIEWS оценками LEADERBOARD_PRIOR_SCORE.
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MIN_REVIEWS = 3
+LEADERBOARD_PRIOR_REVIEWS = 10
+LEADERBOARD_PRIOR_SCORE = 5.5
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -125,6 +205,47 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'users.User'
 
+# Кэш пользователей для JWT-аутентификации: общий и в памяти процесса.
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = 300
+AUTH_USER_LOCAL_TIMEOUT = 5
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 ACCOUNT_EMAIL_VERIFICATION = "none"
 DEFAULT_FROM_EMAIL = 'admin@email.com'
+
+# Списки отзывов, комментариев и произведений в админке: без фильтров
+# число строк берётся из статистики PostgreSQL, если таблица больше
+# ADMIN_ESTIMATED_COUNT_FROM строк; с фильтрами COUNT останавливается
+# на ADMIN_COUNT_LIMIT строках.
+ADMIN_ESTIMATED_COUNT_FROM = 100000
+ADMIN_COUNT_LIMIT = 10000
+
+# Удалённые через API пользователи, произведения, категории и жанры
+# только помечаются; зависимые строки пачками удаляет purge_deleted.
+PURGE_BATCH_SIZE = 1000
+
+# Массовая модерация отзывов и комментариев меняет за один запрос не
+# больше MODERATION_LIMIT строк: одна транзакция не держит блокировки
+# на всю таблицу.
+MODERATION_LIMIT = 10000
+
+# Журнал изменений /api/v1/changes/: размер страницы, предел ожидания
+# новых записей (меньше таймаута gunicorn в 30 секунд) и период опроса.
+# Пропуск в номерах моложе CHANGES_SETTLE_SECONDS считается незавершённой
+# транзакцией, и выдача на нём останавливается; старше — откатом. Поэтому
+# транзакция, пишущая в журнал, должна завершиться быстрее
+# CHANGES_SETTLE_SECONDS после первой записи, иначе потребители могут её
+# пропустить. Пропуск перед первой записью журнала (since=0) не
+# проверяется.
+CHANGES_PAGE_SIZE = 500
+CHANGES_MAX_WAIT = 20
+CHANGES_POLL_INTERVAL = 0.5
+CHANGES_SETTLE_SECONDS = 30
+
+# Очередь писем разбирает команда send_emails.
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Сколько секунд взятые в работу письма не выдаются другим обработчикам.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
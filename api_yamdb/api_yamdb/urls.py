@@ -1,3 +1,4 @@
+from api.views import metrics
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
@@ -6,6 +7,7 @@ urlpatterns = [
 
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('metrics', metrics, name='metrics'),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
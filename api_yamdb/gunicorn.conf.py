@@ -0,0 +1,51 @@
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+# Потоковые воркеры: долгий опрос /api/v1/changes/ с wait занимает
+# поток, а не весь процесс, и не задерживает остальные запросы.
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', default=2))
+threads = int(os.getenv('GUNICORN_THREADS', default=8))
+
+# Кэши, которые не видят записей других процессов.
+LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def check_caches():
+    """
+    Без DEBUG кэш ответов и пользователей должен быть общим для всех
+    процессов: иначе инвалидация в одном процессе не видна остальным,
+    и они отдают устаревшие данные.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+
+    if settings.DEBUG:
+        return
+    for alias in {settings.RESPONSE_CACHE_ALIAS,
+                  settings.AUTH_USER_CACHE_ALIAS}:
+        backend = settings.CACHES[alias]['BACKEND']
+        if backend in LOCAL_CACHES:
+            raise RuntimeError(
+                f'Кэш {alias!r} ({backend}) локален для процесса: задайте '
+                'общий кэш в CACHE_BACKEND и CACHE_LOCATION.'
+            )
+
+
+def on_starting(server):
+    """
+    Проверяет кэши и очищает каталог метрик от файлов прошлого запуска.
+    """
+    check_caches()
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Метрики завершившегося процесса перестают учитываться в живых."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
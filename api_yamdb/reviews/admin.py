@@ -1,35 +1,177 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import (ERROR_FLAG, IGNORED_PARAMS,
+                                             PAGE_VAR, SEARCH_VAR)
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.forms.models import BaseInlineFormSet
+from django.utils.functional import cached_property
 from reviews.models import Category, Comment, Genre, Review, Title
 
 
+def estimated_count(model):
+    """Число строк таблицы по статистике PostgreSQL или None."""
+    connection = connections[router.db_for_read(model)]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # До первого ANALYZE статистики нет: reltuples равен -1.
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки для больших таблиц. Без фильтров число
+    строк берётся из статистики PostgreSQL, если таблица больше
+    ADMIN_ESTIMATED_COUNT_FROM строк; с фильтрами и поиском COUNT
+    останавливается на ADMIN_COUNT_LIMIT строках.
+    """
+
+    def __init__(self, *args, filtered=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.filtered = filtered
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if self.filtered:
+            return queryset.order_by()[:settings.ADMIN_COUNT_LIMIT].count()
+        estimate = estimated_count(queryset.model)
+        if estimate is not None and (
+            estimate >= settings.ADMIN_ESTIMATED_COUNT_FROM
+        ):
+            return estimate
+        return queryset.count()
+
+
+def is_filtered(request):
+    """Сужают ли параметры списка админки выборку: фильтры или поиск."""
+    params = set(request.GET) - {PAGE_VAR, ERROR_FLAG, *IGNORED_PARAMS}
+    return bool(params or request.GET.get(SEARCH_VAR))
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без полного COUNT(*) на каждой странице."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            filtered=is_filtered(request),
+        )
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Формсет встроенного списка, который показывает одну страницу."""
+    request = None
+    per_page = 20
+
+    @property
+    def page_param(self):
+        return f'{self.prefix}-page'
+
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self.page = paginator.get_page(
+                self.request.GET.get(self.page_param)
+            )
+            self._queryset = self.page.object_list
+        return self._queryset
+
+
+class PaginatedTabularInline(admin.TabularInline):
+    """Встроенный список только для чтения по per_page строк."""
+    formset = PaginatedInlineFormSet
+    template = 'admin/reviews/paginated_tabular.html'
+    per_page = 20
+    extra = 0
+    can_delete = False
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.request = request
+        formset.per_page = self.per_page
+        return formset
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
 class GenresInline(admin.TabularInline):
     model = Title.genre.through
+    autocomplete_fields = ('genre',)
+    extra = 1
 
 
-class TitleAdmin(admin.ModelAdmin):
+class GenreTitlesInline(PaginatedTabularInline):
+    model = Title.genre.through
+    fields = ('title',)
+    verbose_name = 'Произведение'
+    verbose_name_plural = 'Произведения жанра'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('title')
+
+
+class TitleAdmin(LargeTableAdmin):
     list_display = ('pk', 'name', 'category', 'year', 'description')
+    list_select_related = ('category',)
+    autocomplete_fields = ('category',)
+    search_fields = ('name',)
     inlines = [
         GenresInline
     ]
     exclude = ('genre',)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ('pk', 'text', 'pub_date', 'review', 'author')
+    list_select_related = ('review', 'author')
+    autocomplete_fields = ('review', 'author')
 
 
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     list_display = ('pk', 'title', 'text', 'pub_date', 'author', 'score')
+    list_select_related = ('title', 'author')
+    autocomplete_fields = ('title', 'author')
+    search_fields = ('author__username',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Id отзыва или точное имя автора: поиск по индексам, без LIKE.
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        return queryset.filter(author__username=term), False
 
 
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('pk', 'name', 'slug')
+    search_fields = ('name', 'slug')
 
 
 class GenreAdmin(admin.ModelAdmin):
     list_display = ('pk', 'name', 'slug')
+    search_fields = ('name', 'slug')
     inlines = [
-        GenresInline
+        GenreTitlesInline
     ]
 
 
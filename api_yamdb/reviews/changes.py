@@ -0,0 +1,128 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, router
+from django.db.models import (BigIntegerField, CharField, DateTimeField, F,
+                              Max, Value)
+from django.utils import timezone
+from reviews.models import Category, Change, Comment, Genre, Review, Title
+
+UPSERT = Change.UPSERT
+DELETE = Change.DELETE
+TitleGenre = Title.genre.through
+
+# Модель -> ресурс журнала и пути к slug, id произведения и id отзыва.
+TRACKED = {
+    Category: ('categories', 'slug', None, None),
+    Genre: ('genres', 'slug', None, None),
+    Title: ('titles', None, None, None),
+    Review: ('reviews', None, 'title_id', None),
+    Comment: ('comments', None, 'review__title_id', 'review_id'),
+}
+COLUMNS = (
+    'resource', 'action', 'object_id', 'slug', 'title_id', 'review_id',
+    'changed_at',
+)
+
+
+def _attribute(instance, path):
+    if path is None:
+        return None
+    for name in path.split('__'):
+        instance = getattr(instance, name)
+    return instance
+
+
+def _entry(instance, action, changed_at):
+    resource, slug, title, review = TRACKED[instance._meta.concrete_model]
+    return Change(
+        resource=resource, action=action, object_id=instance.pk,
+        slug=_attribute(instance, slug), title_id=_attribute(instance, title),
+        review_id=_attribute(instance, review), changed_at=changed_at,
+    )
+
+
+def record(instances, action):
+    """Записывает изменения объектов отслеживаемых моделей одним INSERT."""
+    changed_at = timezone.now()
+    entries = [
+        _entry(instance, action, changed_at) for instance in instances
+        if instance._meta.concrete_model in TRACKED
+    ]
+    Change.objects.bulk_create(entries)
+
+
+def _value(path, field):
+    if path is None:
+        return Value(None, output_field=field)
+    return F(path)
+
+
+def record_queryset(queryset, action):
+    """
+    Записывает изменения всех строк выборки одним INSERT ... SELECT:
+    для массовых UPDATE, DELETE и bulk_create, где объектов в памяти нет.
+    Вызывается до DELETE или UPDATE, меняющего условия выборки.
+    Возвращает число записей.
+    """
+    if queryset.model not in TRACKED:
+        return 0
+    resource, slug, title, review = TRACKED[queryset.model]
+    using = router.db_for_write(Change)
+    connection = connections[using]
+    # Аннотации попадают в SELECT в порядке объявления: как COLUMNS.
+    values = {
+        'change_resource': Value(resource, output_field=CharField()),
+        'change_action': Value(action, output_field=CharField()),
+        'change_object_id': F('pk'),
+        'change_slug': _value(slug, CharField()),
+        'change_title_id': _value(title, BigIntegerField()),
+        'change_review_id': _value(review, BigIntegerField()),
+        'change_changed_at': Value(
+            timezone.now(), output_field=DateTimeField()
+        ),
+    }
+    rows = queryset.order_by().annotate(**values).values_list(*values)
+    try:
+        select, params = rows.query.get_compiler(using).as_sql()
+    except EmptyResultSet:
+        return 0
+    columns = ', '.join(
+        connection.ops.quote_name(Change._meta.get_field(name).column)
+        for name in COLUMNS
+    )
+    table = connection.ops.quote_name(Change._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) {select}', params
+        )
+        return cursor.rowcount
+
+
+def bulk_create(model, objects, **kwargs):
+    """
+    bulk_create, который пишет вставленные строки в журнал изменений в
+    той же транзакции. Если база не вернула id, в журнал попадают строки
+    с id больше прежнего максимума. Новые связи с жанрами меняют свои
+    произведения.
+    """
+    objects = list(objects)
+    if model not in TRACKED:
+        model.objects.bulk_create(objects, **kwargs)
+        if model is TitleGenre:
+            record_queryset(Title.all_objects.filter(
+                pk__in={link.title_id for link in objects}
+            ), UPSERT)
+        return
+    manager = model._base_manager
+    since = None
+    if any(instance.pk is None for instance in objects):
+        since = manager.aggregate(last=Max('pk'))['last'] or 0
+    model.objects.bulk_create(objects, **kwargs)
+    if since is not None and any(
+        instance.pk is None for instance in objects
+    ):
+        record_queryset(manager.filter(pk__gt=since), UPSERT)
+    else:
+        record_queryset(
+            manager.filter(pk__in=[instance.pk for instance in objects]),
+            UPSERT,
+        )
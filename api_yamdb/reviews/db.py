@@ -0,0 +1,33 @@
+from django.db import models
+from django.db.models import OrderBy
+
+
+def run_for_vendor(statements):
+    """
+    Функция для migrations.RunPython, выполняющая SQL для текущей СУБД:
+    statements — словарь vendor -> список запросов.
+    """
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, ()):
+            schema_editor.execute(sql)
+    return run
+
+
+class NullsOrderIndex(models.Index):
+    """
+    Индекс с NULLS FIRST или NULLS LAST в столбцах-выражениях. SQLite не
+    принимает их в CREATE INDEX, а NULL у неё и так меньше любого
+    значения: там столбцы создаются без этих модификаторов.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'sqlite':
+            return super().create_sql(model, schema_editor, using, **kwargs)
+        _, expressions, options = self.deconstruct()
+        index = models.Index(*(
+            OrderBy(expression.expression, descending=expression.descending)
+            if isinstance(expression, OrderBy) else expression
+            for expression in expressions
+        ), **options)
+        return index.create_sql(model, schema_editor, using, **kwargs)
@@ -0,0 +1,132 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from reviews.models import LeaderboardEntry, Title
+
+
+def weighted_score(rating_sum, rating_count):
+    """
+    Байесовская оценка: к оценкам произведения добавляются
+    LEADERBOARD_PRIOR_REVIEWS воображаемых оценок LEADERBOARD_PRIOR_SCORE,
+    поэтому несколько высоких оценок не обгоняют сотню чуть более низких.
+    """
+    prior = settings.LEADERBOARD_PRIOR_REVIEWS
+    return (
+        (prior * settings.LEADERBOARD_PRIOR_SCORE + rating_sum)
+        / (prior + rating_count)
+    )
+
+
+def build_entries(title, genre_ids):
+    """Строки рейтинга произведения для его категории и жанров."""
+    values = {
+        'title_id': title.pk,
+        'score': weighted_score(title.rating_sum, title.rating_count),
+        'rating': title.rating,
+        'rating_count': title.rating_count,
+    }
+    entries = [
+        LeaderboardEntry(genre_id=genre_id, **values)
+        for genre_id in genre_ids
+    ]
+    if title.category_id is not None:
+        entries.append(LeaderboardEntry(category_id=title.category_id,
+                                        **values))
+    return entries
+
+
+def rated_titles():
+    return Title.objects.filter(
+        rating_count__gte=settings.LEADERBOARD_MIN_REVIEWS
+    ).only('category_id', 'rating_sum', 'rating_count', 'rating')
+
+
+def title_genres(title_ids):
+    genres = {}
+    links = Title.genre.through.objects.filter(
+        title_id__in=title_ids
+    ).values_list('title_id', 'genre_id')
+    for title_id, genre_id in links:
+        genres.setdefault(title_id, []).append(genre_id)
+    return genres
+
+
+def refresh_titles(title_ids):
+    """Заново строит строки рейтинга для указанных произведений."""
+    title_ids = list(title_ids)
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(title_id__in=title_ids).delete()
+        titles = list(rated_titles().filter(pk__in=title_ids))
+        genres = title_genres([title.pk for title in titles])
+        LeaderboardEntry.objects.bulk_create([
+            entry for title in titles
+            for entry in build_entries(title, genres.get(title.pk, ()))
+        ])
+
+
+def update_title(title_id, count_delta):
+    """
+    Переносит изменившийся рейтинг произведения в его строки рейтинга.
+    Обычно это один UPDATE; строки появляются, когда оценок становится
+    достаточно, и удаляются, когда их становится меньше порога.
+    """
+    title = Title.objects.filter(pk=title_id).values(
+        'rating_sum', 'rating_count', 'rating'
+    ).first()
+    entries = LeaderboardEntry.objects.filter(title_id=title_id)
+    if title is None or (
+        title['rating_count'] < settings.LEADERBOARD_MIN_REVIEWS
+    ):
+        # Пока оценок меньше порога и их число не уменьшилось,
+        # строк у произведения нет и удалять нечего.
+        if count_delta < 0:
+            entries.delete()
+        return
+    updated = entries.update(
+        score=weighted_score(title['rating_sum'], title['rating_count']),
+        rating=title['rating'],
+        rating_count=title['rating_count'],
+    )
+    # Строки добавляются только при росте числа оценок: при удалении
+    # произведения каскадом его строки уже удалены и создавать их нельзя.
+    if not updated and count_delta > 0:
+        refresh_titles([title_id])
+
+
+def rebuild(batch_size=1000):
+    """Полностью перестраивает таблицу рейтингов. Возвращает число строк."""
+    created = 0
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        titles = rated_titles().order_by('pk').iterator(chunk_size=batch_size)
+        while True:
+            batch = list(islice(titles, batch_size))
+            if not batch:
+                return created
+            genres = title_genres([title.pk for title in batch])
+            entries = [
+                entry for title in batch
+                for entry in build_entries(title, genres.get(title.pk, ()))
+            ]
+            LeaderboardEntry.objects.bulk_create(entries,
+                                                 batch_size=batch_size)
+            created += len(entries)
+
+
+def top_titles(limit, category=None, genre=None):
+    """
+    Первые limit строк рейтинга категории или жанра — чтение по индексу.
+    Другого порога числа оценок, кроме LEADERBOARD_MIN_REVIEWS, нет:
+    условие на rating_count индекс не покрывает, и при высоком пороге
+    чтение прошло бы почти весь рейтинг.
+    """
+    entries = LeaderboardEntry.objects.select_related('title').only(
+        'score', 'rating', 'rating_count',
+        'title__name', 'title__year',
+    )
+    if category is not None:
+        entries = entries.filter(category=category)
+    else:
+        entries = entries.filter(genre=genre)
+    return entries.order_by('-score', 'title_id')[:limit]
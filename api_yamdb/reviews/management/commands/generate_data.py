@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from reviews.synthetic import CATEGORIES, GENRES, Generator
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями, '
+        'жанрами, произведениями, отзывами и комментариями. Число отзывов '
+        'на произведение и комментариев на отзыв распределено по Ципфу.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 10000), ('categories', len(CATEGORIES)),
+            ('genres', len(GENRES)), ('titles', 100000),
+            ('reviews', 1000000), ('comments', 2000000),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько создать: {name}.',
+            )
+        parser.add_argument(
+            '--review-skew', type=float, default=1.0,
+            help='Показатель Ципфа для отзывов на произведение; '
+                 '0 — поровну.',
+        )
+        parser.add_argument(
+            '--comment-skew', type=float, default=1.0,
+            help='Показатель Ципфа для комментариев на отзыв; 0 — поровну.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: с тем же зерном и --workers 1 данные '
+                 'повторяются.',
+        )
+        parser.add_argument(
+            '--prefix', default='synthetic',
+            help='Начало имён пользователей и slug категорий и жанров.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Строк в одном bulk_create.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Сколько процессов вставляют строки; в SQLite всегда один.',
+        )
+        parser.add_argument(
+            '--skip-change-log', action='store_false', dest='log_changes',
+            help='Не писать строки в журнал изменений.',
+        )
+
+    def handle(self, *args, **options):
+        generator = Generator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            stdout=self.stdout,
+            review_skew=options['review_skew'],
+            comment_skew=options['comment_skew'],
+            workers=options['workers'],
+            log_changes=options['log_changes'],
+        )
+        created = generator.generate(
+            options['users'], options['titles'],
+            options['reviews'], options['comments'],
+            categories=options['categories'], genres=options['genres'],
+        )
+        self.stdout.write(self.style.SUCCESS(', '.join(
+            f'{name}: {count}' for name, count in created.items()
+        )))
@@ -0,0 +1,259 @@
+import csv
+import json
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from reviews import changes
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import bulk_changed
+from users.models import User
+
+PROGRESS_EVERY = 5
+
+
+def read_rows(path):
+    """Построчно читает CSV или NDJSON, не загружая файл целиком."""
+    with open(path, newline='', encoding='utf-8') as file:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def to_datetime(value):
+    value = parse_datetime(value) if isinstance(value, str) else value
+    if value is None or timezone.is_aware(value):
+        return value
+    return timezone.make_aware(value)
+
+
+def to_id(value):
+    """Значение столбца с id: пустое — None, иначе число."""
+    if value in ('', None):
+        return None
+    return int(value)
+
+
+class KeyMap:
+    """
+    Словарь natural key -> id для ссылок вида slug или username. Значение
+    всегда ищется по natural key, даже если состоит из цифр: ссылки по id
+    задаются столбцами с id (см. reference()).
+    """
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.ids = None
+
+    def __call__(self, value):
+        if value in ('', None):
+            return None
+        if self.ids is None:
+            self.ids = dict(
+                self.model.objects.values_list(self.field, 'id').iterator()
+            )
+        try:
+            return self.ids[str(value)]
+        except KeyError:
+            raise CommandError(
+                f'{self.model.__name__} с {self.field}={value} не найден'
+            )
+
+
+class Source:
+    """Как строка входного файла превращается в объект модели."""
+
+    def __init__(self, model, columns, defaults=None):
+        self.model = model
+        self.columns = columns
+        self.defaults = defaults or {}
+
+    def build(self, row, date_fields):
+        values = dict(self.defaults)
+        for column, value in row.items():
+            if column in self.columns:
+                attname, convert = self.columns[column]
+                values[attname] = convert(value)
+        now = timezone.now()
+        for attname in date_fields:
+            if values.get(attname) is None:
+                values[attname] = values.get('pub_date') or now
+        return self.model(**values)
+
+
+def reference(column, key_map, id_columns):
+    """
+    Столбцы ссылки на модель: column_id всегда содержит id, column —
+    natural key из key_map или id, если column указан в id_columns.
+    """
+    attname = f'{column}_id'
+    convert = to_id if column in id_columns else key_map
+    return {column: (attname, convert), attname: (attname, to_id)}
+
+
+def _source_specs(id_columns=()):
+    user_ref = KeyMap(User, 'username')
+    category_ref = KeyMap(Category, 'slug')
+    genre_ref = KeyMap(Genre, 'slug')
+    text = str
+    catalog = {'id': ('id', int), 'name': ('name', text),
+               'slug': ('slug', text)}
+    return {
+        'users': Source(User, {
+            'id': ('id', int), 'username': ('username', text),
+            'email': ('email', text), 'role': ('role', text),
+            'bio': ('bio', text), 'first_name': ('first_name', text),
+            'last_name': ('last_name', text),
+        }, defaults={'password': UNUSABLE_PASSWORD_PREFIX}),
+        'categories': Source(Category, catalog),
+        'genres': Source(Genre, catalog),
+        'titles': Source(Title, {
+            'id': ('id', int), 'name': ('name', text),
+            'year': ('year', int), 'description': ('description', text),
+            **reference('category', category_ref, id_columns),
+        }),
+        'genre_titles': Source(Title.genre.through, {
+            'id': ('id', int),
+            'title': ('title_id', int), 'title_id': ('title_id', int),
+            **reference('genre', genre_ref, id_columns),
+        }),
+        'reviews': Source(Review, {
+            'id': ('id', int),
+            'title': ('title_id', int), 'title_id': ('title_id', int),
+            **reference('author', user_ref, id_columns),
+            'text': ('text', text), 'score': ('score', int),
+            'pub_date': ('pub_date', to_datetime),
+        }),
+        'comments': Source(Comment, {
+            'id': ('id', int),
+            'review': ('review_id', int), 'review_id': ('review_id', int),
+            **reference('author', user_ref, id_columns),
+            'text': ('text', text), 'pub_date': ('pub_date', to_datetime),
+        }),
+    }
+
+
+@contextmanager
+def source_dates(model):
+    """
+    Отключает auto_now и auto_now_add на время загрузки, чтобы даты
+    из файла не перезаписывались. Возвращает имена этих полей.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield [field.attname for field in fields]
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает пользователей, категории, жанры, произведения, '
+        'связи с жанрами, отзывы и комментарии из CSV или NDJSON.'
+    )
+
+    def add_arguments(self, parser):
+        for name in _source_specs():
+            parser.add_argument(
+                f'--{name.replace("_", "-")}',
+                dest=name,
+                help=f'Файл {name} в формате .csv или .ndjson.',
+            )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Строк в одном bulk_create.',
+        )
+        parser.add_argument(
+            '--batches-per-transaction', type=int, default=10,
+            help='Сколько пачек вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, нарушающие уникальность.',
+        )
+        parser.add_argument(
+            '--id-columns', default='', metavar='author,category,genre',
+            help='Столбцы author, category и genre, в которых id, а не '
+                 'username или slug, например в исходных CSV YaMDb. '
+                 'Столбцы *_id всегда содержат id.',
+        )
+
+    def handle(self, *args, **options):
+        loaded = []
+        id_columns = set(filter(None, options['id_columns'].split(',')))
+        unknown = id_columns - {'author', 'category', 'genre'}
+        if unknown:
+            raise CommandError(
+                f'Неизвестные столбцы в --id-columns: {", ".join(unknown)}'
+            )
+        for name, source in _source_specs(id_columns).items():
+            if options[name]:
+                self.load(name, source, options[name], options)
+                loaded.append(source.model)
+        if not loaded:
+            raise CommandError('Не указано ни одного файла для загрузки.')
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), loaded):
+                cursor.execute(sql)
+        if Review in loaded:
+            call_command('recalculate_ratings', stdout=self.stdout)
+        if {Review, Title, Title.genre.through} & set(loaded):
+            call_command('rebuild_leaderboards', stdout=self.stdout)
+        bulk_changed.send(sender=Command, resources=[
+            resource for resource, *_ in changes.TRACKED.values()
+        ])
+
+    def load(self, name, source, path, options):
+        started = reported = time.monotonic()
+        total = 0
+        with source_dates(source.model) as date_fields:
+            objects = (
+                source.build(row, date_fields) for row in read_rows(path)
+            )
+            while True:
+                inserted = self.insert_chunk(source.model, objects, options)
+                if not inserted:
+                    break
+                total += inserted
+                if time.monotonic() - reported >= PROGRESS_EVERY:
+                    reported = time.monotonic()
+                    self.report(name, total, reported - started)
+        self.report(name, total, time.monotonic() - started, final=True)
+
+    def insert_chunk(self, model, objects, options):
+        """Вставляет несколько пачек в одной транзакции."""
+        inserted = 0
+        with transaction.atomic():
+            for _ in range(options['batches_per_transaction']):
+                batch = list(islice(objects, options['batch_size']))
+                if not batch:
+                    break
+                changes.bulk_create(
+                    model, batch, ignore_conflicts=options['ignore_conflicts']
+                )
+                inserted += len(batch)
+        return inserted
+
+    def report(self, name, total, elapsed, final=False):
+        rate = total / elapsed if elapsed else total
+        message = f'{name}: {total} строк за {elapsed:.1f} с ({rate:.0f}/с)'
+        self.stdout.write(self.style.SUCCESS(message) if final else message)
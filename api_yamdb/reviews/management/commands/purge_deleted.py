@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.purge import pending_counts, purge_step
+
+
+class Command(BaseCommand):
+    help = (
+        'Пачками удаляет зависимые строки помеченных удалёнными '
+        'пользователей, произведений, категорий и жанров, затем сами '
+        'объекты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.PURGE_BATCH_SIZE,
+            help='Сколько строк удалять или обновлять за один шаг.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах, когда очищать нечего.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Очистить всё помеченное один раз и завершиться.',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Показать число объектов, ждущих очистки, и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for name, count in pending_counts().items():
+                self.stdout.write(f'{name}: {count}')
+            return
+        progress = {}
+        while True:
+            result = purge_step(options['batch_size'])
+            if result is not None:
+                self.report(progress, *result)
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
+
+    def report(self, progress, instance, label, processed):
+        name = f'{instance._meta.verbose_name} #{instance.pk}'
+        if label is None:
+            progress.pop(name, None)
+            self.stdout.write(
+                self.style.SUCCESS(f'{name}: удаление завершено')
+            )
+            return
+        done = progress.setdefault(name, {})
+        done[label] = done.get(label, 0) + processed
+        self.stdout.write(f'{name}: {label} — {done[label]}')
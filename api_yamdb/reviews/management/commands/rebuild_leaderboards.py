@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает рейтинги произведений по категориям и жанрам '
+        'из сохранённых рейтингов произведений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько произведений обрабатывать за раз.',
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк в рейтингах: {created}'
+        ))
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from reviews import changes
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённые рейтинги произведений по таблице ревью '
+        'и сообщает о расхождениях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, ничего не исправляя.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пачки для bulk_update.',
+        )
+
+    def handle(self, *args, **options):
+        # Оценки скрытых модератором отзывов в рейтинг не входят.
+        visible = Review.objects.filter(is_hidden=False).order_by()
+        actual = {
+            row['title_id']: (row['total'], row['amount'])
+            for row in visible.values('title_id').annotate(
+                total=Sum('score'), amount=Count('id')
+            )
+        }
+        drifted = []
+        titles = Title.objects.only('rating_sum', 'rating_count', 'rating')
+        for title in titles.iterator(chunk_size=options['batch_size']):
+            total, amount = actual.get(title.pk, (0, 0))
+            rating = total / amount if amount else None
+            if (title.rating_sum, title.rating_count, title.rating) == (
+                total, amount, rating
+            ):
+                continue
+            if options['verbosity'] > 0:
+                self.stdout.write(
+                    f'Произведение {title.pk}: сумма {title.rating_sum} -> '
+                    f'{total}, количество {title.rating_count} -> {amount}'
+                )
+            title.rating_sum = total
+            title.rating_count = amount
+            title.rating = rating
+            drifted.append(title)
+        if drifted and not options['dry_run']:
+            with transaction.atomic():
+                Title.objects.bulk_update(
+                    drifted,
+                    ('rating_sum', 'rating_count', 'rating'),
+                    batch_size=options['batch_size'],
+                )
+                size = options['batch_size']
+                for start in range(0, len(drifted), size):
+                    changes.record_queryset(Title.all_objects.filter(pk__in=[
+                        title.pk for title in drifted[start:start + size]
+                    ]), changes.UPSERT)
+        self.stdout.write(self.style.SUCCESS(
+            f'Расхождений найдено: {len(drifted)}'
+            + (' (не исправлены)' if options['dry_run'] else '')
+        ))
@@ -0,0 +1,81 @@
+from django.db import migrations
+from reviews.db import run_for_vendor
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE reviews_title ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX reviews_title_search_idx ON reviews_title '
+    'USING gin (search_vector)',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS reviews_title_search_idx',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61'
+    )
+    """,
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+    """
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({
+                'postgresql': POSTGRES_FORWARD,
+                'sqlite': SQLITE_FORWARD,
+            }),
+            run_for_vendor({
+                'postgresql': POSTGRES_BACKWARD,
+                'sqlite': SQLITE_BACKWARD,
+            }),
+        ),
+    ]
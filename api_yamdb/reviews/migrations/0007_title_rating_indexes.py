@@ -0,0 +1,44 @@
+from django.db import migrations
+from reviews.db import run_for_vendor
+
+# Произведения без оценок (rating IS NULL) считаются худшими: NULL идёт
+# первым по возрастанию и последним по убыванию. В SQLite это порядок
+# по умолчанию, в PostgreSQL его нужно указать в индексе явно.
+POSTGRES_FORWARD = [
+    'CREATE INDEX title_rating_id_idx ON reviews_title '
+    '(rating ASC NULLS FIRST, id)',
+    'CREATE INDEX title_category_rating_idx ON reviews_title '
+    '(category_id, rating ASC NULLS FIRST, id)',
+    'CREATE INDEX title_year_id_idx ON reviews_title (year, id)',
+]
+SQLITE_FORWARD = [
+    'CREATE INDEX title_rating_id_idx ON reviews_title (rating, id)',
+    'CREATE INDEX title_category_rating_idx ON reviews_title '
+    '(category_id, rating, id)',
+    'CREATE INDEX title_year_id_idx ON reviews_title (year, id)',
+]
+BACKWARD = [
+    'DROP INDEX IF EXISTS title_rating_id_idx',
+    'DROP INDEX IF EXISTS title_category_rating_idx',
+    'DROP INDEX IF EXISTS title_year_id_idx',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({
+                'postgresql': POSTGRES_FORWARD,
+                'sqlite': SQLITE_FORWARD,
+            }),
+            run_for_vendor({
+                'postgresql': BACKWARD,
+                'sqlite': BACKWARD,
+            }),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_rating_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Взвешенная оценка')),
+                ('rating', models.FloatField(verbose_name='Рейтинг')),
+                ('rating_count', models.PositiveIntegerField(verbose_name='Количество оценок')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Строка рейтинга',
+                'verbose_name_plural': 'Рейтинги',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['category', '-score', 'title'], name='leaderboard_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['genre', '-score', 'title'], name='leaderboard_genre_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('title', 'category'), name='unique_leaderboard_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_leaderboard_genre'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('category__isnull', False), ('genre__isnull', True)), models.Q(('category__isnull', True), ('genre__isnull', False)), _connector='OR'), name='leaderboard_category_or_genre'),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.validators
+
+# Индексы произведений, которые заменяют составные индексы из 0007.
+TITLE_COLUMNS = ('category_id', 'year')
+
+
+def drop_title_indexes(apps, schema_editor):
+    """
+    Удаляет одностолбцовые индексы произведений, найдя их имена в базе.
+    AlterField в SQLite пересоздал бы таблицу произведений и потерял
+    индексы из 0007 и триггеры полнотекстового поиска из 0006.
+    """
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, 'reviews_title'
+        )
+    for name, constraint in constraints.items():
+        if (constraint['index'] and not constraint['unique']
+                and len(constraint['columns']) == 1
+                and constraint['columns'][0] in TITLE_COLUMNS
+                and not name.endswith('_like')):
+            schema_editor.execute(
+                f'DROP INDEX {schema_editor.quote_name(name)}'
+            )
+
+
+def create_title_indexes(apps, schema_editor):
+    for column in TITLE_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX reviews_title_{column}_idx '
+            f'ON reviews_title ({column})'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_leaderboard_entry'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='unique_review',
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.review'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    drop_title_indexes, create_title_indexes
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='title',
+                    name='category',
+                    field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='titles', to='reviews.category', verbose_name='Категория'),
+                ),
+                migrations.AlterField(
+                    model_name='title',
+                    name='year',
+                    field=models.PositiveSmallIntegerField(validators=[reviews.validators.year_validator], verbose_name='Год создания'),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='leaderboardentry',
+            name='category',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.category', verbose_name='Категория'),
+        ),
+        migrations.AlterField(
+            model_name='leaderboardentry',
+            name='genre',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.genre', verbose_name='Жанр'),
+        ),
+        migrations.AlterField(
+            model_name='leaderboardentry',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'id'], name='title_category_id_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('title', 'author'), name='unique_review'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:05
+
+from django.db import migrations, models
+
+
+def deleted_at_field():
+    field = models.DateTimeField(null=True, blank=True)
+    field.set_attributes_from_name('deleted_at')
+    return field
+
+
+def add_title_deleted_at(apps, schema_editor):
+    """
+    Добавляет столбец через ALTER TABLE: AddField в SQLite пересоздал бы
+    таблицу произведений и потерял индексы из 0007 и триггеры
+    полнотекстового поиска из 0006.
+    """
+    model = apps.get_model('reviews', 'Title')
+    definition, params = schema_editor.column_sql(model, deleted_at_field())
+    schema_editor.execute(
+        f'ALTER TABLE reviews_title ADD COLUMN deleted_at {definition}',
+        params
+    )
+
+
+def drop_title_deleted_at(apps, schema_editor):
+    schema_editor.execute('ALTER TABLE reviews_title DROP COLUMN deleted_at')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Удалён'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Удалён'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    add_title_deleted_at, drop_title_deleted_at
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='title',
+                    name='deleted_at',
+                    field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Удалён'),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='category_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='genre_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='title_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_moderation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Номер')),
+                ('resource', models.CharField(max_length=16, verbose_name='Ресурс')),
+                ('action', models.CharField(choices=[('upsert', 'Создан или изменён'), ('delete', 'Удалён или скрыт')], max_length=8, verbose_name='Действие')),
+                ('object_id', models.BigIntegerField(verbose_name='id объекта')),
+                ('slug', models.CharField(max_length=50, null=True, verbose_name='slug объекта')),
+                ('title_id', models.BigIntegerField(null=True, verbose_name='id произведения')),
+                ('review_id', models.BigIntegerField(null=True, verbose_name='id отзыва')),
+                ('changed_at', models.DateTimeField(verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('seq',),
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:52
+
+from django.db import migrations, models
+import django.db.models.expressions
+import reviews.db
+
+
+class Migration(migrations.Migration):
+    """
+    Индексы из 0007 уже есть в базе: миграция только вносит их в
+    состояние моделей, чтобы пересоздание таблицы в SQLite их сохраняло.
+    """
+
+    dependencies = [
+        ('reviews', '0012_change_log'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='title',
+                    index=reviews.db.NullsOrderIndex(django.db.models.expressions.OrderBy(django.db.models.expressions.F('rating'), nulls_first=True), django.db.models.expressions.F('id'), name='title_rating_id_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='title',
+                    index=reviews.db.NullsOrderIndex(django.db.models.expressions.F('category_id'), django.db.models.expressions.OrderBy(django.db.models.expressions.F('rating'), nulls_first=True), django.db.models.expressions.F('id'), name='title_category_rating_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='title',
+                    index=models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+                ),
+            ],
+        ),
+    ]
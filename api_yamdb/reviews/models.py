@@ -1,10 +1,25 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
+from django.utils import timezone
+from reviews.db import NullsOrderIndex
 from reviews.validators import year_validator
-from users.models import User
+from users.models import SoftDeleteModel, User, deleted_index
 
 
-class Category(models.Model):
+class AtomicSaveMixin:
+    """
+    Сохранение вместе с обработчиками post_save в одной транзакции:
+    рейтинг произведения и журнал изменений пишутся вместе с объектом.
+    """
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class Category(AtomicSaveMixin, SoftDeleteModel):
     """Модель категории"""
     name = models.CharField(max_length=256, verbose_name='Название категории')
     slug = models.SlugField(max_length=50,
@@ -15,12 +30,13 @@ class Category(models.Model):
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
         ordering = ('id',)
+        indexes = [deleted_index('category_deleted_idx')]
 
     def __str__(self) -> str:
         return self.name
 
 
-class Genre(models.Model):
+class Genre(AtomicSaveMixin, SoftDeleteModel):
     """Модель жанра"""
     name = models.CharField(max_length=256, verbose_name='Название жанра')
     slug = models.SlugField(max_length=50,
@@ -31,20 +47,23 @@ class Genre(models.Model):
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
         ordering = ('id',)
+        indexes = [deleted_index('genre_deleted_idx')]
 
     def __str__(self) -> str:
         return self.name
 
 
-class Title(models.Model):
+class Title(AtomicSaveMixin, SoftDeleteModel):
     """Модель произведения"""
+    # Отдельный индекс не нужен: category_id — первый столбец
+    # title_category_id_idx и title_category_rating_idx.
     category = models.ForeignKey(
         Category,
         null=True,
         on_delete=models.SET_NULL,
         verbose_name='Категория',
         related_name='titles',
-        db_index=True
+        db_index=False
     )
     genre = models.ManyToManyField(
         Genre,
@@ -58,32 +77,83 @@ class Title(models.Model):
         db_index=True
     )
     description = models.TextField('Описание')
+    # Выборки по году обслуживает title_year_id_idx.
     year = models.PositiveSmallIntegerField(
         'Год создания',
-        db_index=True,
+        db_index=False,
         validators=[year_validator]
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('id',)
+        # Произведения без оценок (rating IS NULL) считаются худшими: NULL
+        # идёт первым по возрастанию и последним по убыванию.
+        indexes = [
+            models.Index(
+                fields=['category', 'id'], name='title_category_id_idx'
+            ),
+            NullsOrderIndex(
+                F('rating').asc(nulls_first=True), F('id'),
+                name='title_rating_id_idx'
+            ),
+            NullsOrderIndex(
+                F('category_id'), F('rating').asc(nulls_first=True), F('id'),
+                name='title_category_rating_idx'
+            ),
+            models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+            deleted_index('title_deleted_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def change_rating(cls, title_id, score_delta, count_delta):
+        """Сдвигает сохранённые сумму и количество оценок одним UPDATE."""
+        new_sum = F('rating_sum') + score_delta
+        new_count = F('rating_count') + count_delta
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=(
+                Cast(new_sum, FloatField())
+                / NullIf(Cast(new_count, FloatField()), 0.0)
+            ),
+            updated_at=timezone.now(),
+        )
+
 
-class Review(models.Model):
+class Review(AtomicSaveMixin, models.Model):
     """Модель для Отзыва+рейтинг."""
 
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="reviews"
     )
+    # Выборки по произведению обслуживает review_title_id_idx.
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
         verbose_name="Произведение",
         related_name="reviews",
+        db_index=False,
     )
     text = models.TextField("Текст отзыва")
     score = models.PositiveSmallIntegerField(
@@ -95,14 +165,23 @@ class Review(models.Model):
         ],
     )
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+    # Скрытые модератором не видны в API; оценка скрытого отзыва не
+    # входит в рейтинг произведения.
+    is_hidden = models.BooleanField("Скрыт", default=False)
 
     class Meta:
         verbose_name = "Ревью"
         verbose_name_plural = "Ревью"
         ordering = ("id",)
+        indexes = [
+            models.Index(fields=["title", "id"], name="review_title_id_idx"),
+        ]
         constraints = [
+            # Произведение первым: проверка повторного отзыва и удаление
+            # отзывов произведения читают соседние строки индекса.
             models.UniqueConstraint(
-                name="unique_review", fields=["author", "title"]
+                name="unique_review", fields=["title", "author"]
             ),
         ]
 
@@ -110,22 +189,131 @@ class Review(models.Model):
         return self.text[:30]
 
 
-class Comment(models.Model):
+class Comment(AtomicSaveMixin, models.Model):
     """Модель для Комментария к Отзыву."""
 
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="comments"
     )
+    # Выборки по отзыву обслуживает comment_review_id_idx.
     review = models.ForeignKey(
-        Review, on_delete=models.CASCADE, related_name="comments"
+        Review, on_delete=models.CASCADE, related_name="comments",
+        db_index=False,
     )
     text = models.TextField("Текст комментария")
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+    # Скрытый модератором комментарий не виден в API и уходит из журнала
+    # изменений как удалённый; комментарии скрытого отзыва не видны
+    # вместе с ним.
+    is_hidden = models.BooleanField("Скрыт", default=False)
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ("id",)
+        indexes = [
+            models.Index(
+                fields=["review", "id"], name="comment_review_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.text[:30]
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Строка материализованного рейтинга: произведение в своей категории
+    или в одном из своих жанров со взвешенной оценкой.
+    """
+    # Внешние ключи — первые столбцы индексов и ограничений из Meta,
+    # отдельные индексы им не нужны.
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='Произведение',
+        related_name='leaderboard_entries',
+        db_index=False
+    )
+    category = models.ForeignKey(
+        Category,
+        null=True,
+        on_delete=models.CASCADE,
+        verbose_name='Категория',
+        related_name='leaderboard_entries',
+        db_index=False
+    )
+    genre = models.ForeignKey(
+        Genre,
+        null=True,
+        on_delete=models.CASCADE,
+        verbose_name='Жанр',
+        related_name='leaderboard_entries',
+        db_index=False
+    )
+    score = models.FloatField('Взвешенная оценка')
+    rating = models.FloatField('Рейтинг')
+    rating_count = models.PositiveIntegerField('Количество оценок')
+
+    class Meta:
+        verbose_name = 'Строка рейтинга'
+        verbose_name_plural = 'Рейтинги'
+        indexes = [
+            models.Index(
+                fields=['category', '-score', 'title'],
+                name='leaderboard_category_idx'
+            ),
+            models.Index(
+                fields=['genre', '-score', 'title'],
+                name='leaderboard_genre_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_leaderboard_category',
+                fields=['title', 'category']
+            ),
+            models.UniqueConstraint(
+                name='unique_leaderboard_genre', fields=['title', 'genre']
+            ),
+            models.CheckConstraint(
+                name='leaderboard_category_or_genre',
+                check=(
+                    models.Q(category__isnull=False, genre__isnull=True)
+                    | models.Q(category__isnull=True, genre__isnull=False)
+                )
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score:.2f}'
+
+
+class Change(models.Model):
+    """
+    Запись журнала изменений каталога и отзывов. Пишется в транзакции
+    изменения; потребители читают журнал по возрастанию seq и забирают
+    только изменившиеся объекты.
+    """
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+    ACTIONS = ((UPSERT, 'Создан или изменён'), (DELETE, 'Удалён или скрыт'))
+
+    seq = models.BigAutoField('Номер', primary_key=True)
+    resource = models.CharField('Ресурс', max_length=16)
+    action = models.CharField('Действие', max_length=8, choices=ACTIONS)
+    # Не внешние ключи: запись переживает удалённый объект.
+    object_id = models.BigIntegerField('id объекта')
+    slug = models.CharField('slug объекта', max_length=50, null=True)
+    title_id = models.BigIntegerField('id произведения', null=True)
+    review_id = models.BigIntegerField('id отзыва', null=True)
+    changed_at = models.DateTimeField('Время изменения')
+
+    class Meta:
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('seq',)
+
+    def __str__(self):
+        return f'{self.seq}: {self.resource} {self.object_id} {self.action}'
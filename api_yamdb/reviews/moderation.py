@@ -0,0 +1,96 @@
+from django.utils import timezone
+from reviews import changes
+from reviews.models import Comment, Review, Title
+from reviews.signals import bulk_changed, change_rating
+
+# Удаление здесь идёт через QuerySet._raw_delete: один DELETE без
+# сборщика каскада и без post_delete на каждую строку. Работа, которую
+# делали бы обработчики post_delete, выполняется пачкой в той же
+# транзакции:
+# - журнал изменений — record_queryset до удаления, вместо record_delete;
+# - рейтинг и рейтинги лучших — change_ratings по видимым отзывам, вместо
+#   update_rating_on_delete;
+# - кэш ответов API — сигнал bulk_changed, вместо post_delete для Review;
+# - комментарии удаляются до своих отзывов, как каскад.
+# tests/test_moderation.py сверяет результат с обычным .delete().
+
+
+def change_ratings(scores, sign):
+    """
+    Сдвигает рейтинги на оценки (title_id, score) со знаком sign: один
+    UPDATE на произведение вместо сигнала на каждый отзыв. Возвращает
+    число затронутых произведений.
+    """
+    deltas = {}
+    for title_id, score in scores:
+        total, count = deltas.get(title_id, (0, 0))
+        deltas[title_id] = (total + score, count + 1)
+    for title_id, (total, count) in deltas.items():
+        change_rating(title_id, sign * total, sign * count)
+    if deltas:
+        bulk_changed.send(sender=Title, resources=('titles',))
+    return len(deltas)
+
+
+def set_reviews_hidden(queryset, hidden):
+    """
+    Скрывает или показывает отзывы выборки одним UPDATE по id: оценки
+    уходят из рейтингов произведений или возвращаются в них. Вызывается
+    в транзакции. Возвращает (число отзывов, число произведений).
+    """
+    rows = list(queryset.filter(is_hidden=not hidden).select_for_update(
+        of=('self',)
+    ).values_list('pk', 'title_id', 'score'))
+    selected = Review.objects.filter(pk__in=[pk for pk, _, _ in rows])
+    changes.record_queryset(
+        selected, changes.DELETE if hidden else changes.UPSERT
+    )
+    selected.update(is_hidden=hidden, updated_at=timezone.now())
+    titles = change_ratings(
+        [(title_id, score) for _, title_id, score in rows],
+        -1 if hidden else 1,
+    )
+    return len(rows), titles
+
+
+def delete_reviews(queryset):
+    """
+    Удаляет отзывы выборки вместе с их комментариями без сборщика
+    каскада и post_delete на каждую строку; оценки видимых отзывов
+    вычитаются из рейтингов. Вызывается в транзакции. Возвращает
+    (число отзывов, число комментариев, число произведений).
+    """
+    rows = list(queryset.select_for_update(of=('self',)).values_list(
+        'pk', 'title_id', 'score', 'is_hidden'
+    ))
+    if not rows:
+        return 0, 0, 0
+    ids = [row[0] for row in rows]
+    comments = delete_comments(Comment.objects.filter(review_id__in=ids))
+    deleted = Review.objects.filter(pk__in=ids)
+    changes.record_queryset(deleted, changes.DELETE)
+    deleted._raw_delete(deleted.db)
+    titles = change_ratings(
+        [(title_id, score) for _, title_id, score, hidden in rows
+         if not hidden],
+        -1,
+    )
+    return len(rows), comments, titles
+
+
+def set_comments_hidden(queryset, hidden):
+    """Скрывает или показывает комментарии выборки одним UPDATE."""
+    selected = queryset.filter(is_hidden=not hidden)
+    changes.record_queryset(
+        selected, changes.DELETE if hidden else changes.UPSERT
+    )
+    return selected.update(is_hidden=hidden, updated_at=timezone.now())
+
+
+def delete_comments(queryset):
+    """
+    Удаляет комментарии выборки одним DELETE, без post_delete на каждую
+    строку: журнал изменений пишется одним INSERT ... SELECT.
+    """
+    changes.record_queryset(queryset, changes.DELETE)
+    return queryset._raw_delete(queryset.db)
@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.utils import timezone
+from reviews import changes, moderation
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title)
+from users.models import User
+
+TitleGenre = Title.genre.through
+
+
+def delete_batch(queryset, batch_size):
+    """
+    Удаляет до batch_size строк выборки одним DELETE по id, без сигналов
+    на каждую строку; удаления пишутся в журнал изменений.
+    """
+    ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+    if ids:
+        deleted = queryset.model._base_manager.filter(pk__in=ids)
+        changes.record_queryset(deleted, changes.DELETE)
+        deleted._raw_delete(deleted.db)
+    return len(ids)
+
+
+def delete_reviews(queryset, batch_size):
+    """Удаляет до batch_size отзывов выборки с их комментариями."""
+    deleted, _, _ = moderation.delete_reviews(queryset[:batch_size])
+    return deleted
+
+
+def detach_titles(category_id, batch_size):
+    """Снимает удалённую категорию с batch_size произведений."""
+    ids = list(Title.all_objects.filter(
+        category_id=category_id
+    ).values_list('pk', flat=True)[:batch_size])
+    detached = Title.all_objects.filter(pk__in=ids)
+    changes.record_queryset(detached, changes.UPSERT)
+    return detached.update(
+        category=None, updated_at=timezone.now()
+    )
+
+
+# Что удалять у помеченного объекта, по шагам: подпись для отчёта
+# и функция (pk, batch_size) -> число обработанных строк. Пользователи
+# первыми: их отзывы вычитаются из рейтингов живых произведений.
+PLAN = (
+    (User, (
+        ('комментарии', lambda pk, size: delete_batch(
+            Comment.objects.filter(author_id=pk), size)),
+        ('комментарии к отзывам', lambda pk, size: delete_batch(
+            Comment.objects.filter(review__author_id=pk), size)),
+        ('отзывы', lambda pk, size: delete_reviews(
+            Review.objects.filter(author_id=pk), size)),
+    )),
+    (Title, (
+        ('комментарии', lambda pk, size: delete_batch(
+            Comment.objects.filter(review__title_id=pk), size)),
+        ('отзывы', lambda pk, size: delete_reviews(
+            Review.objects.filter(title_id=pk), size)),
+        ('жанры', lambda pk, size: delete_batch(
+            TitleGenre.objects.filter(title_id=pk), size)),
+        ('строки рейтингов', lambda pk, size: delete_batch(
+            LeaderboardEntry.objects.filter(title_id=pk), size)),
+    )),
+    (Category, (
+        ('произведения', detach_titles),
+        ('строки рейтингов', lambda pk, size: delete_batch(
+            LeaderboardEntry.objects.filter(category_id=pk), size)),
+    )),
+    (Genre, (
+        ('произведения', lambda pk, size: delete_batch(
+            TitleGenre.objects.filter(genre_id=pk), size)),
+        ('строки рейтингов', lambda pk, size: delete_batch(
+            LeaderboardEntry.objects.filter(genre_id=pk), size)),
+    )),
+)
+
+
+def pending_counts():
+    """Сколько объектов каждой модели ждёт очистки."""
+    return {
+        model._meta.verbose_name_plural: model.all_objects.filter(
+            deleted_at__isnull=False
+        ).count()
+        for model, _ in PLAN
+    }
+
+
+def purge_step(batch_size):
+    """
+    Один ограниченный шаг очистки в своей транзакции: до batch_size
+    зависимых строк самого давно помеченного объекта или сам объект,
+    когда зависимых не осталось. Возвращает (объект, подпись шага,
+    число строк); подпись None — объект удалён. None — очищать нечего.
+    """
+    for model, steps in PLAN:
+        instance = model.all_objects.filter(
+            deleted_at__isnull=False
+        ).order_by('deleted_at', 'pk').first()
+        if instance is None:
+            continue
+        for label, step in steps:
+            with transaction.atomic():
+                processed = step(instance.pk, batch_size)
+            if processed:
+                return instance, label, processed
+        with transaction.atomic():
+            model.all_objects.filter(pk=instance.pk).delete()
+        return instance, None, 1
+    return None
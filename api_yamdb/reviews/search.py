@@ -0,0 +1,62 @@
+import re
+
+from django.db import connection
+
+TERM = re.compile(r'(\w+)(\*?)')
+
+# Вес названия выше веса описания при ранжировании.
+POSTGRES_RANK = (
+    "ts_rank(reviews_title.search_vector, to_tsquery('russian', %s))"
+)
+POSTGRES_MATCH = (
+    "reviews_title.search_vector @@ to_tsquery('russian', %s)"
+)
+SQLITE_RANK = '-bm25(reviews_title_fts, 10.0, 1.0)'
+SQLITE_MATCH = 'reviews_title_fts MATCH %s'
+
+
+def parse_terms(query):
+    """Слова запроса; слово со звёздочкой на конце ищется как префикс."""
+    return [
+        (word.lower(), bool(star)) for word, star in TERM.findall(query)
+    ]
+
+
+def _postgres_query(terms):
+    return ' & '.join(
+        f'{word}:*' if prefix else word for word, prefix in terms
+    )
+
+
+def _sqlite_query(terms):
+    return ' AND '.join(
+        f'"{word}"*' if prefix else f'"{word}"' for word, prefix in terms
+    )
+
+
+def search_titles(queryset, query):
+    """
+    Полнотекстовый поиск по названию и описанию произведения,
+    упорядоченный по релевантности. Использует tsvector с GIN-индексом
+    на PostgreSQL и теневую таблицу FTS5 на SQLite.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.none()
+    if connection.vendor == 'postgresql':
+        match = _postgres_query(terms)
+        queryset = queryset.extra(
+            select={'search_rank': POSTGRES_RANK},
+            select_params=(match,),
+            where=[POSTGRES_MATCH],
+            params=(match,),
+        )
+    else:
+        queryset = queryset.extra(
+            select={'search_rank': SQLITE_RANK},
+            tables=['reviews_title_fts'],
+            where=['reviews_title_fts.rowid = reviews_title.id',
+                   SQLITE_MATCH],
+            params=(_sqlite_query(terms),),
+        )
+    return queryset.order_by('-search_rank', 'id')
@@ -0,0 +1,155 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import Signal, receiver
+from reviews import changes, leaderboards
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title)
+from users.models import User
+
+# Массовые изменения, которые обходят сигналы моделей: resources — имена
+# изменившихся ресурсов журнала изменений ('titles', 'genres', ...).
+bulk_changed = Signal()
+
+
+def change_rating(title_id, score_delta, count_delta):
+    """Сдвигает рейтинг произведения и переносит его в рейтинги."""
+    Title.change_rating(title_id, score_delta, count_delta)
+    leaderboards.update_title(title_id, count_delta)
+    # Удалённое произведение уже в журнале как DELETE: очистка его
+    # отзывов не должна возвращать его потребителям.
+    changes.record_queryset(
+        Title.objects.filter(pk=title_id), changes.UPSERT
+    )
+
+
+def contribution(title_id, score, is_hidden):
+    """Вклад отзыва в рейтинг: (произведение, оценка) или None."""
+    if is_hidden:
+        return None
+    return title_id, score
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_score(sender, instance, **kwargs):
+    """Запоминает вклад ревью в рейтинг до изменения."""
+    instance._previous = None
+    if instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).values_list(
+            'title_id', 'score', 'is_hidden'
+        ).first()
+        if previous is not None:
+            instance._previous = contribution(*previous)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитывает новую, изменённую или скрытую оценку в рейтинге."""
+    previous = None if created else getattr(instance, '_previous', None)
+    current = contribution(
+        instance.title_id, instance.score, instance.is_hidden
+    )
+    if previous == current:
+        return
+    if previous and current and previous[0] == current[0]:
+        change_rating(current[0], current[1] - previous[1], 0)
+        return
+    if previous:
+        change_rating(previous[0], -previous[1], -1)
+    if current:
+        change_rating(current[0], current[1], 1)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Убирает оценку удалённого ревью, в том числе при каскаде."""
+    if not instance.is_hidden:
+        change_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_save, sender=Title)
+def refresh_leaderboards_on_title_save(sender, instance, created, **kwargs):
+    """Категория произведения могла измениться."""
+    if not created:
+        leaderboards.refresh_titles([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_leaderboards_on_genres(sender, instance, action, reverse,
+                                   pk_set, **kwargs):
+    """Переносит изменения жанров произведения в рейтинги жанров."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        leaderboards.refresh_titles([instance.pk])
+    elif action == 'post_clear':
+        LeaderboardEntry.objects.filter(genre=instance).delete()
+    else:
+        leaderboards.refresh_titles(pk_set)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def record_save(sender, instance, **kwargs):
+    """Пишет в журнал изменений сохранённый объект."""
+    removed = (
+        getattr(instance, 'deleted_at', None) is not None
+        or getattr(instance, 'is_hidden', False)
+    )
+    changes.record([instance], changes.DELETE if removed else changes.UPSERT)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def record_delete(sender, instance, **kwargs):
+    """Пишет в журнал изменений удалённый объект."""
+    changes.record([instance], changes.DELETE)
+
+
+def soft_deleted(instance, update_fields):
+    """Сохранение, которое пометило объект удалённым."""
+    return (
+        instance.deleted_at is not None
+        and update_fields is not None and 'deleted_at' in update_fields
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def record_catalog_titles(sender, instance, update_fields, **kwargs):
+    """Удалённая категория или жанр пропадает из своих произведений."""
+    if soft_deleted(instance, update_fields):
+        lookup = 'category' if sender is Category else 'genre'
+        changes.record_queryset(
+            Title.objects.filter(**{lookup: instance}), changes.UPSERT
+        )
+
+
+@receiver(post_save, sender=User)
+def record_user_content(sender, instance, update_fields, **kwargs):
+    """Отзывы и комментарии удалённого пользователя скрываются."""
+    if soft_deleted(instance, update_fields):
+        for model in (Review, Comment):
+            changes.record_queryset(
+                model.objects.filter(author=instance), changes.DELETE
+            )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def record_genre_links(sender, instance, action, reverse, pk_set,
+                       **kwargs):
+    """Смена жанров меняет представление произведений."""
+    if not reverse:
+        if action.startswith('post_'):
+            changes.record([instance], changes.UPSERT)
+    elif action == 'pre_clear':
+        changes.record_queryset(instance.titles.all(), changes.UPSERT)
+    elif action in ('post_add', 'post_remove'):
+        changes.record_queryset(
+            Title.all_objects.filter(pk__in=pk_set), changes.UPSERT
+        )
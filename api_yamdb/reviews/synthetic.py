@@ -0,0 +1,321 @@
+import multiprocessing
+import random
+import time
+from array import array
+from itertools import accumulate
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from reviews import changes
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import bulk_changed
+from users.models import User
+
+WORDS = (
+    'ветер', 'город', 'море', 'ночь', 'звезда', 'дорога', 'тайна', 'огонь',
+    'лес', 'зима', 'солнце', 'река', 'небо', 'тень', 'мост', 'сад', 'остров',
+    'песня', 'сон', 'свет', 'камень', 'птица', 'время', 'дом', 'берег',
+)
+CATEGORIES = ('Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра')
+GENRES = (
+    'Драма', 'Комедия', 'Фантастика', 'Детектив', 'Триллер', 'Мелодрама',
+    'Приключения', 'Документальный', 'Ужасы', 'Фэнтези',
+)
+# Сколько жанров бывает у произведения и как часто.
+GENRE_FANOUT = {1: 50, 2: 30, 3: 15, 4: 5}
+# Сколько пачек bulk_create входит в одну часть работы: часть вставляется
+# одной транзакцией и целиком достаётся одному процессу.
+BATCHES_PER_PART = 10
+PROGRESS_EVERY = 5
+
+# Генератор, с которым работают процессы пула. Они получают его при fork
+# вместе со списками id, а не через pickle в каждой задаче.
+_active = None
+
+
+def last_id(model):
+    return model.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def new_ids(model, since):
+    """id строк, вставленных после since, в компактном массиве."""
+    return array('q', model.objects.filter(id__gt=since).order_by('id')
+                 .values_list('id', flat=True).iterator(chunk_size=10000))
+
+
+def words(rng, count):
+    return ' '.join(rng.choices(WORDS, k=count))
+
+
+def catalog_name(names, number):
+    name = names[number % len(names)]
+    return name if number < len(names) else f'{name} {number}'
+
+
+def zipf_counts(total, size, exponent, cap=None):
+    """
+    Делит total между size местами по закону Ципфа: месту с рангом k
+    достаётся доля, пропорциональная 1 / k ** exponent, при exponent=0 —
+    поровну. Месту не даётся больше cap, недоданное переходит к следующим.
+    """
+    norm = sum(rank ** -exponent for rank in range(1, size + 1))
+    ideal = 0.0
+    given = 0
+    for rank in range(1, size + 1):
+        ideal += total * rank ** -exponent / norm
+        count = round(ideal) - given
+        if cap is not None:
+            count = min(count, cap)
+        given += count
+        yield count
+
+
+def spans(size, step):
+    """Отрезки [start, stop) по step мест."""
+    step = max(1, step)
+    return [(start, min(start + step, size))
+            for start in range(0, size, step)]
+
+
+def weighted_spans(counts, rows):
+    """Отрезки [start, stop), на каждый из которых приходится около rows
+    строк: места с большими counts попадают в короткие отрезки."""
+    result = []
+    start = filled = 0
+    for index, count in enumerate(counts):
+        filled += count
+        if filled >= rows:
+            result.append((start, index + 1))
+            start, filled = index + 1, 0
+    if start < len(counts):
+        result.append((start, len(counts)))
+    return result
+
+
+def _insert_part(task):
+    try:
+        return _active.insert_part(*task)
+    finally:
+        connections.close_all()
+
+
+class Generator:
+    """
+    Заполняет базу синтетическими данными заданного размера. Число
+    отзывов на произведение и комментариев на отзыв распределено по
+    Ципфу с показателями review_skew и comment_skew (0 — поровну),
+    у одного автора не больше одного отзыва на произведение.
+
+    Строки вставляются частями через bulk_create; при workers > 1 части
+    раздаются пулу процессов. Каждая часть строится своим генератором
+    случайных чисел, поэтому при одном seed и workers=1 данные
+    одинаковы. Рейтинги и таблица лидеров пересчитываются в конце.
+    С log_changes=False строки не пишутся в журнал изменений: миллионы
+    синтетических записей не достаются потребителям журнала.
+    """
+    phases = {
+        'users': User,
+        'titles': Title,
+        'genre_links': Title.genre.through,
+        'reviews': Review,
+        'comments': Comment,
+    }
+
+    def __init__(self, seed=0, batch_size=5000, prefix='synthetic',
+                 stdout=None, review_skew=0.0, comment_skew=0.0,
+                 workers=1, log_changes=True):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.part_rows = batch_size * BATCHES_PER_PART
+        self.prefix = f'{prefix}{seed}'
+        self.stdout = stdout
+        self.review_skew = review_skew
+        self.comment_skew = comment_skew
+        self.log_changes = log_changes
+        # SQLite пишет в базу одним процессом: пул только ждал бы
+        # блокировок.
+        self.workers = 1 if connection.vendor == 'sqlite' else workers
+
+    def generate(self, users, titles, reviews, comments,
+                 categories=len(CATEGORIES), genres=len(GENRES)):
+        self.category_ids = self.catalog(Category, CATEGORIES, categories)
+        self.genre_ids = self.catalog(Genre, GENRES, genres)
+        # Первые жанры популярнее следующих.
+        self.genre_weights = list(accumulate(
+            1 / rank for rank in range(1, len(self.genre_ids) + 1)
+        ))
+        self.user_ids = self.insert_new(
+            'users', spans(users, self.part_rows)
+        )
+        self.title_ids = self.insert_new(
+            'titles', spans(titles, self.part_rows)
+        )
+        self.insert('genre_links', spans(
+            len(self.title_ids), self.part_rows // max(GENRE_FANOUT)
+        ))
+        # Ранги популярности достаются произведениям в случайном порядке.
+        self.title_order = array('q', self.title_ids)
+        self.rng.shuffle(self.title_order)
+        self.review_counts = array('q', zipf_counts(
+            reviews, len(self.title_order), self.review_skew,
+            cap=len(self.user_ids),
+        ))
+        self.review_order = self.insert_new(
+            'reviews', weighted_spans(self.review_counts, self.part_rows)
+        )
+        self.rng.shuffle(self.review_order)
+        self.comment_counts = array('q', zipf_counts(
+            comments if self.user_ids else 0, len(self.review_order),
+            self.comment_skew,
+        ))
+        self.insert(
+            'comments', weighted_spans(self.comment_counts, self.part_rows)
+        )
+        call_command('recalculate_ratings', verbosity=0, stdout=self.stdout)
+        call_command('rebuild_leaderboards', stdout=self.stdout)
+        bulk_changed.send(sender=Generator, resources=[
+            resource for resource, *_ in changes.TRACKED.values()
+        ])
+        return {
+            'users': len(self.user_ids),
+            'titles': len(self.title_ids),
+            'reviews': len(self.review_order),
+            'comments': sum(self.comment_counts),
+        }
+
+    def catalog(self, model, names, count):
+        since = last_id(model)
+        kind = model.__name__.lower()
+        self.bulk_create(model, [
+            model(name=catalog_name(names, number),
+                  slug=f'{self.prefix}-{kind}-{number}')
+            for number in range(count)
+        ])
+        return list(new_ids(model, since))
+
+    def insert_new(self, phase, parts):
+        """Вставляет строки и возвращает их id."""
+        since = last_id(self.phases[phase])
+        self.insert(phase, parts)
+        return new_ids(self.phases[phase], since)
+
+    def insert(self, phase, parts):
+        """Вставляет строки по частям. Возвращает их число."""
+        started = reported = time.monotonic()
+        inserted = 0
+        for count in self.run(phase, parts):
+            inserted += count
+            if time.monotonic() - reported >= PROGRESS_EVERY:
+                reported = time.monotonic()
+                self.report(phase, inserted, reported - started)
+        self.report(phase, inserted, time.monotonic() - started)
+        return inserted
+
+    def run(self, phase, parts):
+        global _active
+        tasks = [(phase, start, stop) for start, stop in parts]
+        # Процессы пула не увидели бы строк из незавершённой транзакции.
+        if (self.workers < 2 or len(tasks) < 2
+                or connection.in_atomic_block):
+            for task in tasks:
+                yield self.insert_part(*task)
+            return
+        # Соединение нельзя делить между процессами: каждый откроет своё.
+        connections.close_all()
+        _active = self
+        try:
+            with multiprocessing.get_context('fork').Pool(
+                self.workers
+            ) as pool:
+                yield from pool.imap_unordered(_insert_part, tasks)
+                pool.close()
+                pool.join()
+        finally:
+            _active = None
+
+    def insert_part(self, phase, start, stop):
+        rng = random.Random(f'{self.seed}:{phase}:{start}')
+        objects = list(getattr(self, phase)(rng, start, stop))
+        with transaction.atomic():
+            self.bulk_create(
+                self.phases[phase], objects, batch_size=self.batch_size
+            )
+        return len(objects)
+
+    def bulk_create(self, model, objects, **kwargs):
+        if self.log_changes:
+            changes.bulk_create(model, objects, **kwargs)
+        else:
+            model.objects.bulk_create(objects, **kwargs)
+
+    def report(self, phase, total, elapsed):
+        if self.stdout is None:
+            return
+        rate = total / elapsed if elapsed else total
+        self.stdout.write(
+            f'{phase}: {total} строк за {elapsed:.1f} с ({rate:.0f}/с)'
+        )
+
+    def users(self, rng, start, stop):
+        for number in range(start, stop):
+            yield User(
+                username=f'{self.prefix}_{number}',
+                email=f'{self.prefix}_{number}@yamdb.fake',
+                password=UNUSABLE_PASSWORD_PREFIX,
+            )
+
+    def titles(self, rng, start, stop):
+        for number in range(start, stop):
+            yield Title(
+                name=f'{words(rng, 2).capitalize()} {number}',
+                year=rng.randint(1950, 2022),
+                description=words(rng, 12),
+                category_id=(
+                    rng.choice(self.category_ids)
+                    if self.category_ids else None
+                ),
+            )
+
+    def genre_links(self, rng, start, stop):
+        if not self.genre_ids:
+            return
+        fanout = list(GENRE_FANOUT)
+        for title_id in self.title_ids[start:stop]:
+            amount = min(
+                rng.choices(fanout, GENRE_FANOUT.values())[0],
+                len(self.genre_ids),
+            )
+            chosen = set()
+            while len(chosen) < amount:
+                chosen.update(rng.choices(
+                    self.genre_ids, cum_weights=self.genre_weights
+                ))
+            for genre_id in sorted(chosen):
+                yield Title.genre.through(title_id=title_id, genre_id=genre_id)
+
+    def reviews(self, rng, start, stop):
+        authors = range(len(self.user_ids))
+        for title_id, count in zip(self.title_order[start:stop],
+                                   self.review_counts[start:stop]):
+            for index in rng.sample(authors, count):
+                yield Review(
+                    title_id=title_id,
+                    author_id=self.user_ids[index],
+                    text=words(rng, 20),
+                    score=rng.randint(1, 10),
+                )
+
+    def comments(self, rng, start, stop):
+        for review_id, count in zip(self.review_order[start:stop],
+                                    self.comment_counts[start:stop]):
+            for _ in range(count):
+                yield Comment(
+                    review_id=review_id,
+                    author_id=self.user_ids[rng.randrange(
+                        len(self.user_ids)
+                    )],
+                    text=words(rng, 10),
+                )
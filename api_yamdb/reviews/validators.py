@@ -1,5 +1,5 @@
+from django.core.exceptions import ValidationError
 from django.utils import timezone
-from rest_framework.validators import ValidationError
 
 
 def year_validator(value):
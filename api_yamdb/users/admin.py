@@ -1,9 +1,19 @@
 from django.contrib import admin
-from users.models import User
+from users.models import OutboxEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
     list_display = ("pk", "email", "bio", "confirmation_code", "role")
+    # Поиск нужен подсказкам автора в отзывах и комментариях.
+    search_fields = ("username", "email")
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk", "to", "subject", "status", "attempts", "next_attempt_at"
+    )
+    list_filter = ("status",)
 
 
 admin.site.register(User, UserAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -0,0 +1,22 @@
+import copy
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from users.cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, которая берёт пользователя из user_cache."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        user = user_cache.get(user_id, jti)
+        if user is None:
+            generation = user_cache.generation(user_id)
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, jti, user, generation)
+        # Копия, чтобы изменения в запросе не попадали в кэш процесса.
+        return copy.copy(user)
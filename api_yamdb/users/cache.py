@@ -0,0 +1,107 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class UserCache:
+    """
+    Двухуровневый кэш пользователей для аутентификации: короткоживущий
+    словарь в памяти процесса по (user_id, jti) и общий кэш Django
+    по user_id. Сбрасывается при сохранении или удалении пользователя.
+
+    Запись общего кэша помечена поколением пользователя, прочитанным до
+    выборки из базы; сброс увеличивает поколение. Строка, прочитанная
+    до сброса и записанная после него, поэтому не выдаётся.
+    """
+    max_local_entries = 10000
+
+    def __init__(self):
+        self.local = {}
+
+    @property
+    def shared(self):
+        return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+    @staticmethod
+    def shared_key(user_id):
+        return f'auth:user:{user_id}'
+
+    @staticmethod
+    def generation_key(user_id):
+        return f'auth:user:{user_id}:generation'
+
+    def generation(self, user_id):
+        """Текущее поколение пользователя; читается до выборки из базы."""
+        key = self.generation_key(user_id)
+        generation = self.shared.get(key)
+        if generation is not None:
+            return generation
+        # Поколение, вытесненное из кэша, не должно совпасть с прежним.
+        self.shared.add(key, time.time_ns(), timeout=None)
+        return self.shared.get(key)
+
+    def get(self, user_id, jti):
+        entry = self.local.get((user_id, jti))
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        key, generation_key = (
+            self.shared_key(user_id), self.generation_key(user_id)
+        )
+        values = self.shared.get_many([key, generation_key])
+        if key not in values or (
+            values[key][0] != values.get(generation_key)
+        ):
+            return None
+        user = values[key][1]
+        self._remember(user_id, jti, user)
+        return user
+
+    def set(self, user_id, jti, user, generation):
+        self.shared.set(
+            self.shared_key(user_id), (generation, user),
+            settings.AUTH_USER_CACHE_TIMEOUT,
+        )
+        self._remember(user_id, jti, user)
+
+    def invalidate(self, user_id):
+        key = self.generation_key(user_id)
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            self.shared.add(key, time.time_ns(), timeout=None)
+        self.shared.delete(self.shared_key(user_id))
+        for local_key in [
+            local_key for local_key in self.local if local_key[0] == user_id
+        ]:
+            self.local.pop(local_key, None)
+
+    def clear_local(self):
+        self.local.clear()
+
+    def _remember(self, user_id, jti, user):
+        if len(self.local) >= self.max_local_entries:
+            self.local.clear()
+        self.local[(user_id, jti)] = (
+            time.monotonic() + settings.AUTH_USER_LOCAL_TIMEOUT, user
+        )
+
+
+user_cache = UserCache()
+
+
+def invalidate_users(user_ids):
+    """
+    Сбрасывает кэш пользователей сразу и ещё раз после фиксации
+    транзакции: запрос, прочитавший старую строку до фиксации, не
+    оставит её в кэше.
+    """
+    user_ids = list(user_ids)
+
+    def invalidate():
+        for user_id in user_ids:
+            user_cache.invalidate(user_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,125 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from users.models import OutboxEmail
+
+
+def claim_batch(batch_size, now):
+    """
+    Забирает пачку писем, срок которых подошёл, и откладывает их на
+    EMAIL_OUTBOX_CLAIM_TIMEOUT секунд, чтобы их не взял другой
+    обработчик. Транзакция завершается до отправки: блокировки строк
+    не держатся на время работы с SMTP.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.due(now).select_for_update(
+                skip_locked=True
+            )[:batch_size]
+        )
+        OutboxEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+        ))
+    return emails
+
+
+def deliver_batch(batch_size):
+    """
+    Отправляет пачку писем через одно SMTP-соединение. Неудачные письма
+    откладываются с экспоненциальной задержкой, после
+    EMAIL_OUTBOX_MAX_ATTEMPTS попыток помечаются failed; если соединение
+    не открылось, так откладывается вся пачка. Возвращает число
+    обработанных писем.
+    """
+    now = timezone.now()
+    emails = claim_batch(batch_size, now)
+    if not emails:
+        return 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            _retry(email, error, now)
+    else:
+        try:
+            for email in emails:
+                _deliver(connection, email, now)
+        finally:
+            connection.close()
+    OutboxEmail.objects.bulk_update(
+        emails,
+        ('status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'),
+    )
+    return len(emails)
+
+
+def _retry(email, error, now):
+    email.attempts += 1
+    email.last_error = repr(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+        return
+    email.next_attempt_at = now + timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1)
+    )
+
+
+def _deliver(connection, email, now):
+    message = EmailMessage(
+        email.subject, email.body, email.from_email, [email.to],
+        connection=connection,
+    )
+    try:
+        message.send()
+    except Exception as error:
+        _retry(email, error, now)
+        return
+    email.attempts += 1
+    email.status = OutboxEmail.SENT
+    email.sent_at = now
+    email.last_error = ''
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками через одно соединение.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Сколько писем отправлять за один проход.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь один раз и завершиться.',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Показать число писем по статусам и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for status, count in OutboxEmail.objects.counts().items():
+                self.stdout.write(f'{status}: {count}')
+            return
+        while True:
+            processed = deliver_batch(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Обработано писем: {processed}')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
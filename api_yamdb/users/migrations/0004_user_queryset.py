@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-17 09:06
+
+from django.db import migrations
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.AliveUserManager()),
+                ('all_objects', users.models.AllUserManager()),
+            ],
+        ),
+    ]
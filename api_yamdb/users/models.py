@@ -1,5 +1,8 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models import Count
+from django.utils import timezone
+from users.cache import invalidate_users
 from users.validators import UsernameValidator
 
 USER = 'user'
@@ -7,7 +10,65 @@ MODERATOR = 'moderator'
 ADMIN = 'admin'
 
 
-class User(AbstractUser):
+class AliveManager(models.Manager):
+    """Менеджер по умолчанию: объекты, не помеченные удалёнными."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteModel(models.Model):
+    """
+    Объект, который удаляется в два шага: soft_delete() сразу помечает
+    его удалённым и скрывает из objects, а команда purge_deleted пачками
+    удаляет зависимые строки и затем сам объект. all_objects видит всё.
+    """
+    deleted_at = models.DateTimeField(
+        'Удалён', null=True, blank=True, editable=False
+    )
+
+    objects = AliveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def soft_delete(self):
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at'])
+
+
+def deleted_index(name):
+    """Частичный индекс помеченных удалёнными строк для purge_deleted."""
+    return models.Index(
+        fields=['deleted_at'], name=name,
+        condition=models.Q(deleted_at__isnull=False),
+    )
+
+
+class UserQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        """
+        UPDATE без post_save: кэш аутентификации изменённых пользователей
+        сбрасывается явно.
+        """
+        user_ids = list(self.values_list('pk', flat=True))
+        try:
+            return super().update(**kwargs)
+        finally:
+            invalidate_users(user_ids)
+
+
+class AllUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
+
+
+class AliveUserManager(AliveManager, AllUserManager):
+    pass
+
+
+class User(AbstractUser, SoftDeleteModel):
 
     roles = (
         (USER, USER),
@@ -54,12 +115,24 @@ class User(AbstractUser):
         default='XXX'
     )
 
+    objects = AliveUserManager()
+    all_objects = AllUserManager()
+
     REQUIRED_FIELDS = ['email']
     USERNAME_FIELDS = 'email'
 
+    class Meta(AbstractUser.Meta):
+        indexes = [deleted_index('user_deleted_idx')]
+
     def __str__(self):
         return str(self.username)
 
+    def soft_delete(self):
+        # Токены и вход перестают работать сразу, до очистки.
+        self.is_active = False
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['is_active', 'deleted_at'])
+
     @property
     def is_admin(self):
         return self.role == ADMIN or self.is_superuser
@@ -71,3 +144,62 @@ class User(AbstractUser):
     @property
     def is_user(self):
         return self.role == USER
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+
+    def due(self, now):
+        return self.filter(
+            status=OutboxEmail.PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id')
+
+    def counts(self):
+        """Количество писем в каждом статусе."""
+        counts = dict.fromkeys(OutboxEmail.STATUSES, 0)
+        counts.update(
+            self.order_by().values_list('status').annotate(Count('id'))
+        )
+        return counts
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку фоновым обработчиком."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (PENDING, SENT, FAILED)
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=254)
+    to = models.EmailField('Получатель', max_length=254)
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=[(status, status) for status in STATUSES],
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_next_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
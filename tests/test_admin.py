@@ -0,0 +1,130 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestAdmin:
+
+    @pytest.fixture
+    def superuser_client(self, client, django_user_model):
+        superuser = django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567'
+        )
+        client.force_login(superuser)
+        return client
+
+    @staticmethod
+    def add_reviews(title, count, start=0):
+        from reviews.models import Comment, Review
+        from users.models import User
+
+        for number in range(start, start + count):
+            author = User.objects.create_user(
+                username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='текст', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='ок')
+
+    def queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context)
+
+    @pytest.mark.parametrize('url', (
+        '/admin/reviews/review/', '/admin/reviews/comment/',
+        '/admin/reviews/title/',
+    ))
+    def test_changelist_queries(self, superuser_client, title, url):
+        self.add_reviews(title, 3)
+        few = self.queries(superuser_client, url)
+        self.add_reviews(title, 20, start=3)
+        assert self.queries(superuser_client, url) == few, (
+            'Проверьте, что связанные объекты списка загружаются JOIN'
+        )
+
+    def test_autocomplete(self, superuser_client, title):
+        from reviews.models import Review
+
+        self.add_reviews(title, 2)
+        review = Review.objects.first()
+        page = superuser_client.get(
+            f'/admin/reviews/review/{review.pk}/change/'
+        ).content.decode()
+        assert 'admin-autocomplete' in page
+        assert 'critic1</option>' not in page, (
+            'Проверьте, что автор выбирается подсказкой, а не списком'
+        )
+        response = superuser_client.get('/admin/autocomplete/', {
+            'app_label': 'reviews', 'model_name': 'comment',
+            'field_name': 'review', 'term': 'critic1',
+        })
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['results']] == [
+            str(Review.objects.get(author__username='critic1').pk)
+        ]
+
+    def test_paginator(self, title, settings):
+        from reviews.admin import EstimatedCountPaginator
+        from reviews.models import Review
+
+        self.add_reviews(title, 5)
+        settings.ADMIN_COUNT_LIMIT = 3
+        filtered = EstimatedCountPaginator(
+            Review.objects.filter(score=5), 2
+        )
+        assert filtered.count == 3, (
+            'Проверьте, что COUNT с фильтром ограничен ADMIN_COUNT_LIMIT'
+        )
+        everything = EstimatedCountPaginator(
+            Review.objects.all(), 2, filtered=False
+        )
+        assert everything.count == 5
+        if connection.vendor == 'postgresql':
+            settings.ADMIN_ESTIMATED_COUNT_FROM = 0
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE reviews_review')
+            estimated = EstimatedCountPaginator(
+                Review.objects.all(), 2, filtered=False
+            )
+            with CaptureQueriesContext(connection) as context:
+                assert estimated.count == 5
+            assert 'pg_class' in context[0]['sql']
+
+    def test_genre_inline_pages(self, superuser_client, genres):
+        from reviews.models import Title
+
+        genre = genres[0]
+        for number in range(25):
+            Title.objects.create(
+                name=f'Произведение {number:02}', year=2000
+            ).genre.add(genre)
+        url = f'/admin/reviews/genre/{genre.pk}/change/'
+        first = superuser_client.get(url).content.decode()
+        assert 'Произведение 19' in first
+        assert 'Произведение 20' not in first, (
+            'Проверьте, что встроенный список произведений жанра разбит '
+            'на страницы'
+        )
+        assert 'Страница 1 из 2' in first
+        next_page = re.search(r'href="(\?[\w-]+-page=2)"', first).group(1)
+        second = superuser_client.get(url + next_page).content.decode()
+        assert 'Произведение 24' in second
+        assert 'Произведение 00' not in second
+        management = dict(re.findall(
+            r'name="([\w-]+-(?:TOTAL|INITIAL|MIN_NUM|MAX_NUM)_FORMS)"'
+            r'[^>]*value="(\d*)"', first
+        ))
+        response = superuser_client.post(url, {
+            'name': 'Драма 2', 'slug': genre.slug, **management
+        })
+        assert response.status_code == 302, (
+            'Проверьте, что жанр сохраняется со встроенным списком'
+        )
+        genre.refresh_from_db()
+        assert genre.name == 'Драма 2' and genre.titles.count() == 25
@@ -0,0 +1,93 @@
+import copy
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+    url = '/api/v1/users/me/'
+
+    def user_queries(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "users_user"' in query['sql']
+        ]
+
+    def test_steady_state_without_user_query(
+        self, user_client, django_assert_max_num_queries
+    ):
+        assert user_client.get(self.url).status_code == 200
+        with django_assert_max_num_queries(0) as context:
+            response = user_client.get(self.url)
+        assert response.status_code == 200
+        assert not self.user_queries(context), (
+            'Проверьте, что пользователь берётся из кэша'
+        )
+
+    def test_shared_cache_after_local_expiry(
+        self, user_client, django_assert_num_queries
+    ):
+        from users.authentication import user_cache
+
+        user_client.get(self.url)
+        user_cache.clear_local()
+        with django_assert_num_queries(0):
+            assert user_client.get(self.url).status_code == 200
+
+    def test_role_change_invalidates(self, admin_client, user, user_client):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', {'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+
+    def test_deleted_user_rejected(self, user, user_client):
+        user_client.get(self.url)
+        user.delete()
+        assert user_client.get(self.url).status_code == 401
+
+    def test_request_changes_do_not_leak(self, user, user_client):
+        user_client.patch(self.url, {'bio': 'Новое'})
+        assert user_client.get(self.url).json()['bio'] == 'Новое'
+
+    def test_stale_set_after_invalidate(self, user):
+        from users.cache import user_cache
+
+        user_cache.clear_local()
+        generation = user_cache.generation(user.pk)
+        user_cache.invalidate(user.pk)
+        user_cache.set(user.pk, 'jti', user, generation)
+        user_cache.clear_local()
+        assert user_cache.get(user.pk, 'jti') is None, (
+            'Проверьте, что строка, прочитанная до сброса, не попадает '
+            'в кэш'
+        )
+
+    def test_invalidate_on_commit(self, user,
+                                  django_capture_on_commit_callbacks):
+        from users.cache import user_cache
+
+        stale = copy.copy(user)
+        with django_capture_on_commit_callbacks(execute=True):
+            user.role = 'admin'
+            user.save()
+            # Запрос в другом соединении ещё видит старую строку.
+            user_cache.set(
+                user.pk, 'jti', stale, user_cache.generation(user.pk)
+            )
+        user_cache.clear_local()
+        assert user_cache.get(user.pk, 'jti') is None, (
+            'Проверьте, что кэш пользователя сбрасывается после фиксации'
+        )
+
+    def test_queryset_update_invalidates(self, user, user_client):
+        from users.models import User
+
+        assert user_client.get('/api/v1/users/').status_code == 403
+        User.objects.filter(pk=user.pk).update(role='admin')
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что UPDATE пользователей сбрасывает их кэш'
+        )
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleBulkImport:
+    url = '/api/v1/titles/bulk/'
+
+    def items(self, count):
+        return [
+            {'name': f'Фильм {i}', 'year': 1990 + i % 30,
+             'genre': ['drama', 'comedy'], 'category': 'movie'}
+            for i in range(count)
+        ]
+
+    def test_only_admin(self, user_client, category, genres):
+        response = user_client.post(self.url, self.items(1), format='json')
+        assert response.status_code == 403
+
+    def test_json_array(self, admin_client, category, genres,
+                        django_assert_max_num_queries):
+        from reviews.models import Title
+
+        items = self.items(300)
+        items[5]['genre'] = ['drama', 'western']
+        items[7]['year'] = 3000
+        with django_assert_max_num_queries(400):
+            response = admin_client.post(self.url, items, format='json')
+        assert response.status_code == 201
+        data = response.json()
+        assert data['created'] == 298
+        assert [error['index'] for error in data['errors']] == [5, 7], (
+            'Проверьте, что ошибки возвращаются по каждому элементу'
+        )
+        assert 'western' in data['errors'][0]['errors']['genre'][0]
+        title = Title.objects.get(pk=data['ids'][0])
+        assert title.category == category
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }
+
+    def test_ndjson(self, admin_client, category, genres):
+        body = '\n'.join(
+            [json.dumps(item) for item in self.items(3)] + ['{broken']
+        )
+        response = admin_client.post(
+            self.url, body, content_type='application/x-ndjson'
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert data['created'] == 3
+        assert data['errors'][0]['index'] == 3
+
+    def test_invalidates_title_cache(self, client, admin_client, category,
+                                     genres):
+        client.get('/api/v1/titles/')
+        admin_client.post(self.url, self.items(2), format='json')
+        assert client.get('/api/v1/titles/').json()['count'] == 2
+
+    def test_empty_input(self, admin_client):
+        for body, content_type in (('[]', 'application/json'),
+                                   ('\n', 'application/x-ndjson')):
+            response = admin_client.post(
+                self.url, body, content_type=content_type
+            )
+            assert response.status_code == 400
+            assert 'Нет произведений' in response.json()[0], (
+                'Проверьте, что на пустой запрос приходит понятная ошибка'
+            )
+
+    def test_loads_referenced_slugs(self, category, genres,
+                                    django_assert_num_queries):
+        from api.bulk import load_slugs, referenced_slugs
+        from reviews.models import Genre
+
+        items = self.items(2) + ['broken', {'genre': 'drama'}]
+        assert referenced_slugs(items) == ({'drama', 'comedy'}, {'movie'})
+        known = {}
+        with django_assert_num_queries(1) as context:
+            load_slugs(known, Genre, {'drama', 'western'})
+        assert 'IN' in context.captured_queries[0]['sql'], (
+            'Проверьте, что загружаются только упомянутые slug'
+        )
+        assert set(known) == {'drama'}
+        with django_assert_num_queries(0):
+            load_slugs(known, Genre, {'drama'})
+
+    def test_database_error(self, monkeypatch, category, genres):
+        from api import bulk
+        from django.db import DatabaseError
+        from reviews.models import Title
+
+        insert = bulk._insert_titles
+        calls = []
+
+        def failing(titles, genre_ids, batch_size):
+            calls.append(len(titles))
+            if len(calls) == 2:
+                raise DatabaseError('нет места на диске')
+            insert(titles, genre_ids, batch_size)
+
+        monkeypatch.setattr(bulk, '_insert_titles', failing)
+        created, errors, failed = bulk.import_titles(
+            self.items(5), batch_size=2
+        )
+        assert len(created) == Title.objects.count() == 2
+        assert failed == {'from': 2, 'to': 3, 'error': 'нет места на диске'}, (
+            'Проверьте, что загрузка сообщает о пачке, которая не записалась'
+        )
+        assert calls == [2, 2], (
+            'Проверьте, что после ошибки базы загрузка останавливается'
+        )
@@ -0,0 +1,138 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+URL = '/api/v1/changes/'
+
+
+def feed(client, since=0, **params):
+    response = client.get(URL, {'since': since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def entries(client, since=0):
+    return [
+        (item['resource'], item['action'], item['id'])
+        for item in feed(client, since)['results']
+    ]
+
+
+@pytest.mark.django_db
+class TestChanges:
+
+    def test_permissions(self, user_client, admin_client):
+        assert user_client.get(URL).status_code == 403, (
+            'Проверьте, что журнал изменений доступен администраторам'
+        )
+        assert admin_client.get(URL).status_code == 200
+
+    def test_api_writes(self, admin_client, title):
+        since = feed(admin_client, limit=500)['last_seq']
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review = admin_client.post(url, {'text': 'Отзыв', 'score': 7}).json()
+        comment = admin_client.post(
+            f'{url}{review["id"]}/comments/', {'text': 'Комментарий'}
+        ).json()
+        admin_client.delete(f'{url}{review["id"]}/comments/{comment["id"]}/')
+        assert entries(admin_client, since) == [
+            ('titles', 'upsert', title.id),
+            ('reviews', 'upsert', review['id']),
+            ('comments', 'upsert', comment['id']),
+            ('comments', 'delete', comment['id']),
+        ], 'Проверьте, что каждая запись API попадает в журнал изменений'
+        item = feed(admin_client, since)['results'][2]
+        assert (item['title'], item['review']) == (title.id, review['id'])
+
+    def test_soft_delete(self, admin_client, title, category):
+        since = feed(admin_client)['last_seq']
+        admin_client.delete(f'/api/v1/categories/{category.slug}/')
+        assert entries(admin_client, since) == [
+            ('categories', 'delete', category.id),
+            ('titles', 'upsert', title.id),
+        ], 'Проверьте, что произведения удалённой категории в журнале'
+        assert feed(admin_client, since)['results'][0]['slug'] == 'movie'
+
+    def test_bulk_writes(self, admin_client, title, user):
+        from reviews.changes import bulk_create
+        from reviews.models import Comment, Review, Title
+
+        since = feed(admin_client)['last_seq']
+        bulk_create(Title, [
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(3)
+        ])
+        created = list(Title.objects.filter(year=2000).values_list(
+            'pk', flat=True
+        ))
+        bulk_create(Review, [
+            Review(title=title, author=user, text='Отзыв', score=5)
+        ])
+        review = Review.objects.get()
+        bulk_create(Comment, [
+            Comment(review=review, author=user, text='Комментарий')
+        ])
+        assert entries(admin_client, since) == [
+            *(('titles', 'upsert', pk) for pk in created),
+            ('reviews', 'upsert', review.pk),
+            ('comments', 'upsert', Comment.objects.get().pk),
+        ], 'Проверьте, что строки bulk_create попадают в журнал изменений'
+
+    def test_keyset_pages(self, admin_client, title):
+        from reviews.models import Change
+
+        for number in range(5):
+            title.name = f'Название {number}'
+            title.save()
+        seqs, since = [], 0
+        for _ in range(10):
+            page = feed(admin_client, since, limit=2)
+            if not page['results']:
+                break
+            assert len(page['results']) <= 2
+            seqs.extend(item['seq'] for item in page['results'])
+            since = page['last_seq']
+            assert f'since={since}' in page['next']
+        assert seqs == list(Change.objects.values_list('seq', flat=True)), (
+            'Проверьте, что страницы журнала идут по seq без пропусков'
+        )
+
+    def test_gap(self, admin_client, settings):
+        from django.utils import timezone
+        from reviews.models import Change
+
+        now = timezone.now()
+        for seq in (1, 2, 4):
+            Change.objects.create(
+                seq=seq, resource='titles', action='upsert', object_id=seq,
+                changed_at=now,
+            )
+        assert [
+            item['seq'] for item in feed(admin_client, 1)['results']
+        ] == [2], 'Проверьте, что выдача останавливается на свежем пропуске'
+        Change.objects.filter(seq=4).update(
+            changed_at=now - timedelta(
+                seconds=settings.CHANGES_SETTLE_SECONDS + 1
+            )
+        )
+        assert feed(admin_client, 1)['last_seq'] == 4
+
+    def test_long_poll(self, admin_client, settings, category):
+        settings.CHANGES_POLL_INTERVAL = 0.1
+        since = feed(admin_client)['last_seq']
+        started = time.monotonic()
+        page = feed(admin_client, since, wait=1)
+        assert page['results'] == [] and page['last_seq'] == since
+        assert time.monotonic() - started >= 1, (
+            'Проверьте, что wait ждёт новых записей'
+        )
+        category.name = 'Кино'
+        category.save()
+        started = time.monotonic()
+        assert len(feed(admin_client, since, wait=5)['results']) == 1
+        assert time.monotonic() - started < 1, (
+            'Проверьте, что при новых записях ответ приходит сразу'
+        )
+        response = admin_client.get(URL, {'wait': 'долго'})
+        assert response.status_code == 400
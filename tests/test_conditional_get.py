@@ -0,0 +1,76 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_title_detail(self, client, title, user,
+                          django_assert_num_queries):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{title.pk}/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified']
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что неизменённое произведение отдаётся как 304'
+        )
+        Review.objects.create(title=title, author=user, text='', score=9)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['rating'] == 9
+
+    def test_title_detail_depends_on_genres(self, client, title, genres):
+        url = f'/api/v1/titles/{title.pk}/'
+        etag = client.get(url)['ETag']
+        genres[0].name = 'Триллер'
+        genres[0].save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_title_list_without_queries(self, client, title,
+                                        django_assert_num_queries):
+        etag = client.get('/api/v1/titles/')['ETag']
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_review_list_and_detail(self, client, title, user):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=5
+        )
+        list_url = f'/api/v1/titles/{title.pk}/reviews/'
+        detail_url = f'{list_url}{review.pk}/'
+        list_etag = client.get(list_url)['ETag']
+        detail_etag = client.get(detail_url)['ETag']
+        assert client.get(
+            list_url, HTTP_IF_NONE_MATCH=list_etag
+        ).status_code == 304
+        assert client.get(
+            detail_url, HTTP_IF_NONE_MATCH=detail_etag
+        ).status_code == 304
+
+        review.text = 'Новый текст'
+        review.save()
+        assert client.get(
+            list_url, HTTP_IF_NONE_MATCH=list_etag
+        ).status_code == 200, (
+            'Проверьте, что правка отзыва меняет ETag списка'
+        )
+        assert client.get(
+            detail_url, HTTP_IF_NONE_MATCH=detail_etag
+        ).status_code == 200
+
+    def test_comment_list(self, client, title, user):
+        from reviews.models import Comment, Review
+
+        review = Review.objects.create(title=title, author=user, score=5)
+        comment = Comment.objects.create(review=review, author=user, text='')
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        comment.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,124 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+
+
+class FailingBackend(BaseEmailBackend):
+    opened = 0
+
+    def open(self):
+        FailingBackend.opened += 1
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class RefusingBackend(BaseEmailBackend):
+    due = None
+
+    def open(self):
+        from django.utils import timezone
+        from users.models import OutboxEmail
+
+        RefusingBackend.due = OutboxEmail.objects.due(timezone.now()).count()
+        raise ConnectionRefusedError('SMTP отклонил соединение')
+
+    def send_messages(self, messages):
+        raise AssertionError('Письма не отправляются без соединения')
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def signup(self, client, username):
+        return client.post('/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@yamdb.fake'
+        })
+
+    def test_signup_enqueues(self, client):
+        from users.models import OutboxEmail
+
+        response = self.signup(client, 'newbie')
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.to == 'newbie@yamdb.fake'
+        assert email.status == OutboxEmail.PENDING
+
+    def test_signup_atomic(self, client, monkeypatch):
+        from django.db import DatabaseError
+        from users.models import OutboxEmail, User
+
+        self.signup(client, 'newbie')
+        code = User.objects.get(username='newbie').confirmation_code
+
+        def failing(**kwargs):
+            raise DatabaseError('outbox недоступен')
+
+        monkeypatch.setattr(OutboxEmail.objects, 'create', failing)
+        with pytest.raises(DatabaseError):
+            self.signup(client, 'newbie')
+        assert User.objects.get(username='newbie').confirmation_code == code, (
+            'Проверьте, что код не меняется, если письмо не записалось'
+        )
+
+    def test_worker_delivers_batch(self, client):
+        from users.models import OutboxEmail, User
+
+        for name in ('first', 'second', 'third'):
+            self.signup(client, name)
+        call_command('send_emails', once=True, batch_size=2)
+        assert len(mail.outbox) == 3
+        assert mail.outbox[0].body == User.objects.get(
+            username='first'
+        ).confirmation_code
+        assert OutboxEmail.objects.counts() == {
+            'pending': 0, 'sent': 3, 'failed': 0
+        }
+
+    def test_retry_and_fail(self, client, settings):
+        from users.models import OutboxEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.FailingBackend'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 0
+        self.signup(client, 'first')
+        self.signup(client, 'second')
+        FailingBackend.opened = 0
+        call_command('send_emails', once=True)
+        email = OutboxEmail.objects.first()
+        assert email.status == OutboxEmail.FAILED, (
+            'Проверьте, что письмо помечается failed после всех попыток'
+        )
+        assert email.attempts == 2
+        assert 'SMTP' in email.last_error
+        assert FailingBackend.opened == 2, (
+            'Проверьте, что пачка отправляется через одно соединение'
+        )
+
+    def test_connection_refused(self, client, settings):
+        from django.utils import timezone
+        from users.models import OutboxEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.RefusingBackend'
+        self.signup(client, 'first')
+        self.signup(client, 'second')
+        call_command('send_emails', once=True)
+        assert RefusingBackend.due == 0, (
+            'Проверьте, что письма забираются до открытия соединения'
+        )
+        for email in OutboxEmail.objects.all():
+            assert email.status == OutboxEmail.PENDING
+            assert email.attempts == 1, (
+                'Проверьте, что ошибка соединения считается попыткой'
+            )
+            assert 'SMTP' in email.last_error
+            assert email.next_attempt_at > timezone.now()
+
+    def test_stats(self, client, capsys):
+        self.signup(client, 'first')
+        call_command('send_emails', stats=True)
+        assert 'pending: 1' in capsys.readouterr().out
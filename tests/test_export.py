@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    @pytest.fixture
+    def reviews(self, title, user, another_user):
+        from reviews.models import Comment, Review
+
+        first = Review.objects.create(
+            title=title, author=user, text='Первый, "с кавычками"', score=3
+        )
+        second = Review.objects.create(
+            title=title, author=another_user, text='Второй', score=8
+        )
+        Comment.objects.create(review=first, author=another_user, text='К')
+        return first, second
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_only_admin(self, user_client, reviews):
+        response = user_client.get('/api/v1/export/reviews.ndjson')
+        assert response.status_code == 403
+
+    def test_ndjson(self, admin_client, reviews):
+        response = admin_client.get('/api/v1/export/reviews.ndjson')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        assert [row['author'] for row in rows] == [
+            'TestUser', 'TestUserAnother'
+        ]
+        assert rows[0]['score'] == 3
+
+    def test_filters_and_resume(self, admin_client, reviews):
+        first, second = reviews
+        response = admin_client.get(
+            '/api/v1/export/reviews.ndjson',
+            {'author': 'TestUserAnother', 'since': '2000-01-01'}
+        )
+        rows = self.read(response).splitlines()
+        assert [json.loads(row)['id'] for row in rows] == [second.pk]
+        response = admin_client.get(
+            '/api/v1/export/reviews.ndjson', {'after_id': first.pk}
+        )
+        rows = self.read(response).splitlines()
+        assert [json.loads(row)['id'] for row in rows] == [second.pk], (
+            'Проверьте, что выгрузку можно продолжить с последнего id'
+        )
+        response = admin_client.get(
+            '/api/v1/export/reviews.ndjson', {'until': 'вчера'}
+        )
+        assert response.status_code == 400
+
+    def test_comments_csv(self, admin_client, reviews, title):
+        response = admin_client.get(
+            '/api/v1/export/comments.csv', {'title': title.pk}
+        )
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        assert rows[0] == [
+            'id', 'review', 'title', 'author', 'text', 'pub_date'
+        ]
+        assert rows[1][1:5] == [
+            str(reviews[0].pk), str(title.pk), 'TestUserAnother', 'К'
+        ]
+
+    def test_deleted_hidden(self, admin_client, reviews, title, user):
+        first, second = reviews
+        user.soft_delete()
+        response = admin_client.get('/api/v1/export/reviews.ndjson')
+        rows = self.read(response).splitlines()
+        assert [json.loads(row)['id'] for row in rows] == [second.pk], (
+            'Проверьте, что отзывы удалённых пользователей не выгружаются'
+        )
+        response = admin_client.get('/api/v1/export/comments.ndjson')
+        assert self.read(response) == '', (
+            'Проверьте, что комментарии к отзывам удалённых пользователей '
+            'не выгружаются'
+        )
+        title.soft_delete()
+        response = admin_client.get('/api/v1/export/reviews.ndjson')
+        assert self.read(response) == '', (
+            'Проверьте, что отзывы удалённых произведений не выгружаются'
+        )
+
+    def test_moderated_hidden(self, admin_client, reviews):
+        from reviews.models import Comment
+
+        first, second = reviews
+        second.is_hidden = True
+        second.save()
+        response = admin_client.get('/api/v1/export/reviews.ndjson')
+        rows = self.read(response).splitlines()
+        assert [json.loads(row)['id'] for row in rows] == [first.pk], (
+            'Проверьте, что скрытые модератором отзывы не выгружаются'
+        )
+        Comment.objects.create(review=second, author=first.author, text='Н')
+        response = admin_client.get('/api/v1/export/comments.ndjson')
+        assert len(self.read(response).splitlines()) == 1
+        Comment.objects.filter(review=first).update(is_hidden=True)
+        response = admin_client.get('/api/v1/export/comments.ndjson')
+        assert self.read(response) == '', (
+            'Проверьте, что скрытые комментарии и комментарии скрытых '
+            'отзывов не выгружаются'
+        )
@@ -0,0 +1,144 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestFastRead:
+
+    @pytest.fixture
+    def catalog(self, title, user, another_user):
+        from reviews.models import Comment, Review, Title
+
+        Title.objects.create(name='Без категории', year=2001)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=8
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Ещё', score=3
+        )
+        for number in range(3):
+            Comment.objects.create(
+                review=review, author=another_user, text=f'Текст {number}'
+            )
+        return title, review
+
+    def compare(self, client, settings, path, params=None):
+        from api.cache import bump_version
+
+        responses = []
+        for fast in (False, True):
+            settings.FAST_READ_SERIALIZERS = fast
+            bump_version('titles')
+            response = client.get(path, params)
+            assert response.status_code == 200
+            responses.append(response.json())
+        assert responses[0] == responses[1], (
+            'Проверьте, что быстрый режим не меняет форму ответа'
+        )
+        return responses[1]
+
+    def test_titles(self, client, settings, catalog):
+        data = self.compare(client, settings, '/api/v1/titles/')
+        assert data['count'] == 2
+        assert [len(item['genre']) for item in data['results']] == [2, 0]
+        assert data['results'][1]['category'] is None
+        self.compare(client, settings, '/api/v1/titles/',
+                     {'genre': 'drama'})
+
+    def test_reviews_and_comments(self, client, settings, catalog):
+        title, review = catalog
+        reviews = f'/api/v1/titles/{title.pk}/reviews/'
+        comments = f'{reviews}{review.pk}/comments/'
+        assert self.compare(client, settings, reviews)['count'] == 2
+        self.compare(client, settings, reviews, {'cursor': ''})
+        data = self.compare(client, settings, comments, {'cursor': ''})
+        assert [item['text'] for item in data['results']] == [
+            'Текст 0', 'Текст 1', 'Текст 2'
+        ]
+
+    def test_titles_queries(self, client, settings, catalog,
+                            django_assert_num_queries):
+        settings.FAST_READ_SERIALIZERS = True
+        # COUNT, страница произведений, жанры страницы.
+        with django_assert_num_queries(3):
+            client.get('/api/v1/titles/')
+
+    def test_renderers(self, client, settings, catalog):
+        from api.renderers import ORJSONRenderer
+
+        title, _ = catalog
+        list_url = f'/api/v1/titles/{title.pk}/reviews/'
+        assert type(client.get(list_url).accepted_renderer) is not (
+            ORJSONRenderer
+        ), 'Проверьте, что orjson не используется без быстрого режима'
+        settings.FAST_READ_SERIALIZERS = True
+        assert type(client.get(list_url).accepted_renderer) is (
+            ORJSONRenderer
+        ), 'Проверьте, что списки в быстром режиме рендерит orjson'
+        detail = client.get(f'/api/v1/titles/{title.pk}/')
+        assert type(detail.accepted_renderer) is not ORJSONRenderer
+
+    def test_etag(self, client, settings, catalog):
+        title, _ = catalog
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        settings.FAST_READ_SERIALIZERS = True
+        etag = client.get(url)['ETag']
+        settings.FAST_READ_SERIALIZERS = False
+        assert client.get(url)['ETag'] == etag
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+
+class TestORJSONRenderer:
+
+    def test_matches_json_renderer(self):
+        import json
+        from datetime import datetime, timezone
+        from decimal import Decimal
+
+        from api.renderers import ORJSONRenderer
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer
+
+        data = {
+            'detail': gettext_lazy('Not found.'),
+            'price': Decimal('1.50'),
+            'moment': datetime(2022, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'items': [1, 'два', None, 2.5],
+        }
+        rendered = ORJSONRenderer().render(data)
+        assert json.loads(rendered) == json.loads(
+            JSONRenderer().render(data)
+        )
+        assert ORJSONRenderer().render(None) == b''
+        indented = ORJSONRenderer().render(
+            data, 'application/json; indent=2'
+        )
+        assert b'\n  ' in indented
+
+    @pytest.mark.django_db
+    def test_error_responses(self, client):
+        response = client.get('/api/v1/titles/0/')
+        assert response.status_code == 404
+        assert response.json() == {'detail': 'Страница не найдена.'}
+
+
+@pytest.mark.django_db
+def test_benchmark_reads(catalog_for_benchmark):
+    from io import StringIO
+
+    out = StringIO()
+    call_command('benchmark_reads', requests=3, stdout=out)
+    output = out.getvalue()
+    assert output.count('ускорение') == 3
+    assert 'отличаются' not in output
+
+
+@pytest.fixture
+def catalog_for_benchmark(title, user, another_user):
+    from reviews.models import Comment, Review
+
+    review = Review.objects.create(
+        title=title, author=user, text='Отзыв', score=8
+    )
+    Comment.objects.create(review=review, author=another_user, text='Текст')
@@ -0,0 +1,128 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+
+
+def test_zipf_counts():
+    from reviews.synthetic import zipf_counts
+
+    counts = list(zipf_counts(1000, 50, 1.0))
+    assert sum(counts) == 1000
+    assert counts[0] > counts[1] > counts[10] > counts[-1], (
+        'Проверьте, что места с меньшим рангом получают больше'
+    )
+    assert counts[0] > 10 * counts[-1]
+    assert list(zipf_counts(30, 5, 0)) == [6] * 5
+    capped = list(zipf_counts(100, 10, 1.5, cap=15))
+    assert max(capped) == 15 and sum(capped) == 100, (
+        'Проверьте, что недоданное сверх cap переходит к следующим местам'
+    )
+
+
+def test_weighted_spans():
+    from reviews.synthetic import weighted_spans
+
+    assert weighted_spans([5, 1, 1, 1, 1, 1, 3], 3) == [
+        (0, 1), (1, 4), (4, 7)
+    ]
+    assert weighted_spans([], 3) == []
+
+
+def review_counts():
+    from reviews.models import Title
+
+    return list(
+        Title.objects.annotate(amount=Count('reviews'))
+        .order_by('-amount').values_list('amount', flat=True)
+    )
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def generate(self, **options):
+        output = StringIO()
+        call_command('generate_data', stdout=output, **{
+            'users': 30, 'titles': 40, 'reviews': 400, 'comments': 300,
+            'categories': 3, 'genres': 12, 'batch_size': 20, **options,
+        })
+        return output.getvalue()
+
+    def test_skewed(self):
+        from reviews.models import Comment, Genre, Review, Title
+
+        output = self.generate()
+        assert 'reviews: 400' in output
+        assert Genre.objects.count() == 12
+        assert Review.objects.count() == 400
+        assert Comment.objects.count() == 300
+        counts = review_counts()
+        assert counts[0] == 30, (
+            'Проверьте, что у произведения не больше отзывов, чем авторов'
+        )
+        assert counts[-1] < 5
+        fanout = Title.objects.annotate(
+            amount=Count('genre')
+        ).values_list('amount', flat=True)
+        assert set(fanout) <= {1, 2, 3, 4} and 1 in set(fanout)
+        busiest = Comment.objects.values('review').annotate(
+            amount=Count('id')
+        ).order_by('-amount').first()
+        assert busiest['amount'] > 10
+        title = Title.objects.get(pk=Review.objects.first().title_id)
+        assert title.rating_count == title.reviews.count()
+
+    def test_uniform(self):
+        self.generate(review_skew=0, titles=10, reviews=100)
+        assert review_counts() == [10] * 10
+
+    def test_reproducible(self):
+        from reviews.models import Review
+
+        self.generate(prefix='first')
+        first = list(Review.objects.order_by('id').values_list(
+            'score', 'text', 'author__username'
+        ))
+        self.generate(prefix='second')
+        second = list(Review.objects.order_by('id').values_list(
+            'score', 'text', 'author__username'
+        ))[len(first):]
+        assert [row[:2] for row in first] == [row[:2] for row in second]
+        assert [row[2][len('first0'):] for row in first] == [
+            row[2][len('second0'):] for row in second
+        ]
+
+    def test_skip_change_log(self):
+        from api.cache import get_version
+        from reviews.models import Change
+
+        version = get_version('titles')
+        self.generate(log_changes=False)
+        assert not Change.objects.filter(
+            resource__in=('reviews', 'comments', 'genres')
+        ).exists(), (
+            'Проверьте, что --skip-change-log не пишет строки в журнал'
+        )
+        assert get_version('titles') != version, (
+            'Проверьте, что после генерации кэш ответов сбрасывается'
+        )
+        self.generate(prefix='logged')
+        assert Change.objects.filter(resource='reviews').count() == 400
+
+
+@pytest.mark.skipif(connection.vendor == 'sqlite',
+                    reason='SQLite пишет в базу одним процессом')
+@pytest.mark.django_db(transaction=True)
+def test_workers():
+    from reviews.models import Review, Title
+
+    call_command(
+        'generate_data', users=20, titles=30, reviews=300, comments=100,
+        batch_size=10, workers=3, stdout=StringIO(),
+    )
+    assert Title.objects.count() == 30
+    assert Review.objects.count() == 300
+    assert sum(Title.objects.values_list('rating_count', flat=True)) == 300
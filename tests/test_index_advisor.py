@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestIndexAdvisor:
+
+    def test_index_columns(self):
+        from api.advisor import index_columns, single_row
+        from reviews.models import Review, Title
+
+        cases = (
+            (Title.objects.filter(category__slug='film'),
+             ['category_id', 'id']),
+            (Title.objects.filter(rating__gte=8), ['rating', 'id']),
+            (Title.objects.filter(year=2000).order_by('name'),
+             ['year', 'name']),
+            (Review.objects.filter(title_id=1), ['title_id', 'id']),
+            (Title.objects.filter(pk__in=[1, 2]), []),
+        )
+        for queryset, expected in cases:
+            assert index_columns(queryset) == expected, str(queryset.query)
+        assert single_row(Review.objects.filter(title_id=1, pk=3))
+        assert not single_row(Review.objects.filter(title_id=1))
+
+    def test_no_redundant_indexes(self):
+        from api.advisor import app_tables, redundant_indexes
+
+        assert redundant_indexes(app_tables('reviews', 'users')) == [], (
+            'Проверьте, что у таблиц нет индексов, которые целиком '
+            'покрываются другими индексами'
+        )
+
+    def test_proposal(self):
+        from api.advisor import Case, advise, meta_indexes, proposed_indexes
+        from reviews.models import Review
+
+        slow = Case('reviews.by_author', Review.objects.filter(
+            author_id=1
+        ).order_by('-pub_date')[:5])
+        ready = Case('reviews.by_title', Review.objects.filter(
+            title_id=1
+        ).order_by('score')[:5])
+        advise(threshold=-1, cases=[slow, ready])
+        assert slow.problems, 'Проверьте, что сортировка попадает в отчёт'
+        assert slow.proposal == (Review, ['author_id', 'pub_date'])
+        assert ready.proposal == (Review, ['title_id', 'score'])
+        (model, indexes), = proposed_indexes([slow, ready])
+        assert model is Review and len(indexes) == 2
+        source = meta_indexes(model, indexes)
+        assert (
+            "models.Index(fields=['author', 'pub_date'], "
+            "name='review_author_pub_date_idx')"
+        ) in source, 'Проверьте, что индекс печатается для Meta.indexes'
+
+    def test_command(self):
+        from reviews.synthetic import Generator
+
+        Generator(seed=1).generate(users=3, titles=3, reviews=6, comments=3)
+        output = StringIO()
+        call_command('advise_indexes', '--all', stdout=output)
+        text = output.getvalue()
+        assert 'titles.list?genre' in text
+        assert 'comments.list' in text and 'Запросов: 28' in text
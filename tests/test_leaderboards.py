@@ -0,0 +1,183 @@
+import pytest
+from django.core.management import call_command
+
+
+def make_reviewers(django_user_model, count):
+    return [
+        django_user_model.objects.create_user(
+            username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+        )
+        for number in range(count)
+    ]
+
+
+def review(title, author, score):
+    from reviews.models import Review
+
+    return Review.objects.create(
+        title=title, author=author, text='текст', score=score
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLeaderboards:
+
+    @pytest.fixture
+    def reviewers(self, django_user_model):
+        return make_reviewers(django_user_model, 5)
+
+    @pytest.fixture
+    def other_title(self, category, genres):
+        from reviews.models import Title
+
+        title = Title.objects.create(
+            name='Пикник на обочине', year=1972, category=category
+        )
+        title.genre.set(genres[:1])
+        return title
+
+    def entries(self, **lookup):
+        from reviews.models import LeaderboardEntry
+
+        return list(
+            LeaderboardEntry.objects.filter(**lookup).order_by(
+                '-score', 'title_id'
+            ).values_list('title_id', 'rating_count')
+        )
+
+    def test_entries_follow_reviews(self, settings, title, reviewers,
+                                    category, genres):
+        settings.LEADERBOARD_MIN_REVIEWS = 2
+        first = review(title, reviewers[0], 10)
+        assert self.entries(category=category) == [], (
+            'Проверьте, что произведения с малым числом оценок '
+            'не попадают в рейтинг'
+        )
+        review(title, reviewers[1], 6)
+        assert self.entries(category=category) == [(title.pk, 2)]
+        assert self.entries(genre=genres[0]) == [(title.pk, 2)]
+        assert self.entries(genre=genres[1]) == [(title.pk, 2)], (
+            'Проверьте, что произведение попадает в рейтинги всех жанров'
+        )
+
+        first.score = 2
+        first.save()
+        from reviews.leaderboards import weighted_score
+        from reviews.models import LeaderboardEntry
+
+        entry = LeaderboardEntry.objects.get(category=category)
+        assert entry.rating == 4
+        assert entry.score == pytest.approx(weighted_score(8, 2))
+
+        first.delete()
+        assert self.entries() == [], (
+            'Проверьте, что произведение выбывает из рейтинга, когда '
+            'оценок становится меньше порога'
+        )
+
+    def test_bayesian_order(self, settings, title, other_title, reviewers,
+                            category):
+        settings.LEADERBOARD_MIN_REVIEWS = 1
+        settings.LEADERBOARD_PRIOR_REVIEWS = 2
+        review(other_title, reviewers[0], 10)
+        for reviewer in reviewers:
+            review(title, reviewer, 9)
+        assert self.entries(category=category) == [
+            (title.pk, 5), (other_title.pk, 1)
+        ], 'Проверьте, что одна высокая оценка не обгоняет много высоких'
+
+    def test_title_changes(self, settings, title, reviewers, category,
+                           genres):
+        from reviews.models import Category
+
+        settings.LEADERBOARD_MIN_REVIEWS = 1
+        review(title, reviewers[0], 7)
+        title.genre.remove(genres[1])
+        assert self.entries(genre=genres[1]) == []
+        genres[1].titles.add(title)
+        assert self.entries(genre=genres[1]) == [(title.pk, 1)]
+
+        book = Category.objects.create(name='Книга', slug='book')
+        title.refresh_from_db()
+        title.category = book
+        title.save()
+        assert self.entries(category=category) == []
+        assert self.entries(category=book) == [(title.pk, 1)]
+
+        title.delete()
+        assert self.entries() == []
+
+    def test_rebuild(self, settings, title, other_title, reviewers):
+        from reviews.models import LeaderboardEntry, Title
+
+        settings.LEADERBOARD_MIN_REVIEWS = 1
+        review(title, reviewers[0], 7)
+        review(other_title, reviewers[0], 9)
+        expected = sorted(self.entries())
+        assert len(expected) == 5
+        LeaderboardEntry.objects.all().delete()
+        Title.objects.filter(pk=title.pk).update(rating_count=0)
+        call_command('rebuild_leaderboards', batch_size=1, stdout=None)
+        assert self.entries() == [(other_title.pk, 1)] * 2, (
+            'Проверьте, что команда пропускает произведения без оценок'
+        )
+        Title.objects.filter(pk=title.pk).update(rating_count=1)
+        call_command('rebuild_leaderboards', stdout=None)
+        assert sorted(self.entries()) == expected
+
+
+@pytest.mark.django_db
+class TestLeaderboardApi:
+
+    @pytest.fixture
+    def ranked(self, settings, django_user_model, category, genres):
+        from reviews.models import Title
+
+        settings.LEADERBOARD_MIN_REVIEWS = 1
+        reviewers = make_reviewers(django_user_model, 3)
+        titles = []
+        for number, scores in enumerate(((6, 6, 6), (9, 9), (10,))):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres[:1])
+            for reviewer, score in zip(reviewers, scores):
+                review(title, reviewer, score)
+            titles.append(title)
+        return titles
+
+    def test_top_titles(self, client, ranked, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/leaderboards/categories/movie/')
+        assert response.status_code == 200
+        data = response.json()
+        assert [item['id'] for item in data] == [
+            ranked[1].pk, ranked[2].pk, ranked[0].pk
+        ]
+        assert set(data[0]) == {
+            'id', 'name', 'year', 'rating', 'rating_count', 'score'
+        }
+        response = client.get(
+            '/api/v1/leaderboards/genres/drama/', {'limit': 1}
+        )
+        assert [item['id'] for item in response.json()] == [ranked[1].pk]
+        response = client.get(
+            '/api/v1/leaderboards/genres/drama/', {'min_reviews': 1}
+        )
+        assert len(response.json()) == 3
+
+    def test_errors(self, client, ranked):
+        response = client.get('/api/v1/leaderboards/genres/comedy/')
+        assert response.json() == []
+        response = client.get('/api/v1/leaderboards/genres/unknown/')
+        assert response.status_code == 404
+        response = client.get(
+            '/api/v1/leaderboards/categories/movie/', {'limit': 'x'}
+        )
+        assert response.status_code == 400
+        response = client.get(
+            '/api/v1/leaderboards/categories/movie/', {'min_reviews': 3}
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что порог выше LEADERBOARD_MIN_REVIEWS отклоняется'
+        )
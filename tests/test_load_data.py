@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestLoadData:
+
+    def write(self, path, name, rows):
+        file = path / name
+        if name.endswith('.csv'):
+            lines = [','.join(rows[0])]
+            lines += [','.join(str(value) for value in row.values())
+                      for row in rows]
+            file.write_text('\n'.join(lines), encoding='utf-8')
+        else:
+            file.write_text(
+                '\n'.join(json.dumps(row) for row in rows), encoding='utf-8'
+            )
+        return str(file)
+
+    def test_loads_all_sources(self, tmp_path, capsys):
+        from reviews.models import Comment, Review, Title
+        from users.models import User
+
+        files = {
+            'users': self.write(tmp_path, 'users.csv', [
+                {'id': 10, 'username': 'bingobongo',
+                 'email': 'bingo@yamdb.fake', 'role': 'user'},
+                {'id': 11, 'username': 'capt_obvious',
+                 'email': 'capt@yamdb.fake', 'role': 'admin'},
+            ]),
+            'categories': self.write(tmp_path, 'category.csv', [
+                {'id': 1, 'name': 'Фильм', 'slug': 'movie'},
+            ]),
+            'genres': self.write(tmp_path, 'genre.csv', [
+                {'id': 1, 'name': 'Драма', 'slug': 'drama'},
+            ]),
+            'titles': self.write(tmp_path, 'titles.csv', [
+                {'id': 5, 'name': 'Побег', 'year': 1994, 'category': 'movie'},
+            ]),
+            'genre_titles': self.write(tmp_path, 'genre_title.csv', [
+                {'id': 1, 'title_id': 5, 'genre': 'drama'},
+            ]),
+            'reviews': self.write(tmp_path, 'review.ndjson', [
+                {'id': 7, 'title_id': 5, 'author_id': 10, 'text': 'a',
+                 'score': 6, 'pub_date': '2019-09-24T21:08:21.567Z'},
+                {'id': 8, 'title_id': 5, 'author': 'capt_obvious',
+                 'text': 'b', 'score': 10,
+                 'pub_date': '2019-09-25T21:08:21.567Z'},
+            ]),
+            'comments': self.write(tmp_path, 'comments.ndjson', [
+                {'id': 3, 'review_id': 7, 'author_id': 11, 'text': 'c',
+                 'pub_date': '2019-09-26T21:08:21.567Z'},
+            ]),
+        }
+        call_command(
+            'load_data', batch_size=1, batches_per_transaction=1,
+            **files
+        )
+        output = capsys.readouterr().out
+        assert 'reviews: 2 строк' in output, (
+            'Проверьте, что команда сообщает число загруженных строк'
+        )
+        assert User.objects.get(pk=11).role == 'admin'
+        title = Title.objects.get(pk=5)
+        assert title.category.slug == 'movie'
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+        assert title.rating == 8, (
+            'Проверьте, что рейтинг пересчитывается после загрузки отзывов'
+        )
+        review = Review.objects.get(pk=8)
+        assert review.author.username == 'capt_obvious'
+        assert review.pub_date.year == 2019
+        assert Comment.objects.get(pk=3).pub_date.day == 26
+
+    def test_reference_columns(self, tmp_path):
+        from django.core.management.base import CommandError
+        from reviews.models import Comment, Title
+        from users.models import User
+
+        User.objects.create(id=5, username='1999', email='a@yamdb.fake')
+        User.objects.create(id=1999, username='other', email='b@yamdb.fake')
+        call_command('load_data', **{
+            'titles': self.write(tmp_path, 'titles.csv', [
+                {'id': 1, 'name': 'Побег', 'year': 1994, 'category': ''},
+            ]),
+            'reviews': self.write(tmp_path, 'review.csv', [
+                {'id': 1, 'title_id': 1, 'author': '1999', 'text': 'a',
+                 'score': 5},
+            ]),
+            'comments': self.write(tmp_path, 'comments.csv', [
+                {'id': 1, 'review_id': 1, 'author': '1999', 'text': 'b'},
+            ]),
+        })
+        assert Title.objects.get(pk=1).category_id is None
+        assert Title.objects.get(pk=1).reviews.get().author_id == 5, (
+            'Проверьте, что числовой username ищется по username, а не по id'
+        )
+        comments = self.write(tmp_path, 'comments2.csv', [
+            {'id': 2, 'review_id': 1, 'author': '1999', 'text': 'c'},
+        ])
+        call_command('load_data', comments=comments, id_columns='author')
+        assert Comment.objects.get(pk=2).author_id == 1999, (
+            'Проверьте, что столбцы из --id-columns содержат id'
+        )
+        with pytest.raises(CommandError):
+            call_command('load_data', comments=comments, id_columns='text')
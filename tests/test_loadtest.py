@@ -0,0 +1,109 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+SCENARIO_KEYS = {
+    'requests', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms',
+    'throughput_rps', 'queries_per_request', 'max_queries',
+}
+
+
+@pytest.mark.django_db
+class TestSyntheticData:
+
+    def test_generate(self):
+        from reviews.models import Comment, LeaderboardEntry, Review, Title
+        from reviews.synthetic import Generator
+
+        dataset = Generator(seed=1).generate(
+            users=8, titles=5, reviews=30, comments=12
+        )
+        assert dataset == {
+            'users': 8, 'titles': 5, 'reviews': 30, 'comments': 12
+        }
+        assert Review.objects.count() == 30
+        assert Comment.objects.count() == 12
+        assert Title.objects.filter(rating_count=6).count() == 5, (
+            'Проверьте, что рейтинги пересчитываются после загрузки'
+        )
+        assert LeaderboardEntry.objects.exists()
+
+    def test_reproducible(self):
+        from reviews.models import Title
+        from reviews.synthetic import Generator
+
+        Generator(seed=3, prefix='first').generate(2, 4, 0, 0)
+        Generator(seed=3, prefix='second').generate(2, 4, 0, 0)
+        names = list(Title.objects.values_list('name', 'year'))
+        assert names[:4] == names[4:]
+
+
+@pytest.mark.django_db
+class TestLoadtest:
+
+    def run(self, tmp_path, name, **options):
+        output = tmp_path / name
+        call_command(
+            'loadtest', users=10, titles=10, reviews=40, comments=40,
+            requests=120, warmup=10, output=str(output),
+            stderr=StringIO(), **options
+        )
+        return json.loads(output.read_text(encoding='utf-8'))
+
+    def test_report(self, tmp_path):
+        report = self.run(tmp_path, 'report.json')
+        assert report['dataset']['reviews'] == 40
+        scenarios = report['scenarios']
+        assert 'total' in scenarios and 'title_search' in scenarios
+        assert scenarios['total']['requests'] == 120
+        for name, stats in scenarios.items():
+            assert set(stats) == SCENARIO_KEYS, name
+            assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+            assert stats['errors'] == 0, (
+                f'Проверьте, что сценарий {name} выполняется без ошибок'
+            )
+            assert stats['queries_per_request'] >= 1
+
+    def test_compare(self, tmp_path):
+        report = self.run(tmp_path, 'report.json')
+        baseline = tmp_path / 'baseline.json'
+        report['scenarios']['titles_list']['queries_per_request'] = 0.5
+        baseline.write_text(json.dumps(report), encoding='utf-8')
+        with pytest.raises(CommandError, match='titles_list: SQL'):
+            self.run(tmp_path, 'next.json', compare=str(baseline))
+
+    def test_repeatable(self, tmp_path, title, user):
+        from django.core.cache import cache
+        from reviews.models import Change, Review, Title
+
+        changes = Change.objects.count()
+        version = cache.get('api:version:titles')
+        first = self.run(tmp_path, 'first.json')
+        second = self.run(tmp_path, 'second.json')
+        assert first['dataset'] == second['dataset'], (
+            'Проверьте, что повторный запуск с тем же seed не падает'
+        )
+        assert list(Title.objects.all()) == [title], (
+            'Проверьте, что синтетические данные откатываются'
+        )
+        assert Change.objects.count() == changes
+        assert cache.get('api:version:titles') == version, (
+            'Проверьте, что нагрузочный тест не пишет в общий кэш'
+        )
+        self.run(tmp_path, 'existing.json', skip_seed=True)
+        assert not Review.objects.exists(), (
+            'Проверьте, что записи сценариев с --skip-seed откатываются'
+        )
+
+
+def test_percentile():
+    from api.loadtest import percentile
+
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.95) == 7
+    assert percentile([], 0.5) is None
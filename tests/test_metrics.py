@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_route_metrics(self, client, title):
+        labels = {'route': 'api:title-list', 'method': 'GET'}
+        before = sample('yamdb_http_requests_total', status='200', **labels)
+        queries = sample('yamdb_http_db_queries_sum', **labels)
+        sizes = sample('yamdb_http_response_size_bytes_count', **labels)
+        response = client.get('/api/v1/titles/')
+        assert sample(
+            'yamdb_http_requests_total', status='200', **labels
+        ) == before + 1, 'Проверьте, что ответы считаются по маршрутам'
+        assert sample('yamdb_http_db_queries_sum', **labels) >= queries + 2
+        assert sample(
+            'yamdb_http_response_size_bytes_count', **labels
+        ) == sizes + 1
+        assert sample(
+            'yamdb_http_request_duration_seconds_bucket', le='+Inf', **labels
+        ) >= 1
+        assert response.status_code == 200
+
+    def test_unresolved(self, client):
+        labels = {'route': 'unresolved', 'method': 'GET', 'status': '404'}
+        before = sample('yamdb_http_requests_total', **labels)
+        client.get('/no-such-page/')
+        assert sample('yamdb_http_requests_total', **labels) == before + 1
+
+    def test_endpoint(self, client, user_client, admin_client):
+        assert client.get('/metrics').status_code == 401
+        assert user_client.get('/metrics').status_code == 403
+        response = admin_client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert '# TYPE yamdb_http_request_duration_seconds histogram' in body
+        assert 'yamdb_http_db_duration_seconds_bucket' in body
+
+
+def test_multiprocess_store(tmp_path):
+    """Значения из разных процессов складываются при чтении."""
+    env = {
+        **os.environ,
+        'PROMETHEUS_MULTIPROC_DIR': str(tmp_path),
+        'PYTHONPATH': 'api_yamdb',
+    }
+    increment = (
+        'from api.metrics import REQUESTS;'
+        'REQUESTS.labels("api:titles-list", "GET", "200").inc()'
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', increment], env=env, check=True)
+    output = subprocess.run(
+        [sys.executable, '-c',
+         'from api.metrics import render; print(render()[0].decode())'],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    assert (
+        'yamdb_http_requests_total{method="GET",route="api:titles-list",'
+        'status="200"} 2.0'
+    ) in output
@@ -0,0 +1,215 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+REVIEWS_URL = '/api/v1/moderation/reviews/'
+COMMENTS_URL = '/api/v1/moderation/comments/'
+
+
+@pytest.mark.django_db
+class TestModeration:
+
+    @pytest.fixture
+    def moderator_client(self, django_user_model):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        moderator = django_user_model.objects.create_user(
+            username='TestModerator', email='moderator@yamdb.fake',
+            role='moderator'
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(moderator)}'
+        )
+        return client
+
+    @pytest.fixture
+    def reviews(self, django_user_model, title):
+        from reviews.models import Comment, Review
+
+        reviews = []
+        for number in range(4):
+            author = django_user_model.objects.create_user(
+                username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='текст', score=number + 1
+            )
+            Comment.objects.create(review=review, author=author, text='ок')
+            reviews.append(review)
+        return reviews
+
+    @staticmethod
+    def rating(title):
+        title.refresh_from_db()
+        return title.rating_sum, title.rating_count
+
+    def test_permissions(self, user_client, admin_client, reviews):
+        data = {'action': 'hide', 'ids': [reviews[0].pk]}
+        assert user_client.post(
+            REVIEWS_URL, data, format='json'
+        ).status_code == 403, (
+            'Проверьте, что массовая модерация недоступна пользователям'
+        )
+        response = admin_client.post(REVIEWS_URL, data, format='json')
+        assert response.status_code == 200
+
+    def test_hide_and_show(self, moderator_client, title, reviews):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert self.rating(title) == (10, 4)
+        response = moderator_client.post(REVIEWS_URL, {
+            'action': 'hide', 'ids': [reviews[2].pk, reviews[3].pk],
+        }, format='json')
+        assert response.status_code == 200
+        assert response.data == {'action': 'hide', 'reviews': 2, 'titles': 1}
+        assert self.rating(title) == (3, 2), (
+            'Проверьте, что оценки скрытых отзывов вычтены из рейтинга'
+        )
+        assert moderator_client.get(url).data['count'] == 2
+        assert moderator_client.get(
+            f'{url}{reviews[3].pk}/comments/'
+        ).status_code == 404
+        again = moderator_client.post(REVIEWS_URL, {
+            'action': 'hide', 'ids': [reviews[2].pk],
+        }, format='json')
+        assert again.data['reviews'] == 0
+        assert self.rating(title) == (3, 2), (
+            'Проверьте, что повторное скрытие не меняет рейтинг'
+        )
+        response = moderator_client.post(REVIEWS_URL, {
+            'action': 'show', 'title': title.id,
+        }, format='json')
+        assert response.data['reviews'] == 2
+        assert self.rating(title) == (10, 4)
+        assert moderator_client.get(url).data['count'] == 4
+
+    def test_saved_hidden_review(self, title, reviews):
+        review = reviews[3]
+        review.is_hidden = True
+        review.save()
+        assert self.rating(title) == (6, 3)
+        review.score = 10
+        review.save()
+        assert self.rating(title) == (6, 3)
+        review.is_hidden = False
+        review.save()
+        assert self.rating(title) == (16, 4)
+        review.is_hidden = True
+        review.save()
+        review.delete()
+        assert self.rating(title) == (6, 3), (
+            'Проверьте, что удаление скрытого отзыва не меняет рейтинг'
+        )
+
+    def test_delete_by_filters(self, moderator_client, title, reviews):
+        from reviews.models import Comment, Review
+
+        moderator_client.post(REVIEWS_URL, {
+            'action': 'hide', 'ids': [reviews[0].pk],
+        }, format='json')
+        with CaptureQueriesContext(connection) as context:
+            response = moderator_client.post(REVIEWS_URL, {
+                'action': 'delete', 'ids': [reviews[0].pk, reviews[1].pk],
+                'author': 'critic1',
+            }, format='json')
+        assert response.data == {
+            'action': 'delete', 'reviews': 1, 'comments': 1, 'titles': 1,
+        }
+        response = moderator_client.post(REVIEWS_URL, {
+            'action': 'delete', 'title': title.id, 'since': '2000-01-01',
+        }, format='json')
+        assert response.data == {
+            'action': 'delete', 'reviews': 3, 'comments': 3, 'titles': 1,
+        }
+        assert not Review.objects.exists() and not Comment.objects.exists()
+        assert self.rating(title) == (0, 0), (
+            'Проверьте, что удаление учитывает скрытые отзывы в рейтинге'
+        )
+        assert len(context) < 15, (
+            'Проверьте, что модерация не выполняет запрос на каждую строку'
+        )
+
+    def test_bulk_delete_matches_signals(self, title, reviews):
+        from api.cache import get_version
+        from django.db import transaction
+        from reviews.models import Change, LeaderboardEntry, Review
+        from reviews.moderation import delete_reviews
+
+        class Rollback(Exception):
+            pass
+
+        def state(since):
+            return (
+                self.rating(title),
+                list(LeaderboardEntry.objects.values_list(
+                    'category_id', 'genre_id', 'title_id', 'score'
+                ).order_by('category_id', 'genre_id', 'title_id')),
+                {
+                    (change.resource, change.action, change.object_id)
+                    for change in Change.objects.filter(seq__gt=since)
+                },
+            )
+
+        reviews[3].is_hidden = True
+        reviews[3].save()
+        ids = [reviews[2].pk, reviews[3].pk]
+        since = Change.objects.latest('seq').seq
+        version = get_version('titles')
+        try:
+            with transaction.atomic():
+                Review.objects.filter(pk__in=ids).delete()
+                expected = state(since)
+                raise Rollback
+        except Rollback:
+            pass
+        assert get_version('titles') != version
+        version = get_version('titles')
+        with transaction.atomic():
+            delete_reviews(Review.objects.filter(pk__in=ids))
+        assert state(since) == expected, (
+            'Проверьте, что массовое удаление меняет рейтинг, рейтинги '
+            'лучших и журнал изменений так же, как обычное удаление'
+        )
+        assert get_version('titles') != version, (
+            'Проверьте, что массовое удаление сбрасывает кэш произведений'
+        )
+
+    def test_comments(self, moderator_client, title, reviews):
+        from reviews.models import Comment
+
+        review = reviews[0]
+        response = moderator_client.post(COMMENTS_URL, {
+            'action': 'hide', 'review': review.pk,
+        }, format='json')
+        assert response.data == {'action': 'hide', 'comments': 1}
+        url = f'/api/v1/titles/{title.id}/reviews/{review.pk}/comments/'
+        assert moderator_client.get(url).data['count'] == 0
+        response = moderator_client.post(COMMENTS_URL, {
+            'action': 'delete', 'title': title.id, 'author': 'critic2',
+        }, format='json')
+        assert response.data == {'action': 'delete', 'comments': 1}
+        assert Comment.objects.count() == 3
+        assert self.rating(title) == (10, 4)
+
+    @pytest.mark.parametrize('data', (
+        {'action': 'hide'},
+        {'action': 'ban', 'ids': [1]},
+        {'action': 'hide', 'ids': []},
+        {'action': 'hide', 'since': 'вчера'},
+    ))
+    def test_bad_requests(self, moderator_client, reviews, data):
+        response = moderator_client.post(REVIEWS_URL, data, format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что запрос без условий или с ошибкой отклоняется'
+        )
+
+    def test_limit(self, moderator_client, settings, title, reviews):
+        settings.MODERATION_LIMIT = 3
+        response = moderator_client.post(REVIEWS_URL, {
+            'action': 'hide', 'title': title.id,
+        }, format='json')
+        assert response.status_code == 400
+        assert self.rating(title) == (10, 4), (
+            'Проверьте, что выборка больше MODERATION_LIMIT не меняется'
+        )
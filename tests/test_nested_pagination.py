@@ -0,0 +1,60 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestNestedCursorPagination:
+
+    @pytest.fixture
+    def reviews(self, title, django_user_model):
+        from reviews.models import Review
+
+        return [
+            Review.objects.create(
+                title=title, text=str(i), score=5,
+                author=django_user_model.objects.create(
+                    username=f'user{i}', email=f'user{i}@yamdb.fake'
+                ),
+            )
+            for i in range(12)
+        ]
+
+    def test_page_number_is_default(self, client, title, reviews):
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 12
+
+    def test_cursor_walks_all_reviews(self, client, title, reviews,
+                                      django_assert_max_num_queries):
+        url = f'/api/v1/titles/{title.pk}/reviews/?cursor='
+        seen = []
+        while url:
+            with django_assert_max_num_queries(10) as context:
+                response = client.get(url)
+            assert response.status_code == 200
+            sql = ' '.join(
+                query['sql'] for query in context.captured_queries
+            ).upper()
+            assert 'COUNT(' not in sql and 'OFFSET' not in sql, (
+                'Проверьте, что курсорная пагинация не делает COUNT и OFFSET'
+            )
+            data = response.json()
+            assert 'count' not in data
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        assert seen == [review.pk for review in reviews], (
+            'Проверьте, что курсорная пагинация отдаёт все отзывы по порядку'
+        )
+
+    def test_cursor_for_comments(self, client, title, reviews, user):
+        from reviews.models import Comment
+
+        review = reviews[0]
+        for i in range(7):
+            Comment.objects.create(review=review, author=user, text=str(i))
+        response = client.get(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+            '?cursor='
+        )
+        data = response.json()
+        assert len(data['results']) == 5
+        assert data['next'] is not None
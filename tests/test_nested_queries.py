@@ -0,0 +1,101 @@
+import pytest
+
+
+def write_queries(context):
+    """Запросы без SAVEPOINT/RELEASE, число которых зависит от теста."""
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'SAVEPOINT' not in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestNestedQueries:
+
+    def test_review_post(self, user_client, title,
+                         django_assert_max_num_queries):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        user_client.get(url)
+        with django_assert_max_num_queries(10) as context:
+            response = user_client.post(url, {'text': 'Текст', 'score': 7})
+        assert response.status_code == 201
+        # Произведение, INSERT отзыва, UPDATE рейтинга и чтение его для
+        # таблицы лидеров: с одной оценкой произведение туда не попадает.
+        # Плюс записи журнала изменений о произведении и отзыве.
+        assert len(write_queries(context)) == 6, (
+            'Проверьте число запросов при создании отзыва'
+        )
+        assert response.json()['author'] == 'TestUser'
+
+    def test_second_review_rejected(self, user_client, title):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        user_client.post(url, {'text': 'Текст', 'score': 7})
+        response = user_client.post(url, {'text': 'Ещё', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {
+            'non_field_errors': ['Писать второе ревью нельзя.']
+        }
+        title.refresh_from_db()
+        assert Review.objects.count() == 1
+        assert (title.rating_count, title.rating) == (1, 7)
+
+    def test_comment_post(self, user_client, title, another_user,
+                          django_assert_max_num_queries):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=another_user, text='', score=5
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        user_client.get(url)
+        with django_assert_max_num_queries(10) as context:
+            response = user_client.post(url, {'text': 'Согласен'})
+        assert response.status_code == 201
+        # Отзыв вместе с проверкой произведения, INSERT комментария и
+        # записи журнала изменений.
+        assert len(write_queries(context)) == 3
+
+    def test_comment_for_review_of_another_title(self, user_client, title,
+                                                 another_user, category):
+        from reviews.models import Review, Title
+
+        other = Title.objects.create(name='Другое', year=2000,
+                                     category=category)
+        review = Review.objects.create(
+            title=other, author=another_user, text='', score=5
+        )
+        response = user_client.post(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+            {'text': 'Мимо'}
+        )
+        assert response.status_code == 404
+
+    def test_review_list_without_author_queries(
+        self, client, title, django_user_model, django_assert_num_queries
+    ):
+        from reviews.models import Review
+
+        for i in range(5):
+            Review.objects.create(
+                title=title, text='', score=5,
+                author=django_user_model.objects.create(
+                    username=f'user{i}', email=f'user{i}@yamdb.fake'
+                ),
+            )
+        # Произведение, COUNT, страница отзывов с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert len(response.json()['results']) == 5
+
+    def test_author_permission(self, user_client, title, another_user):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=another_user, text='', score=5
+        )
+        response = user_client.patch(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/', {'score': 1}
+        )
+        assert response.status_code == 403
@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.REQUEST_PROFILING = True
+    settings.PROFILE_SAMPLE_RATE = 0
+    settings.PROFILE_SLOW_THRESHOLD = 60
+    settings.PROFILE_CAPTURE_DIR = str(tmp_path)
+    from api.profiling import CaptureStore
+
+    return CaptureStore()
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+
+    def test_disabled_by_default(self, settings, tmp_path, admin_client,
+                                 title):
+        settings.PROFILE_CAPTURE_DIR = str(tmp_path)
+        response = admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert 'X-Profile-Capture' not in response
+        assert list(tmp_path.iterdir()) == []
+
+    def test_admin_header(self, profiling, admin_client, title):
+        response = admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        name = response['X-Profile-Capture']
+        assert profiling.names() == [name]
+        capture = profiling.load(name)
+        assert capture['view'] == 'TitleViewSet.list'
+        assert capture['serializer'] == 'TitleReadSerializer'
+        assert capture['path'] == '/api/v1/titles/'
+        assert capture['profile'], 'Проверьте, что профиль сохраняется'
+        selects = [
+            query for query in capture['queries']
+            if query['sql'].startswith('SELECT')
+        ]
+        assert selects and any(query.get('explain') for query in selects), (
+            'Проверьте, что для запросов сохраняется план'
+        )
+
+    def test_params_redacted(self, settings, profiling, admin_client,
+                             title):
+        def capture_text(value):
+            name = admin_client.get(
+                '/api/v1/titles/', {'name': value}, HTTP_X_PROFILE='1'
+            )['X-Profile-Capture']
+            with open(profiling.file(name), encoding='utf-8') as file:
+                return file.read()
+
+        assert "'секретное" not in capture_text('секретное'), (
+            'Проверьте, что параметры SQL не попадают в запись по умолчанию'
+        )
+        settings.PROFILE_CAPTURE_PARAMS = True
+        assert "'тайное" in capture_text('тайное')
+
+    def test_header_ignored_for_users(self, profiling, user_client, client,
+                                      title):
+        for api_client in (user_client, client):
+            response = api_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+            assert response.status_code == 200
+            assert 'X-Profile-Capture' not in response
+        assert profiling.names() == []
+
+    def test_sampled_slow_requests(self, settings, profiling, client, title):
+        settings.PROFILE_SAMPLE_RATE = 1
+        client.get('/api/v1/titles/')
+        assert profiling.names() == [], (
+            'Проверьте, что быстрые запросы не записываются'
+        )
+        settings.PROFILE_SLOW_THRESHOLD = 0
+        client.get(f'/api/v1/titles/{title.pk}/')
+        assert len(profiling.names()) == 1
+
+
+def test_ring_buffer(tmp_path):
+    from api.profiling import CaptureStore
+
+    store = CaptureStore(str(tmp_path), limit=3)
+    names = [store.save({'number': number}) for number in range(5)]
+    assert store.names() == names[2:]
+    assert store.load(names[-1]) == {'number': 4}
+
+
+@pytest.mark.django_db
+def test_slow_requests_command(profiling, admin_client, title):
+    name = admin_client.get(
+        f'/api/v1/titles/{title.pk}/', HTTP_X_PROFILE='1'
+    )['X-Profile-Capture']
+    admin_client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+
+    out = StringIO()
+    call_command('slow_requests', stdout=out)
+    assert 'Записей: 2' in out.getvalue()
+
+    out = StringIO()
+    call_command('slow_requests', summary=True, stdout=out)
+    assert 'GET TitleViewSet.retrieve: 1 зап.' in out.getvalue()
+
+    out = StringIO()
+    call_command('slow_requests', name, stdout=out)
+    output = out.getvalue()
+    assert 'сериализатор: TitleReadSerializer' in output
+    assert 'Профиль' in output
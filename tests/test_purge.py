@@ -0,0 +1,159 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+def purge(batch_size=2):
+    output = StringIO()
+    call_command('purge_deleted', once=True, batch_size=batch_size,
+                 stdout=output)
+    return output.getvalue()
+
+
+@pytest.mark.django_db
+class TestPurge:
+
+    @pytest.fixture
+    def reviewers(self, django_user_model, title):
+        from reviews.models import Comment, Review
+
+        reviewers = [
+            django_user_model.objects.create_user(
+                username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+            )
+            for number in range(5)
+        ]
+        for number, reviewer in enumerate(reviewers):
+            review = Review.objects.create(
+                title=title, author=reviewer, text='текст', score=number + 1
+            )
+            for commenter in reviewers[:3]:
+                Comment.objects.create(
+                    review=review, author=commenter, text='комментарий'
+                )
+        return reviewers
+
+    def test_title(self, admin_client, title, reviewers):
+        from reviews.models import (Change, Comment, LeaderboardEntry, Review,
+                                    Title)
+
+        assert LeaderboardEntry.objects.filter(title=title).exists()
+        review = Review.objects.filter(title=title).first()
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 204
+        assert Review.objects.filter(title=title).count() == 5, (
+            'Проверьте, что DELETE не удаляет отзывы каскадом в запросе'
+        )
+        assert admin_client.get(
+            f'/api/v1/titles/{title.id}/'
+        ).status_code == 404
+        assert admin_client.get('/api/v1/titles/').data['count'] == 0
+        assert admin_client.get(
+            f'/api/v1/titles/{title.id}/reviews/'
+        ).status_code == 404
+        assert admin_client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        ).status_code == 404, (
+            'Проверьте, что комментарии удалённого произведения скрыты'
+        )
+        assert not LeaderboardEntry.objects.filter(title=title).exists()
+        since = Change.objects.latest('seq').seq
+        output = purge()
+        assert 'отзывы — 4' in output and 'удаление завершено' in output, (
+            'Проверьте, что purge_deleted сообщает о ходе удаления'
+        )
+        assert not Title.all_objects.filter(pk=title.id).exists()
+        assert not Review.objects.exists() and not Comment.objects.exists()
+        assert not Change.objects.filter(
+            seq__gt=since, resource='titles', action=Change.UPSERT
+        ).exists(), (
+            'Проверьте, что очистка не возвращает удалённое произведение '
+            'в журнал изменений'
+        )
+
+    def test_user(self, admin_client, title, reviewers):
+        from reviews.models import Comment, Review
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+        from users.models import User
+
+        deleted = reviewers[4]
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(deleted)}'
+        )
+        assert client.get('/api/v1/users/me/').status_code == 200
+        response = admin_client.delete(f'/api/v1/users/{deleted.username}/')
+        assert response.status_code == 204
+        review = Review.objects.get(author=deleted)
+        assert admin_client.get(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        ).status_code == 404, (
+            'Проверьте, что комментарии к отзыву удалённого пользователя '
+            'скрыты'
+        )
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен удалённого пользователя не действует'
+        )
+        reviews = admin_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert reviews.data['count'] == 4, (
+            'Проверьте, что отзывы удалённого пользователя скрыты'
+        )
+        response = admin_client.post('/api/v1/users/', {
+            'username': deleted.username, 'email': 'new@yamdb.fake'
+        })
+        assert response.status_code == 400
+        purge()
+        assert not User.all_objects.filter(pk=deleted.pk).exists()
+        assert Review.objects.count() == 4
+        assert Comment.objects.count() == 12
+        title.refresh_from_db()
+        assert (title.rating_count, title.rating_sum) == (4, 10), (
+            'Проверьте, что оценки удалённых отзывов вычтены из рейтинга'
+        )
+        assert title.rating == 2.5
+
+    def test_category(self, admin_client, title, category):
+        from reviews.models import Category, LeaderboardEntry, Title
+
+        response = admin_client.delete(f'/api/v1/categories/{category.slug}/')
+        assert response.status_code == 204
+        assert admin_client.get('/api/v1/categories/').data['count'] == 0
+        data = admin_client.get(f'/api/v1/titles/{title.id}/').data
+        assert data['category'] is None
+        assert admin_client.get(
+            f'/api/v1/titles/?category={category.slug}'
+        ).data['count'] == 0
+        response = admin_client.post(
+            '/api/v1/categories/', {'name': 'Кино', 'slug': category.slug}
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что slug удалённой категории занят до очистки'
+        )
+        assert Title.objects.get(pk=title.id).category_id == category.id
+        purge()
+        assert Title.objects.get(pk=title.id).category_id is None
+        assert not Category.all_objects.exists()
+        assert not LeaderboardEntry.objects.filter(
+            category_id=category.id
+        ).exists()
+
+    def test_genre(self, admin_client, title, genres):
+        from reviews.models import Genre
+
+        deleted = genres[0]
+        response = admin_client.delete(f'/api/v1/genres/{deleted.slug}/')
+        assert response.status_code == 204
+        data = admin_client.get(f'/api/v1/titles/{title.id}/').data
+        assert [genre['slug'] for genre in data['genre']] == [genres[1].slug]
+        listed = admin_client.get('/api/v1/titles/').data['results'][0]
+        assert [genre['slug'] for genre in listed['genre']] == [
+            genres[1].slug
+        ]
+        output = StringIO()
+        call_command('purge_deleted', stats=True, stdout=output)
+        assert 'Жанры: 1' in output.getvalue()
+        purge()
+        assert list(title.genre.all()) == [genres[1]]
+        assert not Genre.all_objects.filter(pk=deleted.pk).exists()
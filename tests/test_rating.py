@@ -0,0 +1,61 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, user, another_user):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=title, author=user, text='1', score=4
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='2', score=10
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (14, 2), (
+            'Проверьте, что новые ревью учитываются в рейтинге произведения'
+        )
+        assert title.rating == 7
+
+        review.score = 8
+        review.save()
+        title.refresh_from_db()
+        assert title.rating == 9, (
+            'Проверьте, что изменение оценки пересчитывает рейтинг'
+        )
+
+        another_user.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (8, 1), (
+            'Проверьте, что каскадное удаление ревью уменьшает рейтинг'
+        )
+
+        review.delete()
+        title.refresh_from_db()
+        assert title.rating is None
+        assert title.rating_count == 0
+
+    def test_title_list_shows_stored_rating(self, client, title, user):
+        from reviews.models import Review
+
+        Review.objects.create(title=title, author=user, text='1', score=6)
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['results'][0]['rating'] == 6
+
+    def test_recalculate_ratings_fixes_drift(self, title, user, capsys):
+        from reviews.models import Review, Title
+
+        Review.objects.create(title=title, author=user, text='1', score=5)
+        Title.objects.filter(pk=title.pk).update(
+            rating_sum=0, rating_count=0, rating=None
+        )
+        call_command('recalculate_ratings')
+        assert 'Расхождений найдено: 1' in capsys.readouterr().out
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            5, 1, 5
+        )
@@ -0,0 +1,154 @@
+import time
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from rest_framework.test import APIClient
+
+REPLICA = 'replica_test'
+BROKEN = 'replica_broken'
+
+
+@pytest.fixture(scope='module')
+def replica(django_db_setup, django_db_blocker, tmp_path_factory):
+    """Вторая база SQLite в файле со схемой, но без данных основной."""
+    directory = tmp_path_factory.mktemp('replicas')
+    connections.databases[REPLICA] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(directory / 'replica.sqlite3'),
+    }
+    # Реплика без схемы: подключение есть, запросы падают.
+    connections.databases[BROKEN] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(directory / 'broken.sqlite3'),
+    }
+    with django_db_blocker.unblock():
+        call_command('migrate', database=REPLICA, verbosity=0)
+    yield REPLICA
+    for alias in (REPLICA, BROKEN):
+        connections[alias].close()
+        del connections[alias]
+        del connections.databases[alias]
+
+
+@pytest.fixture
+def replicated(replica, settings):
+    from api.replicas import health
+
+    health.clear()
+    settings.DATABASE_REPLICAS = {REPLICA: 1}
+    settings.REPLICA_STICKY_SECONDS = 10
+    yield replica
+    health.clear()
+
+
+def create_title(name, using='default', **kwargs):
+    from reviews.models import Title
+
+    return Title.objects.using(using).create(name=name, year=2000, **kwargs)
+
+
+@pytest.mark.django_db(databases=['default', REPLICA, BROKEN])
+class TestReplicas:
+
+    def test_reads_from_replica(self, replicated):
+        title = create_title('Только на реплике', using=REPLICA)
+        client = APIClient()
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200, (
+            'Проверьте, что безопасные запросы читают с реплики'
+        )
+        assert response.data['name'] == 'Только на реплике'
+        response = client.post('/api/v1/titles/', {})
+        assert response.status_code == 401
+
+    def test_read_your_writes(self, replicated, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        title = create_title('Фильм')
+        create_title('Фильм', using=REPLICA, id=title.id)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        token = f'Bearer {AccessToken.for_user(user)}'
+        writer = APIClient()
+        writer.credentials(HTTP_AUTHORIZATION=token)
+        response = writer.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert writer.get(url).data['count'] == 1, (
+            'Проверьте, что после записи клиент читает с основной базы'
+        )
+        assert APIClient().get(url).data['count'] == 0, (
+            'Проверьте, что другие клиенты читают с реплики'
+        )
+        token_only = APIClient()
+        token_only.credentials(HTTP_AUTHORIZATION=token)
+        assert token_only.get(url).data['count'] == 1, (
+            'Проверьте, что метка записи привязана и к user_id из токена'
+        )
+        cookie_only = APIClient()
+        cookie_only.cookies = writer.cookies
+        assert cookie_only.get(url).data['count'] == 1
+
+    def test_sticky_window_expires(self, replicated, settings, user):
+        title = create_title('Фильм')
+        create_title('Фильм', using=REPLICA, id=title.id)
+        settings.REPLICA_STICKY_SECONDS = 1
+        client = APIClient()
+        # Без JWT: метка записи есть только в cookie.
+        client.force_authenticate(user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert client.post(url, {'text': 'Отзыв', 'score': 7}).status_code == 201
+        assert client.get(url).data['count'] == 1
+        time.sleep(1.1)
+        assert client.get(url).data['count'] == 0, (
+            'Проверьте, что по истечении окна клиент снова читает с реплики'
+        )
+
+    def test_list_etag(self, replicated, settings):
+        from api.cache import bump_version
+
+        bump_version('titles')
+        create_title('Только на реплике', using=REPLICA)
+        client = APIClient()
+        for outcome in ('MISS', 'HIT'):
+            response = client.get('/api/v1/titles/')
+            assert response['X-Cache'] == outcome
+            assert response.data['count'] == 1
+            assert not response.has_header('ETag'), (
+                'Проверьте, что список по реплике отдаётся без ETag'
+            )
+        bump_version('titles')
+        settings.DATABASE_REPLICAS = {}
+        response = client.get('/api/v1/titles/')
+        assert response.data['count'] == 0
+        assert response.has_header('ETag')
+        response = client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert response.status_code == 304
+
+    def test_unhealthy_replica(self, replicated, settings):
+        from api.replicas import choose_replica
+
+        title = create_title('Только в основной базе')
+        settings.DATABASE_REPLICAS = {BROKEN: 1}
+        assert choose_replica() is None
+        response = APIClient().get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200, (
+            'Проверьте, что при недоступной реплике чтение идёт в основную базу'
+        )
+        settings.DATABASE_REPLICAS = {REPLICA: 1, BROKEN: 100}
+        assert {choose_replica() for _ in range(20)} == {REPLICA}
+
+
+def test_weighted_choice(settings, monkeypatch):
+    from api import replicas
+
+    monkeypatch.setattr(replicas.health, 'is_healthy', lambda alias: True)
+    settings.DATABASE_REPLICAS = {'first': 3, 'second': 1, 'off': 0}
+    replicas.random.seed(0)
+    counts = Counter(replicas.choose_replica() for _ in range(4000))
+    assert set(counts) == {'first', 'second'}
+    assert 2.5 < counts['first'] / counts['second'] < 3.5, (
+        'Проверьте, что реплики выбираются пропорционально весам'
+    )
@@ -0,0 +1,105 @@
+import os
+import runpy
+
+import pytest
+
+from .conftest import root_dir
+
+
+@pytest.fixture(params=['locmem', 'filebased'])
+def response_cache(request, settings, tmp_path):
+    backends = {
+        'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+        'filebased': 'django.core.cache.backends.filebased.FileBasedCache',
+    }
+    settings.CACHES = {
+        **settings.CACHES,
+        'responses': {
+            'BACKEND': backends[request.param],
+            'LOCATION': str(tmp_path / 'cache'),
+        },
+    }
+    settings.RESPONSE_CACHE_ALIAS = 'responses'
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('response_cache')
+class TestResponseCache:
+
+    def test_title_list_is_cached(self, client, title,
+                                  django_assert_num_queries):
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный запрос списка берётся из кэша'
+        )
+        assert response.json()['results'][0]['name'] == title.name
+        assert client.get('/api/v1/titles/?year=1994')['X-Cache'] == 'MISS'
+
+    def test_review_invalidates_titles(self, client, title, user):
+        from reviews.models import Review
+
+        client.get(f'/api/v1/titles/{title.pk}/')
+        Review.objects.create(title=title, author=user, text='', score=3)
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 3, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+
+    def test_genre_change_invalidates_genres_and_titles(self, client, title,
+                                                        genres):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/titles/')
+        genres[0].name = 'Триллер'
+        genres[0].save()
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['genre'][0]['name'] == 'Триллер'
+
+    def test_key_depends_on_role(self, client, admin_client, title):
+        client.get('/api/v1/categories/')
+        assert admin_client.get('/api/v1/categories/')['X-Cache'] == 'MISS'
+
+    def test_stats(self, client, admin_client, user_client, title):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        assert user_client.get('/api/v1/cache/stats/').status_code == 403
+        response = admin_client.get('/api/v1/cache/stats/')
+        assert response.status_code == 200
+        assert response.json()['titles'] == {'hits': 1, 'misses': 1}
+
+
+class TestGunicornConfig:
+
+    @staticmethod
+    def config():
+        return runpy.run_path(
+            os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+        )
+
+    def check_caches(self):
+        self.config()['check_caches']()
+
+    def test_threaded_workers(self):
+        config = self.config()
+        assert config['worker_class'] == 'gthread' and config['threads'] > 1, (
+            'Проверьте, что долгий опрос журнала не занимает весь воркер'
+        )
+
+    def test_local_cache_refused(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with pytest.raises(RuntimeError):
+            self.check_caches()
+        settings.DEBUG = True
+        self.check_caches()
+
+    def test_shared_cache(self, settings, tmp_path):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+        self.check_caches()
@@ -0,0 +1,131 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleBrowse:
+
+    @pytest.fixture
+    def catalog(self, category, genres):
+        from reviews.models import Category, Title
+
+        book = Category.objects.create(name='Книга', slug='book')
+        drama, comedy = genres
+        rows = [
+            ('Унесённые ветром', 1939, 8.5, category, [drama]),
+            ('Большой Лебовски', 1998, 9.0, category, [comedy]),
+            ('Трасса 60', 2002, 7.0, category, [drama, comedy]),
+            ('Без оценок', 1995, None, book, [drama]),
+            ('Пикник на обочине', 1972, 9.5, book, [drama, comedy]),
+        ]
+        titles = {}
+        for name, year, rating, title_category, title_genres in rows:
+            title = Title.objects.create(
+                name=name, year=year, category=title_category
+            )
+            Title.objects.filter(pk=title.pk).update(rating=rating)
+            title.genre.set(title_genres)
+            titles[name] = title
+        return titles
+
+    def names(self, client, **params):
+        response = client.get('/api/v1/titles/', params)
+        assert response.status_code == 200, response.json()
+        return [item['name'] for item in response.json()['results']]
+
+    def test_ordering_by_rating(self, client, catalog):
+        assert self.names(client, ordering='-rating') == [
+            'Пикник на обочине', 'Большой Лебовски', 'Унесённые ветром',
+            'Трасса 60', 'Без оценок',
+        ], 'Проверьте, что произведения без оценок идут последними'
+        assert self.names(client, ordering='rating')[0] == 'Без оценок'
+
+    def test_ordering_by_year_and_name(self, client, catalog):
+        assert self.names(client, ordering='year')[0] == 'Унесённые ветром'
+        assert self.names(client, ordering='-name')[0] == 'Унесённые ветром'
+
+    def test_ranges(self, client, catalog):
+        assert self.names(
+            client, year_min=1990, year_max=2000, ordering='year'
+        ) == ['Без оценок', 'Большой Лебовски']
+        assert self.names(client, rating_min=9, ordering='-rating') == [
+            'Пикник на обочине', 'Большой Лебовски'
+        ]
+
+    def test_genres_any_and_all(self, client, catalog):
+        assert len(self.names(client, genre='drama,comedy')) == 5
+        assert self.names(
+            client, genre='drama,comedy', genre_match='all',
+            ordering='-rating'
+        ) == ['Пикник на обочине', 'Трасса 60']
+        assert self.names(client, genre='comedy', ordering='year') == [
+            'Пикник на обочине', 'Большой Лебовски', 'Трасса 60'
+        ]
+
+    def test_top_rated_in_genre_and_decade(self, client, catalog):
+        assert self.names(
+            client, genre='comedy', year_min=1990, year_max=2005,
+            ordering='-rating'
+        ) == ['Большой Лебовски', 'Трасса 60']
+
+    def test_invalid_ordering(self, client, catalog):
+        response = client.get('/api/v1/titles/', {'ordering': 'description'})
+        assert response.status_code == 400
+
+
+def explain(queryset):
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params, indexes', [
+    ({'ordering': '-rating'}, 'title_rating_id_idx'),
+    ({'ordering': 'rating', 'rating_min': 8}, 'title_rating_id_idx'),
+    ({'category': 'movie', 'ordering': '-rating'},
+     ('title_category_rating_idx', 'title_rating_id_idx')),
+    ({'year_min': 1990, 'year_max': 2000, 'ordering': 'year'},
+     'title_year_id_idx'),
+])
+def test_title_browse_plans(params, indexes, category, genres):
+    from api.filters import TitleFilter
+    from reviews.models import Title
+
+    queryset = TitleFilter(params, queryset=Title.objects.all()).qs[:10]
+    plan = explain(queryset)
+    if isinstance(indexes, str):
+        indexes = (indexes,)
+    assert any(index in plan for index in indexes), (
+        f'Ожидался один из индексов {indexes}:\n{plan}'
+    )
+    assert 'Sort' not in plan and 'TEMP B-TREE' not in plan, (
+        f'Проверьте, что сортировка идёт по индексу:\n{plan}'
+    )
+    assert 'Seq Scan on reviews_title ' not in plan
+    assert 'SCAN reviews_title\n' not in f'{plan}\n'
+
+
+@pytest.mark.django_db
+def test_title_indexes_in_model_state():
+    from django.db import connection
+    from reviews.models import Title
+
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Title._meta.db_table
+        )
+    declared = {index.name for index in Title._meta.indexes}
+    assert {'title_rating_id_idx', 'title_category_rating_idx',
+            'title_year_id_idx'} <= declared, (
+        'Проверьте, что индексы произведений объявлены в Meta.indexes: '
+        'иначе пересоздание таблицы в SQLite их теряет'
+    )
+    assert declared <= set(constraints)
@@ -0,0 +1,51 @@
+import pytest
+from rest_framework.pagination import PageNumberPagination
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    @pytest.fixture
+    def many_titles(self, category, genres, user):
+        from reviews.models import Review, Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000, description='',
+                  category=category)
+            for i in range(500)
+        )
+        titles = list(Title.objects.order_by('id'))
+        Through = Title.genre.through
+        Through.objects.bulk_create(
+            Through(title_id=title.pk, genre_id=genre.pk)
+            for title in titles for genre in genres
+        )
+        for title in titles[:10]:
+            Review.objects.create(title=title, author=user, text='', score=7)
+        return titles
+
+    @pytest.mark.parametrize('page_size', [5, 50, 500])
+    def test_title_list_query_count(self, client, many_titles, monkeypatch,
+                                    django_assert_num_queries, page_size):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+        # COUNT для пагинации, страница произведений с категорией, жанры.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == page_size, (
+            'Проверьте размер страницы списка произведений'
+        )
+        assert results[0]['rating'] == 7
+        assert results[0]['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert [genre['slug'] for genre in results[0]['genre']] == [
+            'drama', 'comedy'
+        ]
+
+    def test_title_detail_query_count(self, client, title,
+                                      django_assert_num_queries):
+        # Проверка ETag, произведение с категорией, жанры.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
@@ -0,0 +1,92 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def catalog(self, category, genres):
+        from reviews.models import Title
+
+        titles = [
+            Title.objects.create(
+                name='Шоу Трумана', year=1998, category=category,
+                description='Жизнь в телевизионном шоу'
+            ),
+            Title.objects.create(
+                name='Побег из Шоушенка', year=1994, category=category,
+                description='Тюремная драма'
+            ),
+            Title.objects.create(
+                name='Зелёная миля', year=1999, category=None,
+                description='Ещё одна тюремная история, не шоу'
+            ),
+        ]
+        titles[0].genre.set([genres[1]])
+        titles[1].genre.set([genres[0]])
+        titles[2].genre.set([genres[0]])
+        return titles
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_ranked_by_relevance(self, client, catalog):
+        assert self.search(client, 'шоу') == [
+            'Шоу Трумана', 'Зелёная миля'
+        ], (
+            'Проверьте, что совпадение в названии выше, чем в описании'
+        )
+
+    def test_prefix(self, client, catalog):
+        found = self.search(client, 'шоу*')
+        assert set(found[:2]) == {'Шоу Трумана', 'Побег из Шоушенка'}
+        assert found[2] == 'Зелёная миля'
+        assert self.search(client, 'тюрем*') == [
+            'Побег из Шоушенка', 'Зелёная миля'
+        ]
+
+    def test_combines_with_filters(self, client, catalog):
+        response = client.get(
+            '/api/v1/titles/', {'search': 'тюрем*', 'genre': 'drama',
+                                'year': 1999}
+        )
+        assert [item['name'] for item in response.json()['results']] == [
+            'Зелёная миля'
+        ]
+
+    def test_index_follows_writes(self, client, catalog):
+        catalog[2].name = 'Шоу должно продолжаться'
+        catalog[2].save()
+        assert self.search(client, 'продолжаться') == [
+            'Шоу должно продолжаться'
+        ]
+        catalog[2].delete()
+        assert self.search(client, 'продолжаться') == []
+
+    def test_empty_query(self, client, catalog):
+        assert self.search(client, '***') == []
+
+    def test_uses_index(self, catalog):
+        from django.db import connection
+        from reviews.models import Title
+        from reviews.search import search_titles
+
+        queryset = search_titles(Title.objects.all(), 'шоу*')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # На трёх строках планировщик иначе выберет seq scan.
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}', params)
+                expected = 'reviews_title_search_idx'
+            else:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                expected = 'VIRTUAL TABLE INDEX'
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        assert expected in plan, (
+            'Проверьте, что поиск использует полнотекстовый индекс'
+        )
+        assert 'Seq Scan on reviews_title' not in plan
+        assert 'SCAN reviews_title ' not in f'{plan} '